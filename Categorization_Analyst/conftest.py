@@ -0,0 +1,25 @@
+"""
+Configuración común de las pruebas.
+
+Las pruebas se ejecutan desde la raíz del repositorio, como el resto del
+proyecto (python -m pytest Categorization_Analyst), e importan los módulos como
+lo hace run_categorization.py (from src...).
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """
+    Ejecuta la prueba en un directorio temporal.
+    
+    Las rutas por defecto del proyecto son relativas ('Categorization_Analyst/data/...'),
+    de modo que los archivos de aprendizaje, resúmenes y salidas quedan dentro de él.
+    """
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
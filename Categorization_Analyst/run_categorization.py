@@ -1,50 +1,488 @@
 """
 Script principal para ejecutar el proceso de categorización de comentarios.
+
+Los módulos pesados (pandas, numpy, el procesador) se importan dentro de cada
+subcomando, de modo que --help y los comandos livianos arrancan rápido.
 """
 
+import argparse
 import logging
+import os
+import sys
 from pathlib import Path
-from src.data_preparation.check_environment import main as check_environment
-from src.data_preparation.process_comments import main as process_comments
-
-# Configuración de logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('categorization_process.log'),
-        logging.StreamHandler()
-    ]
-)
-
-def main():
+from src.data_preparation.job_queue import JOBS_DB, POLL_INTERVAL
+from src.data_preparation.results_store import RESULTS_DB
+
+# Subcomandos de procesamiento cuyo log también se guarda en LOG_FILE
+FILE_LOG_COMMANDS = ('run', 'merge', 'worker', 'watch')
+
+# Archivo de log de los procesamientos
+LOG_FILE = 'categorization_process.log'
+
+def setup_logging(command: str = 'run'):
+    """
+    Configura el sistema de logging.
+    
+    Solo los subcomandos de procesamiento (FILE_LOG_COMMANDS) escriben además en
+    LOG_FILE; las consultas y los comandos livianos solo muestran el log en consola.
+    
+    Args:
+        command (str): Subcomando que se ejecuta
+    """
+    handlers = [logging.StreamHandler()]
+    if command in FILE_LOG_COMMANDS:
+        handlers.insert(0, logging.FileHandler(LOG_FILE))
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=handlers
+    )
+
+def positive_float(value: str) -> float:
+    """Tipo de argparse para números mayores que cero (p. ej. el umbral de cascada)."""
+    number = float(value)
+    if not number > 0:
+        raise argparse.ArgumentTypeError(f"debe ser mayor que 0: {value}")
+    return number
+
+# Subcomandos disponibles; sin subcomando se ejecuta 'run'
+COMMANDS = ('run', 'merge', 'query', 'evaluate', 'search', 'categorize', 'verify', 'submit', 'worker', 'jobs', 'watch')
+
+def parse_args(argv=None):
+    """
+    Interpreta los argumentos de línea de comandos.
+    
+    Args:
+        argv (list, optional): Argumentos a interpretar. Por defecto sys.argv.
+        
+    Returns:
+        argparse.Namespace: Argumentos interpretados
+    """
+    project_root = Path(__file__).parent
+    default_input = project_root.parent / 'Base' / 'Comentarios_CSAT_Resumen.xlsx'
+    default_output = project_root / 'categorized_comments.xlsx'
+    default_labels = project_root.parent / 'Base' / 'Ejemplo_Categoria.xlsx'
+    
+    parser = argparse.ArgumentParser(description="Categorización de comentarios de clientes")
+    subparsers = parser.add_subparsers(dest='command')
+    
+    run_parser = subparsers.add_parser('run', help="Categoriza un archivo de comentarios (por defecto)")
+    run_parser.add_argument('--input', default=str(default_input), help="Archivo Excel de entrada")
+    run_parser.add_argument('--output', default=str(default_output), help="Archivo Excel de salida")
+    run_parser.add_argument('--resume', action='store_true',
+                            help="Reanuda desde el último lote completado de una ejecución interrumpida")
+    run_parser.add_argument('--engine', choices=['keyword', 'linear'], default='keyword',
+                            help="Motor de categorización")
+    run_parser.add_argument('--model', help="Ruta del modelo del motor lineal")
+    run_parser.add_argument('--cascade', type=positive_float, metavar='UMBRAL',
+                            help="Activa el modo cascada con el umbral de margen indicado")
+    run_parser.add_argument('--shard', metavar='i/N',
+                            help="Procesa solo el fragmento i (desde 0) de N, particionado por hash de pnr")
+    run_parser.add_argument('--shard-dir', help="Directorio compartido de fragmentos "
+                                                "(por defecto 'shards' junto a la salida)")
+    run_parser.add_argument('--sqlite', nargs='?', const=RESULTS_DB, metavar='DB',
+                            help=f"Inserta también los resultados en una base SQLite (por defecto {RESULTS_DB})")
+    run_parser.add_argument('--run-id', help="Identificador de la ejecución en la base SQLite")
+    run_parser.add_argument('--keyword-stats', action='store_true',
+                            help="Registra activaciones por palabra clave y escribe su reporte junto al resumen")
+    run_parser.add_argument('--index', nargs='?', const='', metavar='DIR',
+                            help="Construye el índice de búsqueda por palabras "
+                                 "(por defecto en data/output/search_index)")
+    run_parser.add_argument('--batch-size', type=int, default=1000,
+                            help="Comentarios del primer lote; los siguientes se ajustan a --batch-seconds")
+    run_parser.add_argument('--batch-seconds', type=float, metavar='SEG',
+                            help="Tiempo objetivo por lote (por defecto 1 segundo; 0 mantiene fijo --batch-size)")
+    run_parser.add_argument('--workers', type=int, default=1,
+                            help="Procesos que categorizan cada lote en paralelo (comparten las tablas de búsqueda)")
+    
+    merge_parser = subparsers.add_parser('merge', help="Combina los fragmentos en la salida y el resumen finales")
+    merge_parser.add_argument('--shard-dir', default=str(project_root / 'shards'),
+                              help="Directorio compartido de fragmentos")
+    merge_parser.add_argument('--output', default=str(default_output), help="Archivo Excel de salida")
+    merge_parser.add_argument('--summary', help="Archivo de resumen de categorización")
+    
+    query_parser = subparsers.add_parser('query', help="Consulta la base SQLite de resultados")
+    query_parser.add_argument('view', choices=['counts', 'rows', 'runs'],
+                              help="counts: conteos agrupados; rows: comentarios; runs: ejecuciones")
+    query_parser.add_argument('--db', default=RESULTS_DB, help="Base SQLite de resultados")
+    query_parser.add_argument('--by', default='categoria',
+                              choices=['categoria', 'subcategoria', 'tipo', 'run_id'],
+                              help="Columna de agrupación para counts")
+    query_parser.add_argument('--run-id', help="Filtra por ejecución")
+    query_parser.add_argument('--categoria', help="Filtra por categoría")
+    query_parser.add_argument('--tipo', help="Filtra por tipo")
+    query_parser.add_argument('--pnr', help="Filtra por pnr")
+    query_parser.add_argument('--min-confianza', type=float, help="Confianza mínima")
+    query_parser.add_argument('--limit', type=int, default=20, help="Máximo de filas para rows")
+    
+    evaluate_parser = subparsers.add_parser('evaluate', help="Mide precisión y velocidad contra un archivo etiquetado")
+    evaluate_parser.add_argument('--labels', default=str(default_labels),
+                                 help="Excel etiquetado (Comentario, Categoría y opcionalmente Tipo)")
+    evaluate_parser.add_argument('--engine', choices=['keyword', 'linear'], default='keyword',
+                                 help="Motor de categorización")
+    evaluate_parser.add_argument('--model', help="Ruta del modelo del motor lineal")
+    evaluate_parser.add_argument('--cascade', type=positive_float, metavar='UMBRAL',
+                                 help="Activa el modo cascada con el umbral de margen indicado")
+    evaluate_parser.add_argument('--batch-size', type=int, default=1000, help="Comentarios por lote")
+    evaluate_parser.add_argument('--no-memory', action='store_true',
+                                 help="Omite la pasada de medición de memoria")
+    evaluate_parser.add_argument('--output-dir', help="Directorio de los registros JSON de evaluación")
+    
+    search_parser = subparsers.add_parser('search', help="Busca comentarios en el índice por palabras")
+    search_parser.add_argument('terms', nargs='+',
+                               help="Palabras (AND); 'OR' separa alternativas y '-palabra' o 'NOT palabra' excluye")
+    search_parser.add_argument('--index', help="Directorio del índice (por defecto data/output/search_index)")
+    search_parser.add_argument('--categoria', help="Filtra por categoría")
+    search_parser.add_argument('--tipo', help="Filtra por tipo")
+    search_parser.add_argument('--limit', type=int, default=20, help="Máximo de comentarios a mostrar")
+    search_parser.add_argument('--count', action='store_true', help="Solo muestra la cantidad de coincidencias")
+    
+    categorize_parser = subparsers.add_parser(
+        'categorize', help="Categoriza comentarios de la entrada estándar y escribe JSONL en la salida estándar")
+    categorize_parser.add_argument('--format', choices=['auto', 'text', 'jsonl'], default='auto',
+                                   help="Entrada: una línea por comentario (text), objetos JSON con pnr y "
+                                        "Comentario (jsonl) o detección por línea (auto)")
+    categorize_parser.add_argument('--engine', choices=['keyword', 'linear'], default='keyword',
+                                   help="Motor de categorización")
+    categorize_parser.add_argument('--model', help="Ruta del modelo del motor lineal")
+    categorize_parser.add_argument('--cascade', type=positive_float, metavar='UMBRAL',
+                                   help="Activa el modo cascada con el umbral de margen indicado")
+    categorize_parser.add_argument('--batch-size', type=int, default=100,
+                                   help="Comentarios por micro-lote; la salida se escribe tras cada uno")
+    categorize_parser.add_argument('--flush-interval', type=positive_float, metavar='SEGUNDOS',
+                                   help="Procesa un micro-lote incompleto tras esta espera (por defecto 0.5)")
+    
+    verify_parser = subparsers.add_parser(
+        'verify', help="Verifica que el procesamiento en paralelo reproduzca exactamente el resultado en serie")
+    verify_parser.add_argument('--input', default=str(default_input), help="Archivo Excel de entrada")
+    verify_parser.add_argument('--engine', choices=['keyword', 'linear'], default='keyword',
+                               help="Motor de categorización")
+    verify_parser.add_argument('--model', help="Ruta del modelo del motor lineal")
+    verify_parser.add_argument('--cascade', type=positive_float, metavar='UMBRAL',
+                               help="Activa el modo cascada con el umbral de margen indicado")
+    verify_parser.add_argument('--workers', type=int, default=2, help="Procesos trabajadores")
+    verify_parser.add_argument('--batch-size', type=int, default=1000, help="Comentarios por lote")
+    verify_parser.add_argument('--start-method', choices=['fork', 'spawn'], default='spawn',
+                               help="Inicio de los trabajadores; 'spawn' usa otra semilla de hash por "
+                                    "proceso y detecta además resultados que dependan de ella")
+    verify_parser.add_argument('--limit', type=int, help="Verifica solo los primeros N comentarios")
+    
+    submit_parser = subparsers.add_parser(
+        'submit', help="Encola archivos de entrada (un archivo idéntico ya encolado no se repite)")
+    submit_parser.add_argument('inputs', nargs='+', help="Archivos Excel de entrada")
+    submit_parser.add_argument('--db', default=JOBS_DB, help="Base SQLite de la cola de trabajos")
+    submit_parser.add_argument('--engine', choices=['keyword', 'linear'], default='keyword',
+                               help="Motor de categorización")
+    submit_parser.add_argument('--cascade', type=positive_float, metavar='UMBRAL',
+                               help="Activa el modo cascada con el umbral de margen indicado")
+    
+    worker_parser = subparsers.add_parser('worker', help="Procesa los trabajos de la cola")
+    worker_parser.add_argument('--db', default=JOBS_DB, help="Base SQLite de la cola de trabajos")
+    worker_parser.add_argument('--workers', type=int, default=1,
+                               help="Procesos que categorizan cada lote en paralelo")
+    worker_parser.add_argument('--batch-size', type=int, default=1000, help="Comentarios del primer lote")
+    worker_parser.add_argument('--sqlite', nargs='?', const=RESULTS_DB, metavar='DB',
+                               help=f"Inserta también los resultados en una base SQLite (por defecto {RESULTS_DB})")
+    worker_parser.add_argument('--poll', type=float, default=POLL_INTERVAL, metavar='SEG',
+                               help="Segundos de espera cuando no hay trabajos pendientes")
+    worker_parser.add_argument('--drain', action='store_true',
+                               help="Termina cuando no quedan trabajos pendientes (p. ej. desde cron)")
+    
+    jobs_parser = subparsers.add_parser('jobs', help="Lista los trabajos de la cola con su estado y tiempos")
+    jobs_parser.add_argument('--db', default=JOBS_DB, help="Base SQLite de la cola de trabajos")
+    jobs_parser.add_argument('--status', choices=['pending', 'running', 'done', 'failed'],
+                             help="Filtra por estado")
+    
+    watch_parser = subparsers.add_parser(
+        'watch', help="Vigila un directorio y agrega cada archivo CSV, Excel o JSONL nuevo a la base SQLite")
+    watch_parser.add_argument('--dir', help="Directorio vigilado (por defecto data/input)")
+    watch_parser.add_argument('--db', default=RESULTS_DB, help="Base SQLite de resultados")
+    watch_parser.add_argument('--summary', help="Resumen acumulado de los archivos ingeridos "
+                                                "(por defecto data/summaries/categorization_summary_watch.txt)")
+    watch_parser.add_argument('--engine', choices=['keyword', 'linear'], default='keyword',
+                              help="Motor de categorización")
+    watch_parser.add_argument('--model', help="Ruta del modelo del motor lineal")
+    watch_parser.add_argument('--cascade', type=positive_float, metavar='UMBRAL',
+                              help="Activa el modo cascada con el umbral de margen indicado")
+    watch_parser.add_argument('--batch-size', type=int, default=1000, help="Comentarios por lote")
+    watch_parser.add_argument('--poll', type=positive_float, metavar='SEG',
+                              help="Segundos entre consultas (por defecto 10); un archivo está completo "
+                                   "cuando no cambia entre dos consultas")
+    watch_parser.add_argument('--once', action='store_true',
+                              help="Procesa los archivos presentes y termina")
+    
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if not argv or argv[0] not in COMMANDS + ('-h', '--help'):
+        argv.insert(0, 'run')
+    return parser.parse_args(argv)
+
+def run_command(args) -> bool:
+    """Verifica el entorno y categoriza el archivo de entrada (completo o un fragmento)."""
+    from src.data_preparation.batching import TARGET_BATCH_SECONDS
+    from src.data_preparation.check_environment import main as check_environment
+    from src.data_preparation.process_comments_v2 import main as process_comments
+    from src.data_preparation.search_index import SEARCH_INDEX_DIR
+    from src.data_preparation.sharding import parse_shard
+    
+    shard = parse_shard(args.shard) if args.shard else None
+    search_index_dir = (args.index or SEARCH_INDEX_DIR) if args.index is not None else None
+    target_batch_seconds = TARGET_BATCH_SECONDS if args.batch_seconds is None else (args.batch_seconds or None)
+    
+    # Verificar entorno
+    logging.info("Verificando entorno...")
+    if not check_environment():
+        logging.error("La verificación del entorno falló. Por favor, corrija los errores antes de continuar.")
+        return False
+    
+    # Procesar comentarios
+    logging.info("Iniciando procesamiento de comentarios...")
+    process_comments(args.input, args.output, engine=args.engine, model_file=args.model,
+                     cascade_threshold=args.cascade, resume=args.resume,
+                     shard=shard, shard_dir=args.shard_dir,
+                     sqlite_path=args.sqlite, run_id=args.run_id,
+                     keyword_stats=args.keyword_stats, search_index_dir=search_index_dir,
+                     batch_size=args.batch_size, target_batch_seconds=target_batch_seconds,
+                     workers=args.workers)
+    return True
+
+def merge_command(args) -> bool:
+    """Combina los fragmentos completos en el archivo de salida y el resumen finales."""
+    from src.data_preparation.sharding import merge_shards
+    from src.data_preparation.summary import SUMMARY_FILE
+    
+    logging.info(f"Combinando fragmentos de: {args.shard_dir}")
+    merge_shards(args.shard_dir, args.output, args.summary or SUMMARY_FILE)
+    return True
+
+def query_command(args) -> bool:
+    """Imprime conteos, comentarios o ejecuciones de la base SQLite de resultados."""
+    from src.data_preparation.results_store import ResultsStore
+    
+    if not Path(args.db).exists():
+        logging.error(f"No se encontró la base de resultados: {args.db}")
+        return False
+    
+    store = ResultsStore(args.db)
+    try:
+        filters = {
+            'run_id': args.run_id,
+            'category': args.categoria,
+            'type_name': args.tipo,
+            'pnr': args.pnr,
+            'min_confidence': args.min_confianza
+        }
+        if args.view == 'counts':
+            for value, count in store.counts(args.by, **filters):
+                print(f"{value}\t{count}")
+        elif args.view == 'rows':
+            for row in store.drill_down(args.limit, **filters):
+                print('\t'.join('' if value is None else str(value) for value in row.values()))
+        else:
+            for run in store.runs():
+                print('\t'.join('' if value is None else str(value) for value in run.values()))
+    finally:
+        store.close()
+    return True
+
+def evaluate_command(args) -> bool:
+    """Evalúa una configuración contra un archivo etiquetado y guarda su registro."""
+    from src.data_preparation.evaluation import EVALUATIONS_DIR, evaluate, print_evaluation, save_evaluation
+    
+    if not Path(args.labels).exists():
+        logging.error(f"No se encontró el archivo etiquetado: {args.labels}")
+        return False
+    
+    record = evaluate(args.labels, engine=args.engine, cascade_threshold=args.cascade,
+                      batch_size=args.batch_size, model_file=args.model,
+                      measure_memory=not args.no_memory)
+    print_evaluation(record)
+    path = save_evaluation(record, args.output_dir or EVALUATIONS_DIR)
+    print(f"\nRegistro de evaluación: {path}")
+    return True
+
+def search_command(args) -> bool:
+    """Imprime los comentarios del índice que cumplen una consulta por palabras."""
+    from src.data_preparation.search_index import SEARCH_INDEX_DIR, open_indexes
+    
+    query = ' '.join(args.terms)
+    total = 0
+    shown = 0
+    for index in open_indexes(args.index or SEARCH_INDEX_DIR):
+        positions = index.search(query, category=args.categoria, type_name=args.tipo)
+        total += len(positions)
+        if args.count or shown >= args.limit:
+            continue
+        for row in index.rows(positions[:args.limit - shown]):
+            print('\t'.join('' if value is None else str(value) for value in row.values()))
+            shown += 1
+    print(f"Coincidencias: {total}")
+    return True
+
+def categorize_command(args) -> bool:
+    """Categoriza comentarios de la entrada estándar, escribiendo cada lote al terminarlo."""
+    from src.data_preparation.process_comments_v2 import CommentProcessor
+    from src.data_preparation.streaming import FLUSH_INTERVAL, categorize_stream
+    
+    processor = CommentProcessor(engine=args.engine, model_file=args.model)
+    if args.cascade is not None:
+        processor.enable_cascade(args.cascade)
+    
+    try:
+        count = categorize_stream(processor, sys.stdin, sys.stdout,
+                                  batch_size=max(1, args.batch_size), input_format=args.format,
+                                  flush_interval=args.flush_interval or FLUSH_INTERVAL)
+    except BrokenPipeError:
+        # El consumidor cerró la salida (p. ej. '| head'): terminar sin error y sin
+        # que Python intente vaciar de nuevo la salida al salir
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return True
+    logging.info(f"Comentarios categorizados: {count}")
+    return True
+
+def verify_command(args) -> bool:
+    """Procesa la entrada en serie y en paralelo y compara ambos resultados."""
+    import pandas as pd
+    from src.data_preparation.parallel import verify_parallel
+    from src.data_preparation.process_comments_v2 import CommentProcessor
+    
+    df = pd.read_excel(args.input)
+    if 'pnr' not in df.columns or 'Comentario' not in df.columns:
+        logging.error("El archivo debe contener las columnas: ['pnr', 'Comentario']")
+        return False
+    if args.limit is not None:
+        df = df.head(args.limit)
+    
+    processor = CommentProcessor(engine=args.engine, model_file=args.model)
+    if args.cascade is not None:
+        processor.enable_cascade(args.cascade)
+    
+    logging.info(f"Verificando {len(df)} comentarios con {args.workers} trabajadores ({args.start_method})")
+    serial, differences = verify_parallel(processor, df, workers=args.workers, batch_size=args.batch_size,
+                                          start_method=args.start_method)
+    if len(differences):
+        logging.error(f"{len(differences)} de {len(df)} resultados difieren entre la ejecución en serie "
+                      f"y en paralelo")
+        print(serial.to_frame().iloc[differences[:20]].to_string())
+        return False
+    print(f"Resultados idénticos en serie y en paralelo: {len(df)} comentarios")
+    return True
+
+def submit_command(args) -> bool:
+    """Encola los archivos de entrada, omitiendo los ya encolados con el mismo contenido."""
+    from src.data_preparation.job_queue import JobQueue
+    
+    queue = JobQueue(args.db)
+    try:
+        for input_file in args.inputs:
+            if not Path(input_file).exists():
+                logging.error(f"No se encontró el archivo de entrada: {input_file}")
+                return False
+            job_id, created = queue.submit(input_file, engine=args.engine, cascade_threshold=args.cascade)
+            if created:
+                print(f"Trabajo {job_id} encolado: {input_file}")
+            else:
+                print(f"Trabajo {job_id} ya registrado para el mismo contenido ({queue.job(job_id)['status']}): "
+                      f"{input_file}")
+    finally:
+        queue.close()
+    return True
+
+def worker_command(args) -> bool:
+    """Procesa los trabajos pendientes de la cola."""
+    from src.data_preparation.job_queue import JobQueue, run_worker
+    
+    queue = JobQueue(args.db)
+    try:
+        processed = run_worker(queue, workers=args.workers, batch_size=args.batch_size,
+                               sqlite_path=args.sqlite, poll_interval=args.poll, drain=args.drain)
+    except KeyboardInterrupt:
+        # El trabajo en curso vuelve a pendiente y se reanuda desde su último lote
+        logging.info("Trabajador detenido")
+        return True
+    finally:
+        queue.close()
+    logging.info(f"Trabajos procesados: {processed}")
+    return True
+
+def jobs_command(args) -> bool:
+    """Imprime los trabajos de la cola."""
+    from src.data_preparation.job_queue import JobQueue
+    
+    if not Path(args.db).exists():
+        logging.error(f"No se encontró la cola de trabajos: {args.db}")
+        return False
+    
+    queue = JobQueue(args.db)
+    try:
+        for job in queue.jobs(args.status):
+            print('\t'.join('' if value is None else str(value) for value in job.values()))
+    finally:
+        queue.close()
+    return True
+
+def watch_command(args) -> bool:
+    """Vigila un directorio y categoriza cada archivo nuevo cuando está completo."""
+    from src.data_preparation.process_comments_v2 import CommentProcessor
+    from src.data_preparation.results_store import ResultsStore
+    from src.data_preparation.watch import WATCH_DIR, WATCH_POLL_INTERVAL, WATCH_SUMMARY_FILE, FolderWatcher
+    
+    processor = CommentProcessor(engine=args.engine, model_file=args.model)
+    if args.cascade is not None:
+        processor.enable_cascade(args.cascade)
+    
+    directory = args.dir or WATCH_DIR
+    poll_interval = args.poll or WATCH_POLL_INTERVAL
+    store = ResultsStore(args.db)
+    try:
+        watcher = FolderWatcher(processor, store, directory, summary_file=args.summary or WATCH_SUMMARY_FILE,
+                                batch_size=max(1, args.batch_size))
+        logging.info(f"Vigilando {directory} (cada {poll_interval} s); resultados en {args.db}")
+        count = watcher.run(poll_interval=poll_interval, once=args.once)
+    except KeyboardInterrupt:
+        logging.info("Vigilancia detenida")
+        return True
+    finally:
+        store.close()
+    logging.info(f"Comentarios categorizados: {count}")
+    return True
+
+def main(argv=None):
     """
     Función principal que ejecuta todo el proceso de categorización.
     """
+    args = parse_args(argv)
+    setup_logging(args.command)
     try:
-        # Obtener el directorio raíz del proyecto
-        project_root = Path(__file__).parent
-        
-        # Verificar entorno
-        logging.info("Verificando entorno...")
-        if not check_environment():
-            logging.error("La verificación del entorno falló. Por favor, corrija los errores antes de continuar.")
-            return False
-        
-        # Configurar rutas de archivos
-        input_file = project_root.parent / 'Base' / 'Comentarios_CSAT_Resumen.xlsx'
-        output_file = project_root / 'categorized_comments.xlsx'
+        if args.command == 'merge':
+            success = merge_command(args)
+        elif args.command == 'query':
+            return query_command(args)
+        elif args.command == 'evaluate':
+            return evaluate_command(args)
+        elif args.command == 'search':
+            return search_command(args)
+        elif args.command == 'categorize':
+            return categorize_command(args)
+        elif args.command == 'verify':
+            return verify_command(args)
+        elif args.command == 'submit':
+            return submit_command(args)
+        elif args.command == 'worker':
+            return worker_command(args)
+        elif args.command == 'jobs':
+            return jobs_command(args)
+        elif args.command == 'watch':
+            return watch_command(args)
+        else:
+            success = run_command(args)
         
-        # Procesar comentarios
-        logging.info("Iniciando procesamiento de comentarios...")
-        process_comments(str(input_file), str(output_file))
-        
-        logging.info("Proceso de categorización completado exitosamente")
-        return True
+        if success:
+            logging.info("Proceso de categorización completado exitosamente")
+        return success
         
     except Exception as e:
         logging.error(f"Error durante el proceso de categorización: {str(e)}")
         return False
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    sys.exit(0 if main() else 1)
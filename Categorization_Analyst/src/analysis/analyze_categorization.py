@@ -6,12 +6,14 @@ import pandas as pd
 import numpy as np
 from pathlib import Path
 import re
-from typing import Dict, List, Tuple
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
 import logging
 import os
 import sys
-import json
+import hashlib
+from bisect import bisect_right
 from collections import defaultdict
+from functools import lru_cache
 import nltk
 from nltk.tokenize import word_tokenize
 from nltk.corpus import stopwords
@@ -23,6 +25,9 @@ if root_dir not in sys.path:
     sys.path.append(root_dir)
 
 from src.data_preparation.categories_config import CATEGORIES, KEYWORDS, TYPE_KEYWORDS
+from src.analysis.learned_store import CooccurrenceStore, LearnedRows, SynonymStore
+from src.data_preparation.atomic_io import atomic_write_json, file_lock, read_json
+from src.data_preparation.text_normalization import normalize_keywords, normalize_text, strip_accents
 
 # Crear directorios necesarios
 def create_directories():
@@ -49,23 +54,62 @@ def setup_logging():
         ]
     )
 
+class ContextSpans(NamedTuple):
+    """Modificadores encontrados en un comentario por el escaneo de contexto."""
+    negation_ends: List[int]   # Posiciones (ordenadas) donde termina cada negación
+    intensity_ends: List[int]  # Posiciones (ordenadas) donde termina cada intensificador
+    has_emotion: bool
+
+class ComponentMeans:
+    """
+    Promedios acumulados de los puntajes normalizados (palabra clave, contexto y
+    tipo) de una categoría, en memoria constante.
+    
+    Cada valor actualiza la media en línea (Welford) y dos acumulados se pueden
+    combinar ponderando por su cantidad de filas, por lo que se pueden procesar
+    trozos de la entrada por separado y unirlos al final.
+    """
+    COMPONENTS = ('keyword', 'context', 'type')
+    
+    def __init__(self, count: int = 0, means: Dict[str, float] = None):
+        self.count = count
+        self.means = dict(means) if means else {component: 0.0 for component in self.COMPONENTS}
+    
+    def add(self, scores: Dict[str, float]) -> None:
+        """Agrega los puntajes normalizados de una fila."""
+        self.count += 1
+        for component in self.COMPONENTS:
+            self.means[component] += (scores[component] - self.means[component]) / self.count
+    
+    def merge(self, other: 'ComponentMeans') -> None:
+        """Combina con otro acumulado."""
+        total = self.count + other.count
+        if total == 0:
+            return
+        for component in self.COMPONENTS:
+            self.means[component] += (other.means[component] - self.means[component]) * other.count / total
+        self.count = total
+    
+    def to_dict(self) -> Dict:
+        """Representación serializable en JSON."""
+        return {'count': self.count, 'means': dict(self.means)}
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'ComponentMeans':
+        """Reconstruye un acumulado a partir de to_dict."""
+        return cls(data['count'], data['means'])
+
 class CategorizationAnalyzer:
     def __init__(self):
         self.categories = CATEGORIES
-        self.keywords = KEYWORDS
-        self.type_keywords = TYPE_KEYWORDS
+        # Palabras clave normalizadas con las mismas reglas que los comentarios
+        self.keywords = {category: normalize_keywords(words) for category, words in KEYWORDS.items()}
+        self.type_keywords = {type_name: normalize_keywords(words) for type_name, words in TYPE_KEYWORDS.items()}
         
         # Cargar pesos aprendidos si existen
         self.weights_file = 'Categorization_Analyst/data/learning/category_weights.json'
         self.learned_weights = self._load_weights()
         
-        # Compilar expresiones regulares
-        self.text_cleaner = re.compile(r'[^a-z\s]')
-        self.space_cleaner = re.compile(r'\s+')
-        
-        # Crear tabla de traducción para acentos
-        self.accents_table = str.maketrans('áéíóú', 'aeiou')
-        
         # Inicializar NLTK
         try:
             nltk.data.find('tokenizers/punkt')
@@ -119,6 +163,11 @@ class CategorizationAnalyzer:
             }
         }
         
+        self.context_patterns = {
+            category: {type_name: strip_accents(pattern) for type_name, pattern in patterns.items()}
+            for category, patterns in self.context_patterns.items()
+        }
+        
         # Patrones de negación mejorados
         self.negation_patterns = [
             r'no\s+',
@@ -134,9 +183,14 @@ class CategorizationAnalyzer:
             r'nada\s+de\s+'
         ]
         
-        # Compilar patrones de negación
+        # Compilar patrones de negación (sin tildes, como los textos normalizados)
+        self.negation_patterns = [strip_accents(pattern) for pattern in self.negation_patterns]
         self.negation_regex = re.compile('|'.join(self.negation_patterns), re.IGNORECASE)
         
+        # Distancia máxima (en caracteres) entre una negación o intensificador y la
+        # palabra clave que modifica; None considera todo el texto anterior
+        self.modifier_window = None
+        
         # Pesos base por categoría
         self.category_weights = {
             'Website': {'keyword': 0.5, 'context': 0.3, 'type': 0.2},
@@ -168,7 +222,8 @@ class CategorizationAnalyzer:
             'Cambios_Devoluciones': r'(cambio|cambios|devolución|devoluciones|reembolso|reembolsos|cancelación|cancelaciones|modificar|modificación)'
         }
         
-        # Compilar patrones adicionales
+        # Compilar patrones adicionales (sin tildes, como los textos normalizados)
+        self.additional_context_patterns = {k: strip_accents(v) for k, v in self.additional_context_patterns.items()}
         self.additional_context_regex = {k: re.compile(v, re.IGNORECASE) for k, v in self.additional_context_patterns.items()}
         
         # Patrones de intensidad para mejorar la detección de contexto
@@ -185,7 +240,8 @@ class CategorizationAnalyzer:
             r'absolutamente\s+'
         ]
         
-        # Compilar patrones de intensidad
+        # Compilar patrones de intensidad (sin tildes, como los textos normalizados)
+        self.intensity_patterns = [strip_accents(pattern) for pattern in self.intensity_patterns]
         self.intensity_regex = re.compile('|'.join(self.intensity_patterns), re.IGNORECASE)
         
         # Patrones de emoción para mejorar la detección de contexto
@@ -197,94 +253,98 @@ class CategorizationAnalyzer:
             r'preocupado|preocupada|ansioso|ansiosa|nervioso|nerviosa|inquieto|inquieta'
         ]
         
-        # Compilar patrones de emoción
+        # Compilar patrones de emoción (sin tildes, como los textos normalizados)
+        self.emotion_patterns = [strip_accents(pattern) for pattern in self.emotion_patterns]
         self.emotion_regex = re.compile('|'.join(self.emotion_patterns), re.IGNORECASE)
         
-        # Cargar o crear diccionario de sinónimos
-        self.synonyms_file = 'Categorization_Analyst/data/learning/synonyms.json'
+        # Regex combinada para encontrar negaciones, intensificadores y emociones en
+        # un solo recorrido: la primera búsqueda anticipada ubica las posiciones donde
+        # empieza algún modificador y las siguientes capturan cada tipo por separado
+        # (así se detectan aunque se superpongan)
+        negation = '|'.join(f'(?:{p})' for p in self.negation_patterns)
+        intensity = '|'.join(f'(?:{p})' for p in self.intensity_patterns)
+        emotion = '|'.join(f'(?:{p})' for p in self.emotion_patterns)
+        self.context_span_regex = re.compile(
+            f'(?={negation}|{intensity}|{emotion})'
+            f'(?=(?P<neg>{negation}))?(?=(?P<int>{intensity}))?(?=(?P<emo>{emotion}))?',
+            re.IGNORECASE
+        )
+        
+        # Almacén de sinónimos (columnar, se carga de forma diferida)
+        self.synonyms_dir = 'Categorization_Analyst/data/learning/synonyms'
+        self.synonyms_file = 'Categorization_Analyst/data/learning/synonyms.json'  # formato anterior
         self.synonyms = self._load_synonyms()
         
-        # Cargar o crear diccionario de coocurrencias
-        self.cooccurrence_file = 'Categorization_Analyst/data/learning/cooccurrences.json'
+        # Almacén de coocurrencias (columnar, se carga de forma diferida)
+        self.cooccurrence_dir = 'Categorization_Analyst/data/learning/cooccurrences'
+        self.cooccurrence_file = 'Categorization_Analyst/data/learning/cooccurrences.json'  # formato anterior
         self.cooccurrences = self._load_cooccurrences()
+        
+        # Filas ya aprendidas y promedios acumulados de sus componentes por categoría
+        self.learned_rows = LearnedRows('Categorization_Analyst/data/learning/learned_rows.npy')
+        self.component_stats_file = 'Categorization_Analyst/data/learning/component_stats.json'
 
     def _load_weights(self) -> Dict:
         """Carga los pesos aprendidos del archivo JSON."""
-        if os.path.exists(self.weights_file):
-            with open(self.weights_file, 'r') as f:
-                return json.load(f)
-        return {}
+        return read_json(self.weights_file, {})
 
     def _save_weights(self, weights: Dict) -> None:
-        """Guarda los pesos aprendidos en un archivo JSON."""
-        with open(self.weights_file, 'w') as f:
-            json.dump(weights, f, indent=4)
-            
-    def _load_synonyms(self) -> Dict:
-        """Carga el diccionario de sinónimos del archivo JSON."""
-        if os.path.exists(self.synonyms_file):
-            with open(self.synonyms_file, 'r') as f:
-                return json.load(f)
-        return {}
-        
-    def _save_synonyms(self, synonyms: Dict) -> None:
-        """Guarda el diccionario de sinónimos en un archivo JSON."""
-        with open(self.synonyms_file, 'w') as f:
-            json.dump(synonyms, f, indent=4)
-            
-    def _load_cooccurrences(self) -> Dict:
-        """Carga el diccionario de coocurrencias del archivo JSON."""
-        if os.path.exists(self.cooccurrence_file):
-            with open(self.cooccurrence_file, 'r') as f:
-                return json.load(f)
-        return {}
-        
-    def _save_cooccurrences(self, cooccurrences: Dict) -> None:
-        """Guarda el diccionario de coocurrencias en un archivo JSON."""
-        with open(self.cooccurrence_file, 'w') as f:
-            json.dump(cooccurrences, f, indent=4)
-
-    def _update_weights(self, df: pd.DataFrame) -> None:
-        """Actualiza los pesos basado en el análisis de los resultados."""
-        # Calcular la efectividad de cada componente por categoría
-        category_effectiveness = defaultdict(lambda: {'keyword': [], 'context': [], 'type': []})
-        
-        # Actualizar sinónimos y coocurrencias
-        self._update_synonyms_and_cooccurrences(df)
+        """
+        Guarda los pesos aprendidos en un archivo JSON de forma atómica.
         
-        for _, row in df.iterrows():
-            category = row['Categoría']
-            if pd.isna(category) or category == 'Otros':
-                continue
-                
-            text = self.clean_text(row['Comentario'])
-            type_name = row['Tipo']
-            
-            # Calcular scores individuales
-            keyword_score = self.calculate_keyword_score(text, category)
-            context_score = self.calculate_context_score(text, category, type_name)
-            type_score = self.calculate_type_score(text, type_name)
-            
-            # Normalizar scores
-            max_keyword_score = len(self.keywords[category]) * 2.5
-            max_context_score = 4.0
-            max_type_score = len(self.type_keywords.get(type_name, [])) * 1.5
+        Los pesos de las categorías analizadas reemplazan a los guardados; las
+        categorías que esta ejecución no vio conservan los pesos de otras ejecuciones.
+        """
+        with file_lock(self.weights_file):
+            stored = read_json(self.weights_file, {})
+            stored.update(weights)
+            atomic_write_json(self.weights_file, stored, indent=4)
             
-            normalized_keyword = keyword_score / max_keyword_score if max_keyword_score > 0 else 0
-            normalized_context = context_score / max_context_score if max_context_score > 0 else 0
-            normalized_type = type_score / max_type_score if max_type_score > 0 else 0
+    def _load_synonyms(self) -> SynonymStore:
+        """Abre el almacén de sinónimos (migra el JSON anterior si es necesario)."""
+        return SynonymStore(self.synonyms_dir, legacy_file=self.synonyms_file)
+        
+    def _save_synonyms(self, new_synonyms: Dict) -> None:
+        """Combina los sinónimos nuevos con los guardados y persiste el almacén."""
+        self.synonyms.add(new_synonyms, save=True)
             
-            # Almacenar scores normalizados
-            category_effectiveness[category]['keyword'].append(normalized_keyword)
-            category_effectiveness[category]['context'].append(normalized_context)
-            category_effectiveness[category]['type'].append(normalized_type)
+    def _load_cooccurrences(self) -> CooccurrenceStore:
+        """Abre el almacén de coocurrencias (migra el JSON anterior si es necesario)."""
+        return CooccurrenceStore(self.cooccurrence_dir, legacy_file=self.cooccurrence_file)
         
-        # Calcular nuevos pesos basados en la efectividad
+    def _save_cooccurrences(self, new_cooccurrences: Dict) -> None:
+        """Combina las coocurrencias nuevas con las guardadas y persiste el almacén."""
+        self.cooccurrences.merge_and_save(new_cooccurrences)
+
+    def _save_effectiveness(self, effectiveness: Dict[str, ComponentMeans]) -> None:
+        """
+        Combina los promedios de las filas nuevas con los acumulados guardados y
+        recalcula los pesos de esas categorías.
+        
+        Los pesos se calculan sobre todas las filas aprendidas hasta ahora, no solo
+        sobre las de esta ejecución, ya que las filas ya aprendidas no se vuelven a
+        recorrer.
+        """
+        with file_lock(self.component_stats_file):
+            stored = {category: ComponentMeans.from_dict(data)
+                      for category, data in read_json(self.component_stats_file, {}).items()}
+            for category, stats in effectiveness.items():
+                stored.setdefault(category, ComponentMeans()).merge(stats)
+            atomic_write_json(self.component_stats_file,
+                              {category: stats.to_dict() for category, stats in stored.items()}, indent=4)
+        
+        new_weights = self._weights_from_effectiveness({category: stored[category] for category in effectiveness})
+        self._save_weights(new_weights)
+        self.learned_weights.update(new_weights)
+    
+    @staticmethod
+    def _weights_from_effectiveness(effectiveness: Dict[str, ComponentMeans]) -> Dict:
+        """Calcula los pesos de cada categoría a partir de la efectividad promedio de sus componentes."""
         new_weights = {}
-        for category, scores in category_effectiveness.items():
-            keyword_mean = np.mean(scores['keyword']) if scores['keyword'] else 0.4
-            context_mean = np.mean(scores['context']) if scores['context'] else 0.4
-            type_mean = np.mean(scores['type']) if scores['type'] else 0.2
+        for category, stats in effectiveness.items():
+            keyword_mean = stats.means['keyword'] if stats.count else 0.4
+            context_mean = stats.means['context'] if stats.count else 0.4
+            type_mean = stats.means['type'] if stats.count else 0.2
             
             total = keyword_mean + context_mean + type_mean
             if total > 0:
@@ -293,113 +353,194 @@ class CategorizationAnalyzer:
                     'context': round(context_mean / total, 2),
                     'type': round(type_mean / total, 2)
                 }
+        return new_weights
+    
+    @staticmethod
+    def row_hashes(df: pd.DataFrame, run_id: str, offset: int = 0) -> np.ndarray:
+        """
+        Huella de 64 bits de cada fila: ejecución, posición, comentario, categoría y tipo.
         
-        # Guardar nuevos pesos
-        self._save_weights(new_weights)
-        self.learned_weights = new_weights
-        
-    def _update_synonyms_and_cooccurrences(self, df: pd.DataFrame) -> None:
-        """Actualiza los diccionarios de sinónimos y coocurrencias."""
-        # Actualizar sinónimos
-        new_synonyms = defaultdict(set)
-        for _, row in df.iterrows():
-            category = row['Categoría']
-            if pd.isna(category) or category == 'Otros':
-                continue
-                
-            text = self.clean_text(row['Comentario'])
-            words = set(text.split())
-            
-            # Agregar palabras como sinónimos si aparecen juntas en el mismo comentario
-            for word1 in words:
-                for word2 in words:
-                    if word1 != word2 and len(word1) > 3 and len(word2) > 3:
-                        new_synonyms[word1].add(word2)
-        
-        # Convertir a diccionario normal
-        synonyms_dict = {k: list(v) for k, v in new_synonyms.items()}
+        Args:
+            df (pd.DataFrame): Resultados con Comentario, Categoría y Tipo
+            run_id (str): Identificador de la ejecución (p. ej. el nombre del archivo)
+            offset (int): Posición de la primera fila en la entrada completa
+        """
+        hashes = np.empty(len(df), dtype=np.uint64)
+        for i, values in enumerate(zip(df['Comentario'], df['Categoría'], df['Tipo'])):
+            fields = [run_id, str(offset + i)] + ['' if pd.isna(value) else str(value) for value in values]
+            digest = hashlib.blake2b('\x1f'.join(fields).encode('utf-8'), digest_size=8).digest()
+            hashes[i] = int.from_bytes(digest, 'little')
+        return hashes
+    
+    def learn_and_score(self, data: Union[pd.DataFrame, Iterable[pd.DataFrame]], run_id: str,
+                        chunk_size: int = 10000) -> Tuple[np.ndarray, int]:
+        """
+        Aprende de las filas nuevas y calcula los puntajes de todas en un solo recorrido.
         
-        # Combinar con sinónimos existentes
-        for word, syns in synonyms_dict.items():
-            if word in self.synonyms:
-                self.synonyms[word] = list(set(self.synonyms[word] + syns))
-            else:
-                self.synonyms[word] = syns
+        Cada fila se identifica por su huella (ver row_hashes); las que ya están
+        registradas solo se puntúan, de modo que volver a analizar los mismos
+        datos no vuelve a sumar sinónimos, coocurrencias ni efectividad. Los
+        resultados se recorren por trozos y al final de cada uno se guardan los
+        almacenes y se registran sus filas nuevas.
         
-        # Guardar sinónimos actualizados
-        self._save_synonyms(self.synonyms)
+        Args:
+            data (pd.DataFrame | Iterable[pd.DataFrame]): Resultados completos o un
+                iterable de trozos (p. ej. pd.read_csv(..., chunksize=...))
+            run_id (str): Identificador de la ejecución
+            chunk_size (int): Tamaño de los trozos cuando data es un DataFrame
+            
+        Returns:
+            Tuple[np.ndarray, int]: Puntajes normalizados de cada fila (una columna por
+                componente, NaN si la fila no tiene categoría o tipo) y cantidad de
+                filas nuevas aprendidas
+        """
+        if isinstance(data, pd.DataFrame):
+            chunks = (data.iloc[i:i + chunk_size] for i in range(0, len(data), chunk_size))
+        else:
+            chunks = data
+        
+        scores = []
+        offset = 0
+        learned = 0
+        for chunk in chunks:
+            hashes = self.row_hashes(chunk, run_id, offset)
+            new_rows = self.learned_rows.new_mask(hashes)
+            scores.append(self._learn_and_score_chunk(chunk, new_rows))
+            # Si la ejecución se interrumpe antes de registrar el trozo, sus filas se
+            # vuelven a aprender en la siguiente
+            self.learned_rows.add(hashes[new_rows])
+            offset += len(chunk)
+            learned += int(new_rows.sum())
+        
+        if not scores:
+            return np.empty((0, len(ComponentMeans.COMPONENTS))), 0
+        return np.concatenate(scores), learned
+    
+    def _learn_and_score_chunk(self, df: pd.DataFrame, new_rows: np.ndarray) -> np.ndarray:
+        """
+        Puntúa un trozo y acumula sinónimos, coocurrencias y efectividad de sus filas nuevas.
         
-        # Actualizar coocurrencias
+        Args:
+            df (pd.DataFrame): Trozo de resultados con Comentario, Categoría y Tipo
+            new_rows (np.ndarray): Filas del trozo que todavía no se aprendieron
+            
+        Returns:
+            np.ndarray: Puntajes normalizados de cada fila (ver learn_and_score)
+        """
+        scores = np.full((len(df), len(ComponentMeans.COMPONENTS)), np.nan)
+        effectiveness = {}
+        new_synonyms = defaultdict(set)
         new_cooccurrences = defaultdict(lambda: defaultdict(int))
-        for _, row in df.iterrows():
-            category = row['Categoría']
-            if pd.isna(category) or category == 'Otros':
+        
+        for i, (comment, category, type_name, new) in enumerate(
+                zip(df['Comentario'], df['Categoría'], df['Tipo'], new_rows)):
+            if pd.isna(category):
                 continue
-                
-            text = self.clean_text(row['Comentario'])
+            learn = new and category != 'Otros'
+            if not learn and pd.isna(type_name):
+                continue
+            
+            text = self.clean_text(comment)
+            components = self.component_scores(text, category, type_name)
+            if not pd.isna(type_name):
+                scores[i] = [components[component] for component in ComponentMeans.COMPONENTS]
+            if not learn:
+                continue
+            
+            effectiveness.setdefault(category, ComponentMeans()).add(components)
+            
+            # Agregar palabras como sinónimos si aparecen juntas en el mismo comentario
             words = text.split()
+            long_words = {word for word in words if len(word) > 3}
+            if len(long_words) > 1:
+                for word in long_words:
+                    new_synonyms[word].update(long_words - {word})
             
             # Contar coocurrencias de palabras con categorías
             for word in words:
                 if len(word) > 3 and word not in self.stopwords:
                     new_cooccurrences[word][category] += 1
         
-        # Convertir a diccionario normal
-        cooccurrences_dict = {k: dict(v) for k, v in new_cooccurrences.items()}
-        
-        # Combinar con coocurrencias existentes
-        for word, cats in cooccurrences_dict.items():
-            if word in self.cooccurrences:
-                for cat, count in cats.items():
-                    self.cooccurrences[word][cat] = self.cooccurrences[word].get(cat, 0) + count
-            else:
-                self.cooccurrences[word] = cats
-        
-        # Guardar coocurrencias actualizadas
-        self._save_cooccurrences(self.cooccurrences)
+        # Combinar con lo guardado (solo si hubo filas nuevas)
+        if new_synonyms:
+            self._save_synonyms(new_synonyms)
+        if new_cooccurrences:
+            self._save_cooccurrences(new_cooccurrences)
+        if effectiveness:
+            self._save_effectiveness(effectiveness)
+        return scores
 
     def clean_text(self, text: str) -> str:
         """Limpia el texto del comentario."""
-        if not isinstance(text, str):
-            return ""
+        return normalize_text(text)
+
+    @lru_cache(maxsize=10000)
+    def scan_context(self, text: str) -> ContextSpans:
+        """
+        Encuentra en un solo recorrido las negaciones, intensificadores y emociones del texto.
         
-        text = text.lower().translate(self.accents_table)
-        text = self.text_cleaner.sub(' ', text)
-        text = self.space_cleaner.sub(' ', text)
+        Args:
+            text (str): Texto limpio del comentario
+            
+        Returns:
+            ContextSpans: Fin de cada negación e intensificador (ordenados) y si hay emoción
+        """
+        negation_ends, intensity_ends = [], []
+        has_emotion = False
+        for match in self.context_span_regex.finditer(text):
+            if match.group('neg') is not None:
+                negation_ends.append(match.end('neg'))
+            if match.group('int') is not None:
+                intensity_ends.append(match.end('int'))
+            if match.group('emo') is not None:
+                has_emotion = True
+        negation_ends.sort()
+        intensity_ends.sort()
+        return ContextSpans(negation_ends, intensity_ends, has_emotion)
+    
+    @staticmethod
+    def _modifier_before(ends: List[int], position: int, window: Optional[int]) -> bool:
+        """
+        Verifica si algún modificador termina antes de una posición.
         
-        return text.strip()
-
-    def has_negation(self, text: str, keyword: str) -> bool:
+        Args:
+            ends (List[int]): Fin de cada modificador, ordenados
+            position (int): Posición de la palabra clave
+            window (int, optional): Distancia máxima en caracteres entre el modificador y
+                la palabra clave (None considera todo el texto anterior)
+        """
+        index = bisect_right(ends, position)
+        if index == 0:
+            return False
+        return window is None or position - ends[index - 1] <= window
+    
+    def has_negation(self, text: str, keyword: str, window: Optional[int] = None) -> bool:
         """Verifica si hay una negación antes de la palabra clave."""
         keyword_pos = text.find(keyword)
         if keyword_pos == -1:
             return False
         
-        text_before = text[:keyword_pos]
-        return bool(self.negation_regex.search(text_before))
+        return self._modifier_before(self.scan_context(text).negation_ends, keyword_pos, window)
     
-    def has_intensity(self, text: str, keyword: str) -> bool:
+    def has_intensity(self, text: str, keyword: str, window: Optional[int] = None) -> bool:
         """Verifica si hay un intensificador antes de la palabra clave."""
         keyword_pos = text.find(keyword)
         if keyword_pos == -1:
             return False
         
-        text_before = text[:keyword_pos]
-        return bool(self.intensity_regex.search(text_before))
+        return self._modifier_before(self.scan_context(text).intensity_ends, keyword_pos, window)
     
     def has_emotion(self, text: str) -> bool:
         """Verifica si hay palabras de emoción en el texto."""
-        return bool(self.emotion_regex.search(text))
+        return self.scan_context(text).has_emotion
     
     def get_synonyms(self, word: str) -> List[str]:
         """Obtiene los sinónimos de una palabra."""
-        return self.synonyms.get(word, [])
+        return self.synonyms.get(word)
     
     def get_category_cooccurrence(self, word: str, category: str) -> int:
         """Obtiene la coocurrencia de una palabra con una categoría."""
-        if word in self.cooccurrences and category in self.cooccurrences[word]:
-            return self.cooccurrences[word][category]
-        return 0
+        return self.cooccurrences.get(word, category)
     
     def get_additional_context_score(self, text: str, category: str) -> float:
         """Calcula el puntaje basado en patrones de contexto adicionales."""
@@ -413,12 +554,14 @@ class CategorizationAnalyzer:
         """Calcula el puntaje basado en palabras clave."""
         score = 0.0
         words = set(text.split())
+        spans = self.scan_context(text)
         
         # Puntaje por palabras clave
         for keyword in self.keywords[category]:
-            if keyword in text:
+            keyword_pos = text.find(keyword)
+            if keyword_pos != -1:
                 # Verificar si hay negación
-                if self.has_negation(text, keyword):
+                if self._modifier_before(spans.negation_ends, keyword_pos, self.modifier_window):
                     score -= 1.0  # Penalización por negación
                 else:
                     score += 1.5  # Aumentado de 1.0 a 1.5
@@ -427,7 +570,7 @@ class CategorizationAnalyzer:
                         score += 1.0  # Aumentado de 0.5 a 1.0
                     
                     # Bonus por intensidad
-                    if self.has_intensity(text, keyword):
+                    if self._modifier_before(spans.intensity_ends, keyword_pos, self.modifier_window):
                         score += 0.5
                     
                     # Bonus por sinónimos
@@ -501,14 +644,39 @@ class CategorizationAnalyzer:
         Returns:
             float: Score de confianza entre 0 y 1
         """
-        text = self.clean_text(row['Comentario'])
-        category = row['Categoría']
-        type_name = row['Tipo']
+        return self.confidence_score(row['Comentario'], row['Categoría'], row['Tipo'])
+    
+    def confidence_score(self, comment: str, category: Optional[str], type_name: Optional[str]) -> float:
+        """
+        Calcula el score de confianza de un comentario con su categoría y tipo.
         
+        Args:
+            comment (str): Comentario original
+            category (str, optional): Categoría asignada
+            type_name (str, optional): Tipo asignado
+            
+        Returns:
+            float: Score de confianza entre 0 y 1
+        """
         # Si no hay categoría o tipo, confianza mínima
         if pd.isna(category) or pd.isna(type_name):
             return 0.0
         
+        text = self.clean_text(comment)
+        return self._weighted_confidence(category, self.component_scores(text, category, type_name))
+    
+    def component_scores(self, text: str, category: str, type_name: Optional[str]) -> Dict[str, float]:
+        """
+        Calcula los puntajes normalizados de palabra clave, contexto y tipo.
+        
+        Args:
+            text (str): Texto limpio del comentario
+            category (str): Categoría asignada
+            type_name (str, optional): Tipo asignado
+            
+        Returns:
+            Dict[str, float]: Puntaje normalizado de cada componente
+        """
         # Calcular diferentes componentes del score
         keyword_score = self.calculate_keyword_score(text, category)
         context_score = self.calculate_context_score(text, category, type_name)
@@ -519,18 +687,22 @@ class CategorizationAnalyzer:
         max_context_score = 4.0
         max_type_score = len(self.type_keywords.get(type_name, [])) * 1.5
         
-        normalized_keyword = keyword_score / max_keyword_score if max_keyword_score > 0 else 0
-        normalized_context = context_score / max_context_score if max_context_score > 0 else 0
-        normalized_type = type_score / max_type_score if max_type_score > 0 else 0
-        
+        return {
+            'keyword': keyword_score / max_keyword_score if max_keyword_score > 0 else 0,
+            'context': context_score / max_context_score if max_context_score > 0 else 0,
+            'type': type_score / max_type_score if max_type_score > 0 else 0
+        }
+    
+    def _weighted_confidence(self, category: str, scores: Dict[str, float]) -> float:
+        """Pondera los puntajes normalizados con los pesos de la categoría."""
         # Obtener pesos específicos para la categoría
         weights = self.learned_weights.get(category, self.category_weights[category])
         
         # Ponderar componentes con pesos específicos
         final_score = (
-            weights['keyword'] * normalized_keyword +
-            weights['context'] * normalized_context +
-            weights['type'] * normalized_type
+            weights['keyword'] * scores['keyword'] +
+            weights['context'] * scores['context'] +
+            weights['type'] * scores['type']
         )
         
         # Aplicar factor de escala para aumentar scores
@@ -538,13 +710,19 @@ class CategorizationAnalyzer:
         
         return min(1.0, final_score)  # Asegurar que no exceda 1.0
 
-    def analyze_categorizations(self, input_file: str, output_file: str) -> None:
+    def analyze_categorizations(self, input_file: str, output_file: str, run_id: Optional[str] = None) -> None:
         """
         Analiza las categorizaciones y agrega el score de confianza.
         
+        Solo se aprende de las filas que no se aprendieron antes (ver
+        learn_and_score), por lo que repetir el análisis de los mismos datos no
+        modifica lo aprendido.
+        
         Args:
             input_file (str): Ruta al archivo de entrada con las categorizaciones
             output_file (str): Ruta al archivo de salida con los scores
+            run_id (str, optional): Identificador de la ejecución para las huellas de
+                las filas; por defecto el nombre del archivo de entrada
         """
         try:
             # Leer archivo de entrada
@@ -556,13 +734,17 @@ class CategorizationAnalyzer:
             if not all(col in df.columns for col in required_columns):
                 raise ValueError(f"El archivo debe contener las columnas: {required_columns}")
             
-            # Actualizar pesos basado en datos existentes
-            print("\nActualizando pesos de categorías...")
-            self._update_weights(df)
+            # Aprender de las filas nuevas y puntuar todas en un solo recorrido
+            print("\nActualizando aprendizaje y calculando scores de confianza...")
+            scores, learned = self.learn_and_score(df, run_id or Path(input_file).name)
+            print(f"Filas nuevas aprendidas: {learned} de {len(df)}")
             
-            # Calcular scores de confianza
-            print("Calculando scores de confianza...")
-            df['Confianza'] = df.apply(self.calculate_confidence_score, axis=1)
+            # Ponderar con los pesos ya actualizados
+            df['Confianza'] = [
+                self._weighted_confidence(category, dict(zip(ComponentMeans.COMPONENTS, row_scores)))
+                if not np.isnan(row_scores[0]) else 0.0
+                for category, row_scores in zip(df['Categoría'], scores)
+            ]
             
             # Guardar resultados
             print("Guardando resultados...")
@@ -0,0 +1,337 @@
+"""
+Almacenamiento columnar de los artefactos aprendidos por el analizador.
+
+Los sinónimos y las coocurrencias se guardan como una matriz dispersa CSR
+(palabra × columna) en arreglos .npy que se cargan de forma diferida y mapeados
+en memoria, en lugar de diccionarios anidados en JSON que se leen completos en
+cada construcción del analizador.
+
+La matriz se compone de segmentos: cada combinación de conteos nuevos agrega un
+segmento con solo esos conteos, y las consultas suman los de todos los
+segmentos. Para que la cantidad de segmentos no crezca sin límite, mientras el
+último tenga al menos la mitad de entradas que el anterior se combinan ambos
+(compactación escalonada), de modo que el costo de cada guardado es
+proporcional a lo nuevo salvo por compactaciones cada vez menos frecuentes.
+
+Cada guardado escribe los segmentos nuevos en subdirectorios, los sincroniza
+con el disco y luego cambia de forma atómica el archivo CURRENT que los enumera,
+de modo que ni una caída deja a CURRENT apuntando a arreglos incompletos ni los
+lectores que ya tienen mapeada una versión anterior se ven afectados. Los segmentos de la
+versión anterior se conservan hasta el guardado siguiente para los lectores que
+estén cargándola; si aun así desaparecen, la carga se reintenta con la vigente.
+
+LearnedRows registra las huellas de las filas de las que ya se aprendió, para
+que volver a analizar los mismos datos no vuelva a sumar sus conteos.
+"""
+
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from src.data_preparation.atomic_io import atomic_write_npy, atomic_write_text, file_lock, fsync_directory
+
+# Arreglos que componen un segmento
+ARRAY_NAMES = ('vocab', 'columns', 'indptr', 'indices', 'data')
+
+# Intentos de carga si un guardado concurrente elimina los segmentos leídos
+LOAD_ATTEMPTS = 5
+
+class LearnedMatrix:
+    """Matriz dispersa palabra × columna persistida en segmentos de arreglos .npy."""
+    
+    # Si es True solo se registra la presencia (conteo 1) de cada par palabra-columna
+    BINARY = False
+    
+    def __init__(self, directory: str, legacy_file: Optional[str] = None):
+        """
+        Args:
+            directory (str): Directorio del almacén
+            legacy_file (str, optional): JSON del formato anterior a migrar si el almacén no existe
+        """
+        self.directory = Path(directory)
+        self.legacy_file = legacy_file
+        self._segments = None
+        # Subdirectorio de cada segmento (None si todavía no se guardó)
+        self._names = None
+    
+    def current_segments(self) -> List[str]:
+        """Retorna los subdirectorios de los segmentos vigentes, del más antiguo al más nuevo."""
+        pointer = self.directory / 'CURRENT'
+        if not pointer.exists():
+            return []
+        return pointer.read_text(encoding='utf-8').split()
+    
+    def _read_segment(self, name: str) -> Dict[str, np.ndarray]:
+        """Mapea en memoria los arreglos de un segmento guardado."""
+        return {
+            array_name: np.load(self.directory / name / f'{array_name}.npy', mmap_mode='r', allow_pickle=False)
+            for array_name in ARRAY_NAMES
+        }
+    
+    def _load(self) -> None:
+        """
+        Carga (mapeando en memoria) los segmentos vigentes o migra el JSON anterior.
+        
+        Un guardado concurrente puede eliminar segmentos entre la lectura de
+        CURRENT y la de sus arreglos; en ese caso se vuelve a leer CURRENT.
+        """
+        for attempt in range(LOAD_ATTEMPTS):
+            names = self.current_segments()
+            try:
+                segments = [self._read_segment(name) for name in names]
+                break
+            except FileNotFoundError:
+                if attempt == LOAD_ATTEMPTS - 1:
+                    raise
+        self._segments, self._names = segments, names
+        if not names and self.legacy_file and os.path.exists(self.legacy_file):
+            with open(self.legacy_file, 'r') as f:
+                self.merge(self._from_legacy(json.load(f)))
+    
+    @property
+    def segments(self) -> List[Dict[str, np.ndarray]]:
+        """Arreglos CSR de cada segmento (se cargan en el primer acceso)."""
+        if self._segments is None:
+            self._load()
+        return self._segments
+    
+    def _from_legacy(self, legacy: Dict) -> Dict[str, Dict[str, int]]:
+        """Convierte el contenido del JSON anterior al formato de merge."""
+        return legacy
+    
+    def __len__(self) -> int:
+        segments = self.segments
+        if not segments:
+            return 0
+        return len(np.unique(np.concatenate([segment['vocab'] for segment in segments])))
+    
+    @staticmethod
+    def _find(values: np.ndarray, value) -> Optional[int]:
+        """Posición de un valor en un arreglo ordenado (búsqueda binaria)."""
+        position = int(np.searchsorted(values, value))
+        if position < len(values) and values[position] == value:
+            return position
+        return None
+    
+    def _rows(self, word: str) -> Iterator[Tuple[Dict[str, np.ndarray], int, int]]:
+        """Rango (inicio, fin) de la fila de la palabra en cada segmento que la contiene."""
+        for segment in self.segments:
+            row = self._find(segment['vocab'], word)
+            if row is not None:
+                yield segment, int(segment['indptr'][row]), int(segment['indptr'][row + 1])
+    
+    def row_items(self, word: str) -> Dict[str, int]:
+        """Retorna las columnas y conteos de una palabra."""
+        items = {}
+        for segment, start, end in self._rows(word):
+            columns = segment['columns'][segment['indices'][start:end]].tolist()
+            for column, count in zip(columns, segment['data'][start:end].tolist()):
+                items[column] = 1 if self.BINARY else items.get(column, 0) + count
+        return items
+    
+    def _build(self, vocab: np.ndarray, columns: np.ndarray, rows: np.ndarray,
+               cols: np.ndarray, data: np.ndarray) -> Dict[str, np.ndarray]:
+        """Arma un segmento CSR a partir de coordenadas (se suman las repetidas)."""
+        from scipy.sparse import coo_matrix
+        
+        matrix = coo_matrix((data, (rows, cols)), shape=(len(vocab), len(columns))).tocsr()
+        matrix.sum_duplicates()
+        matrix.sort_indices()
+        if self.BINARY:
+            matrix.data[:] = 1
+        return {
+            'vocab': vocab,
+            'columns': columns,
+            'indptr': matrix.indptr.astype(np.int64),
+            'indices': matrix.indices.astype(np.int32),
+            'data': matrix.data.astype(np.int32)
+        }
+    
+    def _from_updates(self, updates: Dict[str, Dict[str, int]]) -> Dict[str, np.ndarray]:
+        """Arma un segmento solo con los conteos nuevos."""
+        words, cols, data = [], [], []
+        for word, counts in updates.items():
+            for column, count in counts.items():
+                words.append(word)
+                cols.append(column)
+                data.append(count)
+        vocab, row_codes = np.unique(np.array(words, dtype=str), return_inverse=True)
+        columns, col_codes = np.unique(np.array(cols, dtype=str), return_inverse=True)
+        return self._build(vocab, columns, row_codes, col_codes, np.array(data, dtype=np.int64))
+    
+    def _combine(self, segments: List[Dict[str, np.ndarray]]) -> Dict[str, np.ndarray]:
+        """Combina varios segmentos en uno, reubicando cada uno en el vocabulario y columnas comunes."""
+        vocab = np.unique(np.concatenate([segment['vocab'] for segment in segments]))
+        columns = np.unique(np.concatenate([segment['columns'] for segment in segments]))
+        rows = np.concatenate([
+            np.repeat(np.searchsorted(vocab, segment['vocab']), np.diff(segment['indptr']))
+            for segment in segments
+        ])
+        cols = np.concatenate([
+            np.searchsorted(columns, segment['columns'])[segment['indices']] for segment in segments
+        ])
+        data = np.concatenate([np.asarray(segment['data'], dtype=np.int64) for segment in segments])
+        return self._build(vocab, columns, rows, cols, data)
+    
+    def merge(self, updates: Dict[str, Dict[str, int]]) -> None:
+        """
+        Suma conteos nuevos a la matriz.
+        
+        Se agregan como un segmento propio y luego, mientras el último segmento
+        tenga al menos la mitad de entradas que el anterior, se combinan los dos.
+        
+        Args:
+            updates (Dict[str, Dict[str, int]]): palabra -> columna -> conteo
+        """
+        if not updates:
+            return
+        segments, names = self.segments, self._names
+        segments.append(self._from_updates(updates))
+        names.append(None)
+        while len(segments) > 1 and 2 * len(segments[-1]['data']) >= len(segments[-2]['data']):
+            segments[-2:] = [self._combine(segments[-2:])]
+            names[-2:] = [None]
+    
+    def save(self) -> None:
+        """Escribe los segmentos nuevos y activa la lista vigente de forma atómica."""
+        segments = self.segments
+        self.directory.mkdir(parents=True, exist_ok=True)
+        previous = self.current_segments()
+        
+        for position, segment in enumerate(segments):
+            if self._names[position] is not None:
+                continue
+            name = f'gen-{time.time_ns()}-{os.getpid()}-{position}'
+            generation = self.directory / name
+            generation.mkdir()
+            for array_name in ARRAY_NAMES:
+                atomic_write_npy(str(generation / f'{array_name}.npy'), segment[array_name])
+            self._names[position] = name
+        
+        # CURRENT solo se reemplaza cuando los segmentos nuevos ya están en disco
+        fsync_directory(str(self.directory))
+        atomic_write_text(str(self.directory / 'CURRENT'), '\n'.join(self._names))
+        
+        # Eliminar segmentos que no son vigentes ni de la versión previa, que puede estar
+        # cargándose (quien ya los tenga mapeados conserva su copia)
+        keep = set(self._names) | set(previous)
+        for old_generation in self.directory.glob('gen-*'):
+            if old_generation.name not in keep:
+                shutil.rmtree(old_generation, ignore_errors=True)
+    
+    def merge_and_save(self, updates: Dict[str, Dict[str, int]]) -> None:
+        """
+        Combina conteos nuevos con la última versión guardada y la reemplaza.
+        
+        Bajo bloqueo se vuelven a cargar los segmentos vigentes (que pueden haber
+        sido escritos por otra ejecución), se suman las actualizaciones y se guarda,
+        de modo que las ejecuciones concurrentes no pierden sus aportes.
+        
+        Args:
+            updates (Dict[str, Dict[str, int]]): palabra -> columna -> conteo
+        """
+        with file_lock(str(self.directory)):
+            self._segments = None
+            self.merge(updates)
+            self.save()
+
+class CooccurrenceStore(LearnedMatrix):
+    """Conteos de coocurrencia palabra -> categoría."""
+    
+    def get(self, word: str, category: str) -> int:
+        """Retorna cuántas veces la palabra apareció en comentarios de la categoría."""
+        total = 0
+        for segment, start, end in self._rows(word):
+            column = self._find(segment['columns'], category)
+            if column is None:
+                continue
+            position = self._find(segment['indices'][start:end], column)
+            if position is not None:
+                total += int(segment['data'][start + position])
+        return total
+
+class SynonymStore(LearnedMatrix):
+    """Relación palabra -> palabras que aparecieron junto a ella."""
+    
+    BINARY = True
+    
+    def _from_legacy(self, legacy: Dict) -> Dict[str, Dict[str, int]]:
+        return {word: {synonym: 1 for synonym in synonyms} for word, synonyms in legacy.items()}
+    
+    def get(self, word: str) -> List[str]:
+        """Retorna los sinónimos registrados de una palabra."""
+        return list(self.row_items(word))
+    
+    def add(self, synonyms: Dict[str, Iterable[str]], save: bool = False) -> None:
+        """
+        Agrega sinónimos nuevos (unión con los existentes).
+        
+        Args:
+            synonyms (Dict[str, Iterable[str]]): palabra -> sinónimos
+            save (bool): Si es True combina con lo guardado y persiste (ver merge_and_save)
+        """
+        updates = {word: {synonym: 1 for synonym in words} for word, words in synonyms.items()}
+        if save:
+            self.merge_and_save(updates)
+        else:
+            self.merge(updates)
+
+class LearnedRows:
+    """
+    Huellas de 64 bits de las filas de las que el analizador ya aprendió.
+    
+    Se guardan ordenadas en un único arreglo .npy, que se reemplaza de forma
+    atómica al agregar huellas nuevas.
+    """
+    
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): Archivo .npy de las huellas
+        """
+        self.path = Path(path)
+        self._hashes: Optional[np.ndarray] = None
+    
+    def _read(self) -> np.ndarray:
+        if not self.path.exists():
+            return np.array([], dtype=np.uint64)
+        return np.load(self.path, allow_pickle=False)
+    
+    @property
+    def hashes(self) -> np.ndarray:
+        """Huellas registradas (ordenadas)."""
+        if self._hashes is None:
+            self._hashes = self._read()
+        return self._hashes
+    
+    def __len__(self) -> int:
+        return len(self.hashes)
+    
+    def new_mask(self, hashes: np.ndarray) -> np.ndarray:
+        """Indica cuáles de las huellas todavía no están registradas."""
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        stored = self.hashes
+        positions = np.searchsorted(stored, hashes)
+        known = positions < len(stored)
+        known[known] = stored[positions[known]] == hashes[known]
+        return ~known
+    
+    def add(self, hashes: np.ndarray) -> None:
+        """
+        Registra huellas nuevas.
+        
+        Bajo bloqueo se vuelve a leer el archivo (que puede haber escrito otra
+        ejecución) y se guarda la unión.
+        """
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        if not len(hashes):
+            return
+        with file_lock(str(self.path)):
+            merged = np.union1d(self._read(), hashes)
+            atomic_write_npy(str(self.path), merged)
+        self._hashes = merged
@@ -0,0 +1,142 @@
+"""
+Escritura atómica y bloqueo de archivos compartidos entre ejecuciones.
+
+Los archivos de aprendizaje, de pesos y los arreglos aprendidos se escriben
+primero en un archivo temporal del mismo directorio, se sincronizan con el disco
+y luego se renombran sobre el destino, de modo que una ejecución interrumpida (o
+una caída del sistema) nunca deja un archivo a medio escribir. El bloqueo
+consultivo permite que ejecuciones concurrentes hagan lectura-combinación-escritura
+sin perder las actualizaciones de las demás.
+"""
+
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import Any
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+@contextmanager
+def file_lock(path: str):
+    """
+    Bloqueo exclusivo consultivo asociado a una ruta.
+    
+    Se bloquea el archivo auxiliar '<path>.lock', no el archivo de datos, para
+    que el renombrado atómico del archivo de datos no invalide el bloqueo.
+    
+    Args:
+        path (str): Ruta del archivo (o directorio) a proteger
+    """
+    lock_path = f'{path}.lock'
+    os.makedirs(os.path.dirname(os.path.abspath(lock_path)), exist_ok=True)
+    with open(lock_path, 'a+') as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        else:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+def fsync_directory(path: str) -> None:
+    """
+    Sincroniza un directorio para que sus entradas creadas o renombradas
+    sobrevivan a una caída del sistema (en Windows no se pueden abrir
+    directorios y no hace nada).
+    
+    Args:
+        path (str): Ruta del directorio
+    """
+    if os.name != 'posix':
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+@contextmanager
+def _atomic_file(path: str, mode: str):
+    """
+    Archivo temporal del mismo directorio que reemplaza al destino al cerrarse.
+    
+    El contenido se sincroniza antes del renombrado y el directorio después, así
+    que tras una caída el destino tiene el contenido anterior o el nuevo completo.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f'.{os.path.basename(path)}.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, mode, encoding=None if 'b' in mode else 'utf-8') as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    fsync_directory(directory)
+
+def atomic_write_json(path: str, data: Any, **dump_kwargs) -> None:
+    """
+    Escribe un JSON en un archivo temporal y lo renombra sobre el destino.
+    
+    Args:
+        path (str): Ruta del archivo de destino
+        data (Any): Contenido serializable
+        **dump_kwargs: Argumentos adicionales para json.dump
+    """
+    with _atomic_file(path, 'w') as f:
+        json.dump(data, f, **dump_kwargs)
+
+def atomic_write_text(path: str, text: str) -> None:
+    """
+    Escribe un texto en un archivo temporal y lo renombra sobre el destino.
+    
+    Args:
+        path (str): Ruta del archivo de destino
+        text (str): Contenido
+    """
+    with _atomic_file(path, 'w') as f:
+        f.write(text)
+
+def atomic_write_npy(path: str, array: np.ndarray) -> None:
+    """
+    Guarda un arreglo .npy en un archivo temporal y lo renombra sobre el destino.
+    
+    Args:
+        path (str): Ruta del archivo de destino
+        array (np.ndarray): Arreglo a guardar (sin objetos de Python)
+    """
+    with _atomic_file(path, 'wb') as f:
+        np.save(f, np.asarray(array), allow_pickle=False)
+
+def read_json(path: str, default: Any = None) -> Any:
+    """
+    Lee un JSON, retornando un valor por defecto si el archivo no existe.
+    
+    Args:
+        path (str): Ruta del archivo
+        default (Any): Valor a retornar si el archivo no existe
+    
+    Returns:
+        Any: Contenido del archivo o el valor por defecto
+    """
+    if not os.path.exists(path):
+        return default
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
@@ -0,0 +1,77 @@
+"""
+Tamaño de lote adaptativo para el procesamiento de archivos.
+
+El tamaño de cada lote se ajusta según la latencia medida de los lotes
+anteriores, para que cada uno tarde aproximadamente un tiempo objetivo, y se
+limita según la memoria que ocupan las filas, de modo que el mismo código sirva
+para pruebas de mil filas y para cargas de millones.
+"""
+
+from typing import Optional
+
+# Tiempo objetivo por lote (segundos)
+TARGET_BATCH_SECONDS = 1.0
+
+# Memoria máxima de las filas de entrada de un lote (MB)
+MAX_BATCH_MEMORY_MB = 256
+
+# Límites del tamaño de lote
+MIN_BATCH_SIZE = 100
+MAX_BATCH_SIZE = 100000
+
+# Factor máximo de cambio entre un lote y el siguiente
+MAX_GROWTH = 2.0
+
+class BatchSizer:
+    """Calcula el tamaño del próximo lote a partir de las mediciones de los anteriores."""
+    
+    def __init__(self, initial_size: int = 1000, target_seconds: Optional[float] = TARGET_BATCH_SECONDS,
+                 max_memory_mb: Optional[float] = MAX_BATCH_MEMORY_MB,
+                 min_size: int = MIN_BATCH_SIZE, max_size: int = MAX_BATCH_SIZE):
+        """
+        Args:
+            initial_size (int): Tamaño del primer lote
+            target_seconds (float, optional): Tiempo objetivo por lote; None mantiene
+                el tamaño fijo
+            max_memory_mb (float, optional): Memoria máxima de las filas de un lote
+            min_size (int): Tamaño mínimo de lote
+            max_size (int): Tamaño máximo de lote
+        """
+        self.size = max(1, initial_size)
+        self.target_seconds = target_seconds
+        self.max_memory_bytes = max_memory_mb * 2 ** 20 if max_memory_mb else None
+        self.min_size = min(min_size, self.size)
+        self.max_size = max(max_size, self.size)
+    
+    @property
+    def adaptive(self) -> bool:
+        """Indica si el tamaño se ajusta según las mediciones."""
+        return self.target_seconds is not None
+    
+    def next_size(self) -> int:
+        """Tamaño del próximo lote."""
+        return self.size
+    
+    def record(self, rows: int, seconds: float, memory_bytes: Optional[int] = None) -> None:
+        """
+        Registra la medición de un lote y ajusta el tamaño del siguiente.
+        
+        El cambio se limita a un factor MAX_GROWTH por lote para suavizar la
+        variación entre lotes.
+        
+        Args:
+            rows (int): Filas del lote
+            seconds (float): Tiempo que tomó el lote
+            memory_bytes (int, optional): Memoria de las filas de entrada del lote
+        """
+        if not self.adaptive or rows <= 0:
+            return
+        
+        size = self.size * MAX_GROWTH
+        if seconds > 0:
+            size = rows / seconds * self.target_seconds
+        if memory_bytes and self.max_memory_bytes:
+            size = min(size, self.max_memory_bytes / (memory_bytes / rows))
+        
+        size = min(max(size, self.size / MAX_GROWTH), self.size * MAX_GROWTH)
+        self.size = int(min(max(size, self.min_size), self.max_size))
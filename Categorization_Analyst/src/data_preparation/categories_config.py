@@ -120,4 +120,17 @@ TYPE_KEYWORDS = {
     'Cambio': ['cambiar', 'modificar', 'alterar', 'cambio'],
     'Política': ['política', 'norma', 'regla', 'condición'],
     'General': ['general', 'otro', 'varios', 'diversos']
-} 
\ No newline at end of file
+} 
+
+# Palabras vacías: un comentario compuesto solo por ellas no aporta información
+# para la categorización y se envía directamente a Otros
+STOPWORDS = [
+    'a', 'al', 'algo', 'algunas', 'algunos', 'ante', 'antes', 'bien', 'bueno', 'buena', 'como',
+    'con', 'contra', 'cual', 'cuando', 'de', 'del', 'desde', 'donde', 'durante', 'e', 'el',
+    'ella', 'ellas', 'ellos', 'en', 'entre', 'era', 'es', 'esa', 'esas', 'ese', 'eso', 'esos',
+    'esta', 'estas', 'este', 'esto', 'estos', 'excelente', 'fue', 'gracias', 'ha', 'han', 'hasta',
+    'hay', 'la', 'las', 'le', 'les', 'lo', 'los', 'mas', 'me', 'mi', 'mis', 'mucho', 'muy', 'na',
+    'nada', 'ni', 'no', 'nos', 'o', 'ok', 'otra', 'otro', 'para', 'pero', 'poco', 'por', 'porque',
+    'que', 'se', 'ser', 'si', 'sin', 'sobre', 'son', 'su', 'sus', 'también', 'te', 'todo', 'todos',
+    'tu', 'un', 'una', 'uno', 'unos', 'y', 'ya', 'yo'
+]
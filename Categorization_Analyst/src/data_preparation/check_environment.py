@@ -2,16 +2,16 @@
 Script para validar el entorno y las dependencias necesarias.
 """
 
+import hashlib
+import os
 import sys
 import logging
 from pathlib import Path
-from importlib.metadata import version, PackageNotFoundError
 
-# Configuración de logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+from .atomic_io import atomic_write_json, read_json
+
+# Resultado en caché de la verificación de paquetes
+ENVIRONMENT_CACHE_FILE = Path(__file__).parent.parent.parent / 'data' / 'cache' / 'environment_check.json'
 
 def check_python_version():
     """Verifica la versión de Python."""
@@ -23,8 +23,34 @@ def check_python_version():
         return False
     return True
 
-def check_required_packages():
-    """Verifica las dependencias requeridas."""
+def environment_key() -> str:
+    """
+    Identifica el intérprete y el estado de sus directorios de paquetes.
+    
+    Instalar, actualizar o desinstalar un paquete modifica la fecha de su
+    directorio site-packages, lo que cambia la clave e invalida la caché.
+    """
+    entries = [sys.executable, sys.version]
+    for path in sys.path:
+        if os.path.basename(path) in ('site-packages', 'dist-packages') and os.path.isdir(path):
+            entries.append(f'{path}:{os.stat(path).st_mtime_ns}')
+    return hashlib.sha256('\n'.join(entries).encode('utf-8')).hexdigest()
+
+def check_required_packages(use_cache: bool = True):
+    """
+    Verifica las dependencias requeridas.
+    
+    Una verificación exitosa se guarda en caché para el mismo intérprete y
+    directorios de paquetes, y no se repite en las ejecuciones siguientes.
+    """
+    key = environment_key()
+    if use_cache:
+        cached = read_json(str(ENVIRONMENT_CACHE_FILE), {})
+        if cached.get('key') == key:
+            return []
+    
+    from importlib.metadata import version, PackageNotFoundError
+    
     required_packages = {
         'pandas': '1.5.0',
         'numpy': '1.21.0',
@@ -42,6 +68,11 @@ def check_required_packages():
             logging.error(f"El paquete {package} no está instalado")
             missing_packages.append(f"{package}>={required_version}")
     
+    if not missing_packages:
+        try:
+            atomic_write_json(str(ENVIRONMENT_CACHE_FILE), {'key': key})
+        except OSError as e:
+            logging.warning(f"No se pudo guardar la caché de la verificación del entorno: {str(e)}")
     return missing_packages
 
 def check_file_structure():
@@ -114,4 +145,8 @@ def main():
     return True
 
 if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
     main() 
\ No newline at end of file
@@ -0,0 +1,124 @@
+"""
+Puntos de control para reanudar procesamientos largos de comentarios.
+
+Cada lote completado se guarda como un archivo parcial y un manifiesto registra
+el desplazamiento del último lote terminado junto con un hash de la
+configuración, de modo que una ejecución interrumpida pueda continuar donde quedó.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict
+
+import pandas as pd
+
+from .atomic_io import atomic_write_json, read_json
+from .categories_config import CATEGORIES, KEYWORDS, TYPE_KEYWORDS
+from .results import ResultBatch
+
+# Directorio base de los puntos de control
+CHECKPOINT_DIR = 'Categorization_Analyst/data/checkpoints'
+
+def compute_config_hash(input_file: str, settings: Dict) -> str:
+    """
+    Calcula un hash que identifica la entrada y la configuración de un procesamiento.
+    
+    Args:
+        input_file (str): Ruta al archivo de entrada
+        settings (Dict): Parámetros que afectan los resultados (motor, umbrales, etc.)
+    
+    Returns:
+        str: Hash SHA-256 en hexadecimal
+    """
+    stat = os.stat(input_file)
+    payload = {
+        'input_file': os.path.abspath(input_file),
+        'size': stat.st_size,
+        'mtime': stat.st_mtime,
+        'settings': settings,
+        'categories': CATEGORIES,
+        'keywords': KEYWORDS,
+        'type_keywords': TYPE_KEYWORDS
+    }
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+class CheckpointManager:
+    """Guarda y recupera los lotes completados de un procesamiento."""
+    
+    def __init__(self, directory: str, config_hash: str):
+        self.directory = Path(directory)
+        self.config_hash = config_hash
+        self.manifest_file = self.directory / 'manifest.json'
+        self.manifest = self._new_manifest()
+    
+    def _new_manifest(self) -> Dict:
+        """Crea un manifiesto vacío para la configuración actual."""
+        return {
+            'config_hash': self.config_hash,
+            'next_offset': 0,
+            'parts': [],
+            'counters': {},
+            'last_update': datetime.now().isoformat()
+        }
+    
+    def _write_manifest(self) -> None:
+        """Escribe el manifiesto de forma atómica."""
+        self.manifest['last_update'] = datetime.now().isoformat()
+        atomic_write_json(str(self.manifest_file), self.manifest, ensure_ascii=False, indent=2)
+    
+    def load(self) -> int:
+        """
+        Carga el manifiesto existente si corresponde a la misma configuración.
+        
+        Returns:
+            int: Desplazamiento de la primera fila pendiente (0 si no hay nada que reanudar)
+        """
+        if not self.manifest_file.exists():
+            return 0
+        
+        manifest = read_json(str(self.manifest_file))
+        
+        if manifest.get('config_hash') != self.config_hash:
+            logging.warning("El punto de control corresponde a otra entrada o configuración; se descarta")
+            self.clear()
+            return 0
+        
+        self.manifest = manifest
+        return manifest['next_offset']
+    
+    def load_results(self) -> ResultBatch:
+        """Lee los resultados de todos los lotes completados, en orden."""
+        return ResultBatch.concat([ResultBatch.from_frame(pd.read_pickle(self.directory / part))
+                                   for part in self.manifest['parts']])
+    
+    def save_batch(self, offset: int, results: ResultBatch, counters: Dict[str, int]) -> None:
+        """
+        Guarda un lote completado y avanza el manifiesto.
+        
+        Args:
+            offset (int): Fila inicial del lote dentro del archivo de entrada
+            results (ResultBatch): Resultados del lote
+            counters (Dict[str, int]): Contadores acumulados del procesamiento
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        part = f'part-{offset:012d}.pkl'
+        results.to_frame().to_pickle(self.directory / part)
+        
+        self.manifest['parts'].append(part)
+        self.manifest['next_offset'] = offset + len(results)
+        self.manifest['counters'] = dict(counters)
+        self._write_manifest()
+    
+    def clear(self) -> None:
+        """Elimina los archivos parciales y el manifiesto."""
+        if self.directory.exists():
+            for path in self.directory.glob('part-*.pkl'):
+                path.unlink()
+            if self.manifest_file.exists():
+                self.manifest_file.unlink()
+        self.manifest = self._new_manifest()
@@ -0,0 +1,447 @@
+"""
+Motores de categorización intercambiables para CommentProcessor.
+
+Incluye el motor de palabras clave original y un clasificador lineal disperso
+(HashingVectorizer + SGD) entrenado con los ejemplos del sistema de aprendizaje
+y con etiquetas de analistas.
+"""
+
+import abc
+import argparse
+import logging
+import os
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .categories_config import CATEGORIES
+from .results import LABELS, NO_LABEL, OTROS, CategorizationResult
+
+# Ruta por defecto del modelo lineal
+LINEAR_MODEL_FILE = 'Categorization_Analyst/data/models/linear_engine.npz'
+
+# Uno de cada tantos ejemplos se reserva para ajustar la escala de márgenes del motor lineal
+CALIBRATION_FOLDS = 5
+
+class CategorizationEngine(abc.ABC):
+    """Interfaz base de los motores de categorización."""
+    
+    name = 'base'
+    
+    @abc.abstractmethod
+    def predict_batch(self, texts: List[str]) -> List[CategorizationResult]:
+        """
+        Categoriza un lote de comentarios.
+        
+        Args:
+            texts (List[str]): Comentarios originales (sin limpiar)
+        
+        Returns:
+            List[CategorizationResult]: Categoría, subcategoría, tipo (como códigos de
+                LABELS) y margen por comentario, donde el margen es la diferencia entre
+                el mejor y el segundo mejor puntaje de categoría
+        """
+
+class KeywordEngine(CategorizationEngine):
+    """Motor basado en el puntaje de palabras clave y contexto del procesador."""
+    
+    name = 'keyword'
+    
+    def __init__(self, processor):
+        self.processor = processor
+    
+    def predict_batch(self, texts: List[str]) -> List[CategorizationResult]:
+        """Categoriza cada comentario con identify_category_with_margin."""
+        return [self.processor.identify_category_with_margin(text) for text in texts]
+
+class LinearEngine(CategorizationEngine):
+    """
+    Clasificador lineal disperso sobre n-gramas hasheados.
+    
+    La inferencia de cada lote es una sola multiplicación de la matriz dispersa
+    de características por la matriz de coeficientes.
+    
+    Los márgenes de la función de decisión se multiplican por margin_scale, que
+    se ajusta al entrenar para llevarlos a la escala de los márgenes del motor de
+    palabras clave; así el umbral de cascada significa lo mismo con ambos motores.
+    """
+    
+    name = 'linear'
+    
+    def __init__(self, text_cleaner: Callable[[str], str], model_file: str = LINEAR_MODEL_FILE,
+                 n_features: int = 2 ** 18):
+        self.text_cleaner = text_cleaner
+        self.model_file = model_file
+        self.n_features = n_features
+        self.vectorizer = None
+        self.category_classes = None
+        self.category_coef = None
+        self.category_intercept = None
+        self.type_classes = None
+        self.type_coef = None
+        self.type_intercept = None
+        self.allowed_types = None
+        self.category_codes = None
+        self.type_codes = None
+        self.margin_scale = 1.0
+    
+    def _build_vectorizer(self):
+        """Crea el vectorizador (sin estado, solo depende de sus parámetros)."""
+        from sklearn.feature_extraction.text import HashingVectorizer
+        self.vectorizer = HashingVectorizer(
+            n_features=self.n_features,
+            ngram_range=(1, 2),
+            alternate_sign=False,
+            norm='l2'
+        )
+    
+    def _build_allowed_types(self):
+        """Construye la máscara de tipos permitidos para cada categoría."""
+        type_index = {type_name: i for i, type_name in enumerate(self.type_classes)}
+        self.allowed_types = np.zeros((len(self.category_classes), len(self.type_classes)), dtype=bool)
+        for i, category in enumerate(self.category_classes):
+            for type_name in CATEGORIES.get(category, {}).get('types', []):
+                if type_name in type_index:
+                    self.allowed_types[i, type_index[type_name]] = True
+    
+    def _order_classes(self):
+        """
+        Ordena las clases del modelo según la configuración (códigos de LABELS).
+        
+        Así argmax desempata por el orden de la configuración, igual que el motor de
+        palabras clave, en lugar del orden alfabético en que se entrenaron.
+        """
+        order = np.argsort([LABELS.category_code(name) for name in self.category_classes], kind='stable')
+        self.category_classes = self.category_classes[order]
+        self.category_coef = self.category_coef[order]
+        self.category_intercept = self.category_intercept[order]
+        
+        order = np.argsort([LABELS.type_code(name) for name in self.type_classes], kind='stable')
+        self.type_classes = self.type_classes[order]
+        self.type_coef = self.type_coef[order]
+        self.type_intercept = self.type_intercept[order]
+    
+    def _build_label_codes(self):
+        """
+        Traduce las clases del modelo a códigos de LABELS.
+        
+        Los tipos llevan un NO_LABEL al final para que el índice -1 (sin tipo) lo seleccione.
+        """
+        self.category_codes = np.array([LABELS.category_code(name) for name in self.category_classes],
+                                       dtype=np.int16)
+        self.type_codes = np.array([LABELS.type_code(name) for name in self.type_classes] + [NO_LABEL],
+                                   dtype=np.int16)
+    
+    @staticmethod
+    def _fit_linear(X, labels: List[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Entrena un SGDClassifier y retorna (clases, coeficientes, intercepto).
+        
+        En el caso binario se expanden los coeficientes a una fila por clase para
+        que la inferencia sea siempre un argmax sobre columnas.
+        """
+        from sklearn.linear_model import SGDClassifier
+        
+        classifier = SGDClassifier(loss='hinge', alpha=1e-5, max_iter=50, tol=1e-3, random_state=0)
+        classifier.fit(X, labels)
+        coef = classifier.coef_.astype(np.float32)
+        intercept = classifier.intercept_.astype(np.float32)
+        if len(classifier.classes_) == 2:
+            coef = np.vstack([-coef, coef])
+            intercept = np.concatenate([-intercept, intercept])
+        return classifier.classes_.astype(str), coef, intercept
+    
+    @staticmethod
+    def _fit_margin_scale(margins: Sequence[float], reference_margins: Sequence[float]) -> float:
+        """
+        Factor que lleva los márgenes propios a la escala de los de referencia.
+        
+        Se ajusta por mínimos cuadrados sobre los deciles de ambas distribuciones,
+        de modo que la proporción de comentarios bajo un mismo umbral sea similar.
+        """
+        deciles = np.linspace(0.1, 0.9, 9)
+        own = np.quantile(np.asarray(margins, dtype=np.float64), deciles)
+        reference = np.quantile(np.asarray(reference_margins, dtype=np.float64), deciles)
+        denominator = float(own @ own)
+        return float(own @ reference) / denominator if denominator > 0 else 1.0
+    
+    def _calibrate_margin_scale(self, texts: List[str], categories: List[str], types: List[Optional[str]],
+                                reference_margins: Sequence[float]) -> float:
+        """
+        Ajusta margin_scale con márgenes de comentarios no vistos al entrenar.
+        
+        Sobre sus propios ejemplos la pérdida hinge deja márgenes inflados, así que
+        se entrena un modelo provisional sin uno de cada CALIBRATION_FOLDS
+        comentarios y se comparan sus márgenes sobre los reservados.
+        """
+        held_out = np.arange(len(texts)) % CALIBRATION_FOLDS == 0
+        train_rows = np.flatnonzero(~held_out)
+        if len({categories[i] for i in train_rows}) < 2:
+            logging.warning("Muy pocos ejemplos para ajustar la escala de márgenes del motor lineal")
+            return 1.0
+        
+        provisional = LinearEngine(self.text_cleaner, self.model_file, self.n_features)
+        provisional.fit([texts[i] for i in train_rows], [categories[i] for i in train_rows],
+                        [types[i] for i in train_rows])
+        margins = [result.margin for result in
+                   provisional.predict_batch([texts[i] for i in np.flatnonzero(held_out)])]
+        return self._fit_margin_scale(margins, np.asarray(reference_margins)[held_out])
+    
+    def fit(self, texts: List[str], categories: List[str], types: List[Optional[str]],
+            reference_margins: Optional[Sequence[float]] = None) -> None:
+        """
+        Entrena los clasificadores de categoría y de tipo.
+        
+        Args:
+            texts (List[str]): Comentarios originales
+            categories (List[str]): Categoría etiquetada de cada comentario
+            types (List[Optional[str]]): Tipo etiquetado de cada comentario (puede ser nulo)
+            reference_margins (Sequence[float], optional): Márgenes del motor de palabras
+                clave sobre los mismos comentarios, para ajustar margin_scale (sin ellos
+                los márgenes quedan en unidades de la función de decisión)
+        """
+        if len(set(categories)) < 2:
+            raise ValueError("Se necesitan ejemplos de al menos dos categorías para entrenar el motor lineal")
+        
+        self._build_vectorizer()
+        X = self.vectorizer.transform([self.text_cleaner(text) for text in texts])
+        self.category_classes, self.category_coef, self.category_intercept = self._fit_linear(X, categories)
+        
+        typed_rows = [i for i, type_name in enumerate(types) if isinstance(type_name, str) and type_name]
+        typed_labels = [types[i] for i in typed_rows]
+        if len(set(typed_labels)) >= 2:
+            self.type_classes, self.type_coef, self.type_intercept = self._fit_linear(X[typed_rows], typed_labels)
+        else:
+            self.type_classes = np.array(sorted(set(typed_labels)), dtype=str)
+            self.type_coef = np.zeros((len(self.type_classes), self.n_features), dtype=np.float32)
+            self.type_intercept = np.zeros(len(self.type_classes), dtype=np.float32)
+        
+        self._order_classes()
+        self._build_allowed_types()
+        self._build_label_codes()
+        
+        self.margin_scale = 1.0
+        if reference_margins is not None:
+            self.margin_scale = self._calibrate_margin_scale(texts, categories, types, reference_margins)
+    
+    def save(self, model_file: Optional[str] = None) -> None:
+        """Guarda el modelo en formato .npz sin compresión (carga rápida)."""
+        model_file = model_file or self.model_file
+        os.makedirs(os.path.dirname(model_file), exist_ok=True)
+        np.savez(
+            model_file,
+            n_features=np.array(self.n_features),
+            category_classes=self.category_classes,
+            category_coef=self.category_coef,
+            category_intercept=self.category_intercept,
+            type_classes=self.type_classes,
+            type_coef=self.type_coef,
+            type_intercept=self.type_intercept,
+            margin_scale=np.array(self.margin_scale)
+        )
+        logging.info(f"Modelo lineal guardado en: {model_file}")
+    
+    def load(self, model_file: Optional[str] = None) -> None:
+        """Carga el modelo desde un archivo .npz."""
+        model_file = model_file or self.model_file
+        if not os.path.exists(model_file):
+            raise FileNotFoundError(f"No se encontró el modelo lineal: {model_file}")
+        
+        with np.load(model_file, allow_pickle=False) as data:
+            self.n_features = int(data['n_features'])
+            self.category_classes = data['category_classes']
+            self.category_coef = data['category_coef']
+            self.category_intercept = data['category_intercept']
+            self.type_classes = data['type_classes']
+            self.type_coef = data['type_coef']
+            self.type_intercept = data['type_intercept']
+            self.margin_scale = float(data['margin_scale'])
+        
+        self._build_vectorizer()
+        self._order_classes()
+        self._build_allowed_types()
+        self._build_label_codes()
+    
+    def predict_batch(self, texts: List[str]) -> List[CategorizationResult]:
+        """Categoriza el lote con una multiplicación dispersa por clasificador."""
+        if self.vectorizer is None:
+            self.load()
+        if not texts:
+            return []
+        
+        # Las clases están en el orden de la configuración (ver _order_classes), así
+        # que argmax resuelve los empates a favor de la primera
+        X = self.vectorizer.transform([self.text_cleaner(text) for text in texts])
+        category_scores = np.asarray(X @ self.category_coef.T) + self.category_intercept
+        best = np.argmax(category_scores, axis=1)
+        
+        rows = np.arange(len(best))
+        best_scores = category_scores[rows, best]
+        categories = self.category_codes[best]
+        
+        # Segunda mejor categoría como subcategoría (solo si su puntaje es positivo)
+        subcategories = np.full(len(best), NO_LABEL, dtype=np.int16)
+        margins = best_scores
+        if category_scores.shape[1] > 1:
+            masked = category_scores.copy()
+            masked[rows, best] = -np.inf
+            runner_up = np.argmax(masked, axis=1)
+            runner_up_scores = masked[rows, runner_up]
+            margins = best_scores - runner_up_scores
+            subcategories = np.where(runner_up_scores > 0, self.category_codes[runner_up], NO_LABEL)
+            subcategories[subcategories == OTROS] = NO_LABEL
+        
+        best_types = np.full(len(best), -1)
+        if len(self.type_classes):
+            type_scores = np.asarray(X @ self.type_coef.T) + self.type_intercept
+            type_scores = np.where(self.allowed_types[best], type_scores, -np.inf)
+            best_types = np.where(self.allowed_types[best].any(axis=1), np.argmax(type_scores, axis=1), -1)
+        types = self.type_codes[best_types]
+        
+        # Otros no lleva subcategoría ni tipo
+        others = categories == OTROS
+        subcategories[others] = NO_LABEL
+        types[others] = NO_LABEL
+        
+        return list(map(CategorizationResult, categories.tolist(), subcategories.tolist(), types.tolist(),
+                        (margins * self.margin_scale).astype(float).tolist()))
+
+def create_engine(name: str, processor, model_file: Optional[str] = None) -> CategorizationEngine:
+    """
+    Crea un motor de categorización por nombre.
+    
+    Args:
+        name (str): 'keyword' o 'linear'
+        processor: CommentProcessor dueño del motor
+        model_file (str, optional): Ruta al modelo lineal
+    
+    Returns:
+        CategorizationEngine: Motor inicializado
+    """
+    if name == 'keyword':
+        return KeywordEngine(processor)
+    if name == 'linear':
+        engine = LinearEngine(processor.clean_text, model_file or LINEAR_MODEL_FILE)
+        engine.load()
+        return engine
+    raise ValueError(f"Motor de categorización desconocido: {name}")
+
+def collect_training_data(learning_system, labels_file: Optional[str] = None) -> pd.DataFrame:
+    """
+    Reúne los ejemplos de entrenamiento del sistema de aprendizaje y de un
+    archivo etiquetado por analistas.
+    
+    Args:
+        learning_system (LearningSystem): Sistema de aprendizaje con ejemplos
+        labels_file (str, optional): Excel con columnas Comentario, Categoría y Tipo
+    
+    Returns:
+        pd.DataFrame: Columnas text, category y type
+    """
+    rows = [
+        {'text': example['text'], 'category': example['category'], 'type': example.get('type')}
+        for example in learning_system.learning_data['examples']
+    ]
+    frames = [pd.DataFrame(rows, columns=['text', 'category', 'type'])]
+    
+    if labels_file:
+        labels = pd.read_excel(labels_file)
+        required_columns = ['Comentario', 'Categoría']
+        if not all(col in labels.columns for col in required_columns):
+            raise ValueError(f"El archivo de etiquetas debe contener las columnas: {required_columns}")
+        labels = labels.dropna(subset=required_columns)
+        frames.append(pd.DataFrame({
+            'text': labels['Comentario'].astype(str),
+            'category': labels['Categoría'].astype(str),
+            'type': labels['Tipo'] if 'Tipo' in labels.columns else None
+        }))
+    
+    return pd.concat(frames, ignore_index=True)
+
+def compare_engines(texts: List[str], engines: Dict[str, CategorizationEngine],
+                    labels: Optional[List[str]] = None, batch_size: int = 1000) -> List[Dict]:
+    """
+    Compara precisión y velocidad de varios motores sobre los mismos datos.
+    
+    La precisión se mide contra las etiquetas si se entregan; además se reporta
+    la concordancia de categoría con el motor de palabras clave.
+    
+    Args:
+        texts (List[str]): Comentarios a categorizar
+        engines (Dict[str, CategorizationEngine]): Motores por nombre
+        labels (List[str], optional): Categoría correcta de cada comentario
+        batch_size (int): Tamaño de lote para la inferencia
+    
+    Returns:
+        List[Dict]: Un reporte por motor
+    """
+    predictions = {}
+    reports = []
+    for name, engine in engines.items():
+        start_time = time.perf_counter()
+        results = []
+        for i in range(0, len(texts), batch_size):
+            results.extend(engine.predict_batch(texts[i:i + batch_size]))
+        elapsed = time.perf_counter() - start_time
+        predictions[name] = [LABELS.category_name(result.category) for result in results]
+        reports.append({
+            'engine': name,
+            'comments': len(texts),
+            'seconds': round(elapsed, 3),
+            'comments_per_second': round(len(texts) / elapsed, 1) if elapsed > 0 else None
+        })
+    
+    reference = predictions.get('keyword')
+    for report in reports:
+        categories = predictions[report['engine']]
+        if reference is not None and texts:
+            report['keyword_agreement'] = round(
+                sum(a == b for a, b in zip(categories, reference)) / len(texts), 4)
+        if labels is not None and texts:
+            report['accuracy'] = round(
+                sum(a == b for a, b in zip(categories, labels)) / len(texts), 4)
+    return reports
+
+def main():
+    """Entrena el motor lineal o lo compara con el motor de palabras clave."""
+    from .process_comments_v2 import CommentProcessor
+    
+    parser = argparse.ArgumentParser(description="Motores de categorización")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    
+    train_parser = subparsers.add_parser('train', help="Entrena el motor lineal")
+    train_parser.add_argument('--labels', help="Excel etiquetado (Comentario, Categoría, Tipo)")
+    train_parser.add_argument('--model', default=LINEAR_MODEL_FILE, help="Ruta del modelo de salida")
+    
+    compare_parser = subparsers.add_parser('compare', help="Compara motores sobre un archivo")
+    compare_parser.add_argument('input_file', help="Excel con la columna Comentario (y opcionalmente Categoría)")
+    compare_parser.add_argument('--model', default=LINEAR_MODEL_FILE, help="Ruta del modelo lineal")
+    
+    args = parser.parse_args()
+    processor = CommentProcessor()
+    
+    if args.command == 'train':
+        data = collect_training_data(processor.learning_system, args.labels)
+        texts = data['text'].tolist()
+        reference_margins = [result.margin for result in KeywordEngine(processor).predict_batch(texts)]
+        engine = LinearEngine(processor.clean_text, args.model)
+        engine.fit(texts, data['category'].tolist(), data['type'].tolist(), reference_margins)
+        engine.save()
+        print(f"Motor lineal entrenado con {len(data)} ejemplos: {args.model} "
+              f"(escala de márgenes {engine.margin_scale:.3f})")
+        return
+    
+    df = pd.read_excel(args.input_file)
+    texts = df['Comentario'].tolist()
+    labels = df['Categoría'].astype(str).tolist() if 'Categoría' in df.columns else None
+    engines = {
+        'keyword': KeywordEngine(processor),
+        'linear': create_engine('linear', processor, args.model)
+    }
+    for report in compare_engines(texts, engines, labels):
+        print(report)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+Evaluación de precisión y rendimiento contra un archivo etiquetado.
+
+Ejecuta una configuración del procesador (motor, modo cascada, tamaño de lote)
+sobre comentarios con categoría conocida y reporta precisión y exhaustividad por
+categoría junto a la velocidad (comentarios por segundo) y la memoria máxima.
+Cada evaluación se guarda como un registro JSON para comparar configuraciones
+a lo largo del tiempo.
+"""
+
+import logging
+import os
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Dict, Optional
+
+import pandas as pd
+
+from .atomic_io import atomic_write_json
+from .results import ResultBatch
+
+# Directorio de los registros de evaluación
+EVALUATIONS_DIR = 'Categorization_Analyst/data/evaluations'
+
+def load_labeled_file(labels_file: str) -> pd.DataFrame:
+    """
+    Lee un archivo etiquetado por analistas.
+    
+    Args:
+        labels_file (str): Excel con columnas Comentario y Categoría (y opcionalmente Tipo y pnr)
+    
+    Returns:
+        pd.DataFrame: Filas con categoría conocida y columnas pnr y Comentario listas para procesar
+    """
+    df = pd.read_excel(labels_file)
+    required_columns = ['Comentario', 'Categoría']
+    if not all(col in df.columns for col in required_columns):
+        raise ValueError(f"El archivo etiquetado debe contener las columnas: {required_columns}")
+    df = df.dropna(subset=['Categoría']).reset_index(drop=True)
+    if 'pnr' not in df.columns:
+        df['pnr'] = df.index.astype(str)
+    return df
+
+def category_metrics(expected: pd.Series, predicted: pd.Series) -> Dict[str, Dict[str, float]]:
+    """
+    Calcula precisión, exhaustividad y F1 por categoría.
+    
+    Args:
+        expected (pd.Series): Categoría correcta de cada comentario
+        predicted (pd.Series): Categoría asignada a cada comentario
+    
+    Returns:
+        Dict[str, Dict[str, float]]: categoría -> precision, recall, f1 y support
+    """
+    expected = expected.astype(str).reset_index(drop=True)
+    predicted = predicted.astype(str).reset_index(drop=True)
+    hits = expected == predicted
+    
+    metrics = {}
+    for category in sorted(set(expected) | set(predicted)):
+        true_positives = int((hits & (expected == category)).sum())
+        predicted_count = int((predicted == category).sum())
+        support = int((expected == category).sum())
+        precision = true_positives / predicted_count if predicted_count else 0.0
+        recall = true_positives / support if support else 0.0
+        f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+        metrics[category] = {
+            'precision': round(precision, 4),
+            'recall': round(recall, 4),
+            'f1': round(f1, 4),
+            'support': support
+        }
+    return metrics
+
+def _run(processor, df: pd.DataFrame, batch_size: int) -> pd.DataFrame:
+    """Procesa el DataFrame en lotes con el procesador dado."""
+    batches = [processor.process_batch(df.iloc[i:i + batch_size]) for i in range(0, len(df), batch_size)]
+    return ResultBatch.concat(batches).to_frame()
+
+def evaluate(labels_file: str, engine: str = 'keyword', cascade_threshold: Optional[float] = None,
+             batch_size: int = 1000, model_file: Optional[str] = None,
+             measure_memory: bool = True) -> Dict:
+    """
+    Evalúa una configuración del procesador contra un archivo etiquetado.
+    
+    La velocidad se mide en una primera pasada sin instrumentar; la memoria
+    máxima, en una segunda pasada con tracemalloc (que hace más lento el
+    código), sobre un procesador nuevo para no medir cachés ya llenas.
+    
+    Args:
+        labels_file (str): Excel etiquetado (ver load_labeled_file)
+        engine (str): Motor de categorización ('keyword' o 'linear')
+        cascade_threshold (float, optional): Umbral del modo cascada
+        batch_size (int): Cantidad de comentarios por lote
+        model_file (str, optional): Ruta al modelo del motor lineal
+        measure_memory (bool): Si es False se omite la pasada de memoria
+    
+    Returns:
+        Dict: Registro de la evaluación
+    """
+    from .process_comments_v2 import CommentProcessor
+    
+    def build_processor():
+        processor = CommentProcessor(engine=engine, model_file=model_file)
+        if cascade_threshold is not None:
+            processor.enable_cascade(cascade_threshold)
+        return processor
+    
+    df = load_labeled_file(labels_file)
+    logging.info(f"Evaluando motor '{engine}' sobre {len(df)} comentarios etiquetados de: {labels_file}")
+    
+    # Pasada de velocidad
+    processor = build_processor()
+    start_time = time.perf_counter()
+    results = _run(processor, df, batch_size)
+    elapsed = time.perf_counter() - start_time
+    
+    # Pasada de memoria
+    peak_memory = None
+    if measure_memory:
+        tracemalloc.start()
+        try:
+            _run(build_processor(), df, batch_size)
+            peak_memory = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    
+    hits = results['Categoría'].astype(str) == df['Categoría'].astype(str)
+    record = {
+        'timestamp': datetime.now().isoformat(),
+        'labels_file': os.path.abspath(labels_file),
+        'engine': engine,
+        'cascade_threshold': cascade_threshold,
+        'batch_size': batch_size,
+        'comments': len(df),
+        'seconds': round(elapsed, 3),
+        'comments_per_second': round(len(df) / elapsed, 1) if elapsed > 0 else None,
+        'peak_memory_mb': round(peak_memory / 2**20, 2) if peak_memory is not None else None,
+        'fast_path_count': processor.fast_path_count,
+        'accuracy': round(float(hits.mean()), 4) if len(df) else None,
+        'categories': category_metrics(df['Categoría'], results['Categoría'])
+    }
+    if 'Tipo' in df.columns:
+        labeled = df['Tipo'].notna()
+        type_hits = results['Tipo'][labeled].astype(str) == df['Tipo'][labeled].astype(str)
+        record['type_accuracy'] = round(float(type_hits.mean()), 4) if labeled.any() else None
+    if cascade_threshold is not None:
+        record['cascade_escalated'] = processor.cascade_escalated
+    return record
+
+def save_evaluation(record: Dict, evaluations_dir: str = EVALUATIONS_DIR) -> str:
+    """
+    Guarda el registro de una evaluación como JSON.
+    
+    Args:
+        record (Dict): Registro generado por evaluate
+        evaluations_dir (str): Directorio de registros
+    
+    Returns:
+        str: Ruta del archivo escrito
+    """
+    stamp = datetime.fromisoformat(record['timestamp']).strftime('%Y%m%d_%H%M%S')
+    path = os.path.join(evaluations_dir, f"evaluation_{stamp}_{record['engine']}.json")
+    atomic_write_json(path, record, ensure_ascii=False, indent=2)
+    return path
+
+def print_evaluation(record: Dict) -> None:
+    """Imprime un resumen legible de una evaluación."""
+    print(f"\nMotor: {record['engine']} | cascada: {record['cascade_threshold']} | lote: {record['batch_size']}")
+    print(f"Comentarios: {record['comments']} | {record['comments_per_second']} com/seg | "
+          f"memoria máxima: {record['peak_memory_mb']} MB")
+    print(f"Exactitud de categoría: {record['accuracy']}")
+    if 'type_accuracy' in record:
+        print(f"Exactitud de tipo: {record['type_accuracy']}")
+    print(f"\n{'Categoría':<24}{'Precisión':>10}{'Exhaust.':>10}{'F1':>8}{'Soporte':>9}")
+    for category, metrics in record['categories'].items():
+        print(f"{category:<24}{metrics['precision']:>10.3f}{metrics['recall']:>10.3f}"
+              f"{metrics['f1']:>8.3f}{metrics['support']:>9}")
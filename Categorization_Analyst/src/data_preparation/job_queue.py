@@ -0,0 +1,345 @@
+"""
+Cola persistente de trabajos de categorización en SQLite.
+
+submit registra un archivo de entrada como trabajo pendiente y run_worker toma
+los trabajos en orden y los procesa. Cada archivo se copia al enviarse a un
+directorio de entradas con el hash SHA-256 de su contenido como nombre, de modo
+que el trabajo procesa exactamente lo que se envió aunque el archivo original
+sea reemplazado después. Reenviar un archivo idéntico con las mismas opciones no
+crea otro trabajo (salvo que el anterior haya fallado, en cuyo caso se reencola).
+
+Cada trabajo escribe su salida, su resumen y sus puntos de control en rutas
+propias, y varios trabajadores (o ejecuciones de cron superpuestas) pueden
+compartir la misma cola: la toma de un trabajo es una transacción exclusiva.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import socket
+import sqlite3
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Base de datos de la cola y directorio de entradas y salidas de los trabajos
+JOBS_DB = 'Categorization_Analyst/data/jobs/jobs.sqlite'
+JOBS_DIR = 'Categorization_Analyst/data/jobs'
+
+# Segundos entre consultas de un trabajador sin trabajos pendientes
+POLL_INTERVAL = 5.0
+
+# Estados de un trabajo
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+# Opciones de un trabajo y su valor por defecto
+JOB_OPTIONS = {'engine': 'keyword', 'cascade_threshold': None}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    content_hash TEXT NOT NULL,
+    options TEXT NOT NULL,
+    input_file TEXT NOT NULL,
+    stored_input TEXT NOT NULL,
+    status TEXT NOT NULL,
+    submitted_at TEXT NOT NULL,
+    started_at TEXT,
+    finished_at TEXT,
+    seconds REAL,
+    rows INTEGER,
+    output_file TEXT,
+    summary_file TEXT,
+    worker TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    UNIQUE (content_hash, options)
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, job_id);
+"""
+
+# Columnas que se listan de cada trabajo
+JOB_COLUMNS = ['job_id', 'status', 'input_file', 'content_hash', 'options', 'submitted_at', 'started_at',
+               'finished_at', 'seconds', 'rows', 'output_file', 'summary_file', 'worker', 'attempts', 'error']
+
+def _now() -> str:
+    return datetime.now().isoformat()
+
+def store_input(input_file: str, inputs_dir: str) -> Tuple[str, str]:
+    """
+    Copia un archivo de entrada al directorio de entradas calculando su hash.
+    
+    El hash se calcula sobre los mismos bytes que se copian, por lo que la copia
+    corresponde siempre al hash aunque el archivo original cambie durante la lectura.
+    
+    Args:
+        input_file (str): Archivo a copiar
+        inputs_dir (str): Directorio de entradas
+    
+    Returns:
+        Tuple[str, str]: (hash SHA-256 del contenido, ruta de la copia)
+    """
+    os.makedirs(inputs_dir, exist_ok=True)
+    digest = hashlib.sha256()
+    fd, tmp_path = tempfile.mkstemp(dir=inputs_dir, prefix='.input.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as out, open(input_file, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+                out.write(block)
+            out.flush()
+            os.fsync(out.fileno())
+        content_hash = digest.hexdigest()
+        stored = os.path.join(inputs_dir, content_hash + Path(input_file).suffix.lower())
+        os.replace(tmp_path, stored)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return content_hash, stored
+
+def _process_alive(pid: int) -> bool:
+    """Indica si un proceso de esta máquina sigue en ejecución."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+class JobQueue:
+    """Cola de trabajos de categorización persistida en SQLite."""
+    
+    def __init__(self, db_path: str = JOBS_DB, jobs_dir: str = JOBS_DIR):
+        """
+        Args:
+            db_path (str): Base SQLite de la cola
+            jobs_dir (str): Directorio de las entradas copiadas y las salidas por trabajo
+        """
+        self.db_path = db_path
+        self.jobs_dir = jobs_dir
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        # Sin transacciones implícitas: cada operación abre la suya con BEGIN IMMEDIATE
+        self.connection = sqlite3.connect(db_path, timeout=60, isolation_level=None)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.executescript(SCHEMA)
+        self.worker_id = f'{socket.gethostname()}:{os.getpid()}'
+    
+    def close(self) -> None:
+        """Cierra la conexión."""
+        self.connection.close()
+    
+    @contextmanager
+    def _transaction(self):
+        """Transacción de escritura exclusiva (BEGIN IMMEDIATE); se revierte ante un error."""
+        self.connection.execute('BEGIN IMMEDIATE')
+        try:
+            yield
+        except BaseException:
+            self.connection.execute('ROLLBACK')
+            raise
+        self.connection.execute('COMMIT')
+    
+    def submit(self, input_file: str, **options) -> Tuple[int, bool]:
+        """
+        Encola un archivo de entrada.
+        
+        Args:
+            input_file (str): Archivo Excel de entrada
+            **options: Opciones del trabajo (ver JOB_OPTIONS)
+        
+        Returns:
+            Tuple[int, bool]: (identificador del trabajo, True si se encoló y False si
+                ya existía un trabajo para el mismo contenido y opciones)
+        """
+        unknown = set(options) - set(JOB_OPTIONS)
+        if unknown:
+            raise ValueError(f"Opciones de trabajo desconocidas: {sorted(unknown)}")
+        options = json.dumps({**JOB_OPTIONS, **options}, sort_keys=True)
+        content_hash, stored = store_input(input_file, os.path.join(self.jobs_dir, 'inputs'))
+        
+        with self._transaction():
+            row = self.connection.execute(
+                'SELECT job_id, status FROM jobs WHERE content_hash = ? AND options = ?',
+                (content_hash, options)
+            ).fetchone()
+            if row is not None:
+                job_id, status = row
+                if status != FAILED:
+                    return job_id, False
+                self.connection.execute(
+                    'UPDATE jobs SET status = ?, input_file = ?, stored_input = ?, submitted_at = ?, '
+                    'error = NULL WHERE job_id = ?',
+                    (PENDING, str(input_file), stored, _now(), job_id)
+                )
+                return job_id, True
+            
+            cursor = self.connection.execute(
+                'INSERT INTO jobs (content_hash, options, input_file, stored_input, status, submitted_at) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (content_hash, options, str(input_file), stored, PENDING, _now())
+            )
+            return cursor.lastrowid, True
+    
+    def _requeue_orphans(self) -> None:
+        """Reencola los trabajos en proceso cuyo trabajador de esta máquina ya no existe."""
+        if os.name != 'posix':
+            return
+        host = socket.gethostname()
+        for job_id, worker in self.connection.execute(
+                'SELECT job_id, worker FROM jobs WHERE status = ?', (RUNNING,)).fetchall():
+            worker_host, _, pid = (worker or '').rpartition(':')
+            if worker_host == host and pid.isdigit() and not _process_alive(int(pid)):
+                logging.warning(f"Trabajo {job_id}: el trabajador {worker} terminó sin completarlo; se reencola")
+                self.connection.execute('UPDATE jobs SET status = ? WHERE job_id = ?', (PENDING, job_id))
+    
+    def claim(self) -> Optional[Dict]:
+        """
+        Toma el trabajo pendiente más antiguo y lo marca en proceso.
+        
+        Returns:
+            Dict, optional: Trabajo tomado (columnas de JOB_COLUMNS más stored_input y
+                las opciones decodificadas) o None si no hay pendientes
+        """
+        with self._transaction():
+            self._requeue_orphans()
+            row = self.connection.execute(
+                'SELECT job_id FROM jobs WHERE status = ? ORDER BY job_id LIMIT 1', (PENDING,)
+            ).fetchone()
+            if row is None:
+                return None
+            self.connection.execute(
+                'UPDATE jobs SET status = ?, started_at = ?, finished_at = NULL, seconds = NULL, '
+                'worker = ?, attempts = attempts + 1 WHERE job_id = ?',
+                (RUNNING, _now(), self.worker_id, row[0])
+            )
+            return self.job(row[0])
+    
+    def finish(self, job_id: int, rows: int, seconds: float, output_file: str, summary_file: str) -> None:
+        """Registra un trabajo completado."""
+        with self._transaction():
+            self.connection.execute(
+                'UPDATE jobs SET status = ?, finished_at = ?, seconds = ?, rows = ?, output_file = ?, '
+                'summary_file = ?, error = NULL WHERE job_id = ?',
+                (DONE, _now(), seconds, rows, output_file, summary_file, job_id)
+            )
+    
+    def fail(self, job_id: int, seconds: float, error: str) -> None:
+        """Registra un trabajo fallido (un nuevo submit del mismo archivo lo reencola)."""
+        with self._transaction():
+            self.connection.execute(
+                'UPDATE jobs SET status = ?, finished_at = ?, seconds = ?, error = ? WHERE job_id = ?',
+                (FAILED, _now(), seconds, error, job_id)
+            )
+    
+    def release(self, job_id: int) -> None:
+        """Devuelve a pendiente un trabajo interrumpido."""
+        with self._transaction():
+            self.connection.execute('UPDATE jobs SET status = ? WHERE job_id = ?', (PENDING, job_id))
+    
+    def job(self, job_id: int) -> Optional[Dict]:
+        """Retorna un trabajo por su identificador."""
+        columns = JOB_COLUMNS + ['stored_input']
+        row = self.connection.execute(
+            f"SELECT {', '.join(columns)} FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(zip(columns, row))
+        job['options'] = json.loads(job['options'])
+        return job
+    
+    def jobs(self, status: Optional[str] = None) -> List[Dict]:
+        """Lista los trabajos (opcionalmente de un estado) en orden de envío."""
+        where, params = ('WHERE status = ?', [status]) if status else ('', [])
+        cursor = self.connection.execute(
+            f"SELECT {', '.join(JOB_COLUMNS)} FROM jobs {where} ORDER BY job_id", params)
+        return [dict(zip(JOB_COLUMNS, row)) for row in cursor.fetchall()]
+    
+    def job_paths(self, job_id: int) -> Dict[str, str]:
+        """Rutas de salida, resumen y puntos de control de un trabajo (en su propio directorio)."""
+        directory = os.path.join(self.jobs_dir, f'job-{job_id:06d}')
+        return {
+            'output_file': os.path.join(directory, 'categorized_comments.xlsx'),
+            'summary_file': os.path.join(directory, 'categorization_summary.txt'),
+            'checkpoint_dir': os.path.join(directory, 'checkpoints')
+        }
+
+def run_worker(queue: JobQueue, workers: int = 1, batch_size: int = 1000,
+               sqlite_path: Optional[str] = None, poll_interval: float = POLL_INTERVAL,
+               drain: bool = False) -> int:
+    """
+    Procesa los trabajos de la cola.
+    
+    Los procesadores se construyen una vez por motor y umbral de cascada y se
+    reutilizan entre trabajos. Un trabajo interrumpido se reanuda desde su último
+    lote completado cuando se vuelve a tomar.
+    
+    Args:
+        queue (JobQueue): Cola de trabajos
+        workers (int): Procesos que categorizan cada lote en paralelo
+        batch_size (int): Comentarios del primer lote de cada trabajo
+        sqlite_path (str, optional): Base SQLite donde insertar también los resultados
+            (cada trabajo es la ejecución 'job-<id>')
+        poll_interval (float): Segundos de espera cuando no hay trabajos pendientes
+        drain (bool): Termina cuando no quedan trabajos pendientes en lugar de esperar
+    
+    Returns:
+        int: Cantidad de trabajos procesados (completados o fallidos)
+    """
+    from .process_comments_v2 import CommentProcessor
+    from .results_store import ResultsStore
+    
+    processors = {}
+    results_store = ResultsStore(sqlite_path) if sqlite_path else None
+    processed = 0
+    try:
+        while True:
+            job = queue.claim()
+            if job is None:
+                if drain:
+                    return processed
+                time.sleep(poll_interval)
+                continue
+            
+            job_id = job['job_id']
+            options = job['options']
+            paths = queue.job_paths(job_id)
+            os.makedirs(os.path.dirname(paths['output_file']), exist_ok=True)
+            logging.info(f"Trabajo {job_id}: {job['input_file']} (intento {job['attempts']})")
+            
+            start = time.perf_counter()
+            try:
+                key = (options['engine'], options['cascade_threshold'])
+                if key not in processors:
+                    processor = CommentProcessor(engine=options['engine'])
+                    if options['cascade_threshold'] is not None:
+                        processor.enable_cascade(options['cascade_threshold'])
+                    processors[key] = processor
+                rows = processors[key].process_file(
+                    job['stored_input'], paths['output_file'], batch_size=batch_size,
+                    checkpoint_dir=paths['checkpoint_dir'], resume=True,
+                    results_store=results_store, run_id=f'job-{job_id}',
+                    workers=workers, summary_file=paths['summary_file'])
+            except KeyboardInterrupt:
+                queue.release(job_id)
+                raise
+            except Exception as e:
+                logging.error(f"Trabajo {job_id} fallido: {str(e)}")
+                queue.fail(job_id, time.perf_counter() - start, str(e))
+            else:
+                seconds = time.perf_counter() - start
+                queue.finish(job_id, rows, seconds, paths['output_file'], paths['summary_file'])
+                logging.info(f"Trabajo {job_id} completado: {rows} comentarios en {seconds:.1f} s")
+            processed += 1
+    finally:
+        if results_store is not None:
+            results_store.close()
@@ -0,0 +1,163 @@
+"""
+Estadísticas de uso de las palabras clave y patrones de contexto.
+
+Registra, por categoría, en cuántos comentarios se activó cada palabra clave y
+cada patrón de contexto y en cuántos de ellos la categoría resultó ganadora. Los
+conteos son agregables entre lotes, fragmentos y ejecuciones, y el reporte marca
+las palabras clave que nunca se activan (candidatas a eliminar) y las que se
+activan en demasiados comentarios sin decidir la categoría (ruidosas).
+"""
+
+import os
+from datetime import datetime
+from typing import Dict, Iterable, List, Tuple
+
+# Nombre del reporte, que se escribe junto al resumen de categorización
+KEYWORD_STATS_NAME = 'keyword_stats_v2.txt'
+
+# Una palabra clave es ruidosa si se activa en al menos esta fracción de los
+# comentarios evaluados y decide la categoría en menos de esta fracción de sus activaciones
+NOISY_FIRE_RATE = 0.05
+NOISY_DECIDE_RATE = 0.5
+
+def keyword_stats_file(summary_file: str) -> str:
+    """Ruta del reporte de palabras clave correspondiente a un resumen."""
+    return os.path.join(os.path.dirname(summary_file), KEYWORD_STATS_NAME)
+
+class KeywordStats:
+    """Conteos agregables de activaciones y decisiones por palabra clave y patrón."""
+    
+    def __init__(self, keywords: Dict[str, Iterable[str]] = None,
+                 context_patterns: Dict[str, Dict[str, str]] = None):
+        """
+        Args:
+            keywords (Dict[str, Iterable[str]], optional): Palabras clave por categoría;
+                se registran con conteo cero para que las que nunca se activan aparezcan
+            context_patterns (Dict[str, Dict[str, str]], optional): Patrones de contexto
+                por categoría y tipo
+        """
+        self.comments = 0
+        # categoría -> palabra clave -> [activaciones, decisiones]
+        self.keywords = {}
+        # categoría -> tipo -> [activaciones, decisiones]
+        self.patterns = {}
+        
+        for category, words in (keywords or {}).items():
+            self.keywords[category] = {word: [0, 0] for word in words}
+        for category, patterns in (context_patterns or {}).items():
+            self.patterns[category] = {type_name: [0, 0] for type_name in patterns}
+    
+    def record_keyword(self, category: str, keyword: str, decided: bool) -> None:
+        """Registra que una palabra clave se activó en un comentario."""
+        counts = self.keywords.setdefault(category, {}).setdefault(keyword, [0, 0])
+        counts[0] += 1
+        if decided:
+            counts[1] += 1
+    
+    def record_pattern(self, category: str, type_name: str, decided: bool) -> None:
+        """Registra que un patrón de contexto se activó en un comentario."""
+        counts = self.patterns.setdefault(category, {}).setdefault(type_name, [0, 0])
+        counts[0] += 1
+        if decided:
+            counts[1] += 1
+    
+    def merge(self, other: 'KeywordStats') -> None:
+        """Suma los conteos de otra instancia."""
+        self.comments += other.comments
+        for mine, theirs in ((self.keywords, other.keywords), (self.patterns, other.patterns)):
+            for category, entries in theirs.items():
+                target = mine.setdefault(category, {})
+                for name, (fired, decided) in entries.items():
+                    counts = target.setdefault(name, [0, 0])
+                    counts[0] += fired
+                    counts[1] += decided
+    
+    def to_dict(self) -> Dict:
+        """Representación serializable en JSON."""
+        return {
+            'comments': self.comments,
+            'keywords': {category: {name: list(counts) for name, counts in entries.items()}
+                         for category, entries in self.keywords.items()},
+            'patterns': {category: {name: list(counts) for name, counts in entries.items()}
+                         for category, entries in self.patterns.items()}
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'KeywordStats':
+        """Reconstruye una instancia a partir de to_dict."""
+        stats = cls()
+        stats.merge_dict(data)
+        return stats
+    
+    def merge_dict(self, data: Dict) -> None:
+        """Suma los conteos de una representación generada con to_dict."""
+        other = KeywordStats()
+        other.comments = data['comments']
+        other.keywords = data['keywords']
+        other.patterns = data['patterns']
+        self.merge(other)
+    
+    def dead_keywords(self) -> List[Tuple[str, str]]:
+        """Palabras clave que no se activaron en ningún comentario, como (categoría, palabra)."""
+        return sorted((category, keyword)
+                      for category, entries in self.keywords.items()
+                      for keyword, (fired, _) in entries.items() if fired == 0)
+    
+    def noisy_keywords(self) -> List[Tuple[str, str, int, int]]:
+        """
+        Palabras clave que se activan en muchos comentarios pero rara vez deciden la categoría.
+        
+        Returns:
+            List[Tuple[str, str, int, int]]: (categoría, palabra, activaciones, decisiones),
+                ordenadas por activaciones descendentes
+        """
+        if not self.comments:
+            return []
+        noisy = [(category, keyword, fired, decided)
+                 for category, entries in self.keywords.items()
+                 for keyword, (fired, decided) in entries.items()
+                 if fired / self.comments >= NOISY_FIRE_RATE and decided / fired < NOISY_DECIDE_RATE]
+        return sorted(noisy, key=lambda item: (-item[2], item[0], item[1]))
+    
+    def write_report(self, report_file: str) -> None:
+        """
+        Escribe el reporte de palabras clave.
+        
+        Args:
+            report_file (str): Ruta del reporte (ver keyword_stats_file)
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(report_file)), exist_ok=True)
+        
+        def rate(count: int, total: int) -> float:
+            return (count / total) * 100 if total else 0.0
+        
+        with open(report_file, 'w', encoding='utf-8') as f:
+            f.write("Estadísticas de Palabras Clave (v2)\n")
+            f.write("===================================\n\n")
+            f.write(f"Fecha de generación: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+            f.write(f"Comentarios evaluados (incluye la ruta rápida): {self.comments}\n\n")
+            
+            dead = self.dead_keywords()
+            f.write(f"Palabras clave sin activaciones ({len(dead)}):\n")
+            f.write("--------------------------------\n")
+            for category, keyword in dead:
+                f.write(f"{category}: {keyword}\n")
+            
+            noisy = self.noisy_keywords()
+            f.write(f"\nPalabras clave ruidosas (activadas en >= {NOISY_FIRE_RATE:.0%} de los comentarios, "
+                    f"deciden < {NOISY_DECIDE_RATE:.0%}):\n")
+            f.write("-------------------------\n")
+            for category, keyword, fired, decided in noisy:
+                f.write(f"{category}: {keyword} - activada en {fired} comentarios "
+                        f"({rate(fired, self.comments):.1f}%), decide {decided} ({rate(decided, fired):.1f}%)\n")
+            
+            f.write("\nDetalle por Categoría:\n")
+            f.write("----------------------\n")
+            for category in sorted(set(self.keywords) | set(self.patterns)):
+                f.write(f"\n[{category}]\n")
+                entries = sorted(self.keywords.get(category, {}).items(), key=lambda item: (-item[1][0], item[0]))
+                for keyword, (fired, decided) in entries:
+                    f.write(f"  {keyword}: activada {fired}, decide {decided}\n")
+                entries = sorted(self.patterns.get(category, {}).items(), key=lambda item: (-item[1][0], item[0]))
+                for type_name, (fired, decided) in entries:
+                    f.write(f"  contexto {type_name}: activado {fired}, decide {decided}\n")
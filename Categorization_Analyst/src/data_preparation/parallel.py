@@ -0,0 +1,167 @@
+"""
+Procesamiento de lotes en un grupo de procesos trabajadores.
+
+El procesador (palabras clave normalizadas, tablas de búsqueda, expresiones
+compiladas, pesos de aprendizaje, modelo lineal y, en modo cascada, el
+analizador con sus almacenes de sinónimos y co-ocurrencias) se construye una
+sola vez en el proceso principal. Con el método de inicio 'fork' los
+trabajadores heredan esas tablas de solo lectura sin copiarlas: antes de crear
+los procesos se llama a gc.freeze() para que el recolector de basura de cada
+trabajador no recorra (y por lo tanto no duplique) las páginas heredadas, y los
+almacenes aprendidos ya son archivos .npy mapeados en memoria, compartidos por
+el caché de páginas del sistema operativo.
+
+Donde 'fork' no está disponible cada trabajador construye su propio procesador
+al iniciar (ver _init_worker); los almacenes mapeados se siguen compartiendo.
+
+verify_parallel procesa los mismos comentarios en serie y con trabajadores y
+reporta las filas cuyo resultado difiere: ambas ejecuciones deben coincidir bit
+a bit, ya que los empates se resuelven siempre por el orden de la configuración.
+"""
+
+import gc
+import multiprocessing
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .keyword_stats import KeywordStats
+from .results import ResultBatch
+
+# Procesador del proceso trabajador (heredado con 'fork' o construido por _init_worker)
+_PROCESSOR = None
+
+def _init_worker(config: Optional[Dict]) -> None:
+    """
+    Inicializa un trabajador.
+    
+    Args:
+        config (Dict, optional): Configuración para construir el procesador en el
+            trabajador; None si el procesador se heredó del proceso principal
+    """
+    global _PROCESSOR
+    if config is None:
+        return
+    from .process_comments_v2 import CommentProcessor
+    
+    _PROCESSOR = CommentProcessor(engine=config['engine'], model_file=config['model_file'])
+    if config['cascade_threshold'] is not None:
+        _PROCESSOR.enable_cascade(config['cascade_threshold'])
+
+def _process_chunk(args):
+    """
+    Procesa una parte de un lote en el trabajador.
+    
+    Returns:
+        Tuple: (resultados, comentarios por ruta rápida, comentarios escalados,
+            estadísticas de palabras clave o None)
+    """
+    chunk, keyword_stats = args
+    processor = _PROCESSOR
+    processor.fast_path_count = 0
+    processor.cascade_escalated = 0
+    processor.keyword_stats = KeywordStats() if keyword_stats else None
+    results = processor.process_batch(chunk)
+    return results, processor.fast_path_count, processor.cascade_escalated, processor.keyword_stats
+
+class WorkerPool:
+    """Reparte los lotes de un CommentProcessor entre varios procesos."""
+    
+    def __init__(self, processor, workers: int, start_method: Optional[str] = None):
+        """
+        Args:
+            processor (CommentProcessor): Procesador ya configurado del proceso principal
+            workers (int): Cantidad de procesos trabajadores
+            start_method (str, optional): 'fork' o 'spawn'; por defecto 'fork' si está
+                disponible
+        """
+        global _PROCESSOR
+        self.processor = processor
+        self.workers = workers
+        
+        # Calcular antes de crear los procesos lo que el procesador prepara de forma diferida
+        processor.learning_system.get_weights()
+        
+        if start_method is None:
+            start_method = 'fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn'
+        
+        if start_method == 'fork':
+            _PROCESSOR = processor
+            gc.collect()
+            gc.freeze()
+            try:
+                self.pool = multiprocessing.get_context('fork').Pool(workers, _init_worker, (None,))
+            finally:
+                gc.unfreeze()
+                _PROCESSOR = None
+        else:
+            config = {
+                'engine': processor.engine.name,
+                'model_file': getattr(processor.engine, 'model_file', None),
+                'cascade_threshold': processor.cascade_threshold
+            }
+            self.pool = multiprocessing.get_context(start_method).Pool(workers, _init_worker, (config,))
+    
+    def process_batch(self, batch: pd.DataFrame) -> ResultBatch:
+        """
+        Procesa un lote repartido entre los trabajadores.
+        
+        Los resultados conservan el orden del lote y los contadores del
+        procesador principal se actualizan como si lo hubiera procesado él.
+        """
+        keyword_stats = self.processor.keyword_stats is not None
+        chunks = [batch.iloc[positions] for positions in
+                  np.array_split(np.arange(len(batch)), min(self.workers, len(batch)) or 1) if len(positions)]
+        
+        results = []
+        for chunk_results, fast_path_count, cascade_escalated, stats in self.pool.map(
+                _process_chunk, [(chunk, keyword_stats) for chunk in chunks]):
+            results.append(chunk_results)
+            self.processor.fast_path_count += fast_path_count
+            self.processor.cascade_escalated += cascade_escalated
+            if stats is not None:
+                self.processor.keyword_stats.merge(stats)
+        return ResultBatch.concat(results)
+    
+    def close(self) -> None:
+        """Termina los procesos trabajadores."""
+        self.pool.close()
+        self.pool.join()
+    
+    def terminate(self) -> None:
+        """Interrumpe los procesos trabajadores sin esperar los lotes pendientes."""
+        self.pool.terminate()
+        self.pool.join()
+
+def verify_parallel(processor, df: pd.DataFrame, workers: int = 2, batch_size: int = 1000,
+                    start_method: Optional[str] = 'spawn') -> Tuple[ResultBatch, np.ndarray]:
+    """
+    Procesa los mismos comentarios en serie y con un grupo de trabajadores.
+    
+    Con 'spawn' (por defecto) cada trabajador es un intérprete nuevo con otra
+    semilla de hash, por lo que la verificación también detecta resultados que
+    dependan del orden de iteración de conjuntos o diccionarios.
+    
+    Args:
+        processor (CommentProcessor): Procesador ya configurado
+        df (pd.DataFrame): Comentarios con columnas pnr y Comentario
+        workers (int): Cantidad de procesos trabajadores
+        batch_size (int): Cantidad de comentarios por lote
+        start_method (str, optional): Método de inicio de los trabajadores
+    
+    Returns:
+        Tuple[ResultBatch, np.ndarray]: Resultados en serie y posiciones de las filas
+            cuyo resultado en paralelo difiere
+    """
+    batches = range(0, len(df), batch_size)
+    serial = ResultBatch.concat([processor.process_batch(df.iloc[i:i + batch_size]) for i in batches])
+    
+    pool = WorkerPool(processor, workers, start_method)
+    try:
+        parallel = ResultBatch.concat([pool.process_batch(df.iloc[i:i + batch_size]) for i in batches])
+    except Exception:
+        pool.terminate()
+        raise
+    pool.close()
+    return serial, serial.differences(parallel)
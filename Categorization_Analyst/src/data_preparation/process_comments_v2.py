@@ -7,51 +7,144 @@ import pandas as pd
 import numpy as np
 from pathlib import Path
 import re
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 import logging
-from .categories_config import CATEGORIES, KEYWORDS, TYPE_KEYWORDS
+from .categories_config import CATEGORIES, KEYWORDS, TYPE_KEYWORDS, STOPWORDS
+from .engines import CategorizationEngine, create_engine
+from .atomic_io import atomic_write_json, file_lock, read_json
+from .checkpoint import CHECKPOINT_DIR, CheckpointManager, compute_config_hash
+from .sharding import ROW_COLUMN, shard_mask, shard_name, write_shard_outputs
+from .summary import CASCADE_LABEL, FAST_PATH_LABEL, SUMMARY_FILE, summary_counts, write_summary
+from .results_store import ResultsStore
+from .batching import MAX_BATCH_MEMORY_MB, TARGET_BATCH_SECONDS, BatchSizer
+from .parallel import WorkerPool
+from .results import OTROS, OTROS_RESULT, CategorizationResult, ResultBatch
+from .search_index import SearchIndexBuilder
+from .keyword_stats import KeywordStats, keyword_stats_file
+from .text_normalization import normalize_keywords, normalize_series, normalize_text, strip_accents
 import time
 from collections import defaultdict
 from datetime import datetime
 import concurrent.futures
 from functools import lru_cache
-import json
 import os
 
-# Configuración de logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('Categorization_Analyst/data/logs/comment_processing_v2.log'),
-        logging.StreamHandler()
-    ]
-)
+# Archivo de log del procesamiento
+LOG_FILE = 'Categorization_Analyst/data/logs/comment_processing_v2.log'
+
+def setup_logging():
+    """
+    Configura el sistema de logging.
+    
+    Se llama al ejecutar el procesamiento y no al importar el módulo; si el
+    programa que lo usa ya configuró logging, no tiene efecto.
+    """
+    os.makedirs(os.path.dirname(LOG_FILE), exist_ok=True)
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler(LOG_FILE),
+            logging.StreamHandler()
+        ]
+    )
 
 # Ruta al archivo de aprendizaje
 LEARNING_FILE = 'Categorization_Analyst/data/learning/learning_data_v2.json'
 
+# Largo mínimo (en caracteres, tras limpiar) para que un comentario pueda coincidir con
+# alguna palabra clave; los más cortos toman la ruta rápida hacia Otros
+MIN_COMMENT_LENGTH = 3
+
+# Margen por defecto bajo el cual el modo cascada ejecuta el analizador completo (en la
+# escala del motor de palabras clave, a la que el motor lineal lleva sus márgenes)
+CASCADE_THRESHOLD = 1.5
+
+# Segundos mínimos entre dos actualizaciones de la barra de progreso
+PROGRESS_INTERVAL = 2.0
+
 class LearningSystem:
+    # Días en que el peso de un ejemplo cae a la mitad (decaimiento hiperbólico)
+    DECAY_DAYS = 30
+    
     def __init__(self):
         self.learning_data = self._load_learning_data()
         
+        # Pesos con decaimiento, calculados al primer uso y válidos mientras no cambien
+        # la fecha ni el archivo de aprendizaje (ver refresh)
+        self._weights = None
+        self._weights_key = self._current_key()
+        
     def _load_learning_data(self) -> Dict:
-        """Carga los datos de aprendizaje desde el archivo."""
-        if os.path.exists(LEARNING_FILE):
-            with open(LEARNING_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
+        """
+        Carga los datos de aprendizaje desde el archivo.
+        
+        Solo se conservan los ejemplos: los pesos se derivan de ellos al leerlos
+        (ver get_weights), por lo que los pesos guardados por versiones anteriores se ignoran.
+        """
+        data = read_json(LEARNING_FILE)
+        if data is not None:
+            return {
+                'examples': data['examples'],
+                'last_update': data.get('last_update', datetime.now().isoformat())
+            }
         return {
             'examples': [],
-            'category_weights': defaultdict(float),
-            'type_weights': defaultdict(float),
             'last_update': datetime.now().isoformat()
         }
     
+    @staticmethod
+    def _current_key() -> Tuple:
+        """Fecha actual y fecha de modificación del archivo de aprendizaje."""
+        try:
+            mtime = os.stat(LEARNING_FILE).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        return datetime.now().date(), mtime
+    
+    def refresh(self) -> None:
+        """
+        Invalida los pesos si cambió la fecha o el archivo de aprendizaje.
+        
+        Los procesos de larga duración (trabajador de la cola, modo watch) la llaman
+        antes de cada archivo, de modo que el decaimiento avanza con los días y se
+        ven los ejemplos agregados por otros procesos.
+        """
+        key = self._current_key()
+        if key == self._weights_key:
+            return
+        if key[1] != self._weights_key[1]:
+            self.learning_data = self._load_learning_data()
+        self._weights = None
+        self._weights_key = key
+    
+    @staticmethod
+    def _example_key(example: Dict) -> Tuple:
+        """Identifica un ejemplo para no duplicarlo al combinar."""
+        return (example['timestamp'], example['text'], example['category'], example['type'])
+    
     def _save_learning_data(self):
-        """Guarda los datos de aprendizaje en el archivo."""
-        self.learning_data['last_update'] = datetime.now().isoformat()
-        with open(LEARNING_FILE, 'w', encoding='utf-8') as f:
-            json.dump(self.learning_data, f, ensure_ascii=False, indent=2)
+        """
+        Guarda los datos de aprendizaje en el archivo.
+        
+        Bajo bloqueo se relee el archivo, se unen los ejemplos guardados por otras
+        ejecuciones con los de esta instancia y se escribe el resultado de forma atómica.
+        """
+        with file_lock(LEARNING_FILE):
+            stored = self._load_learning_data()
+            
+            # Ejemplos: unión sin duplicados
+            known = {self._example_key(example) for example in stored['examples']}
+            for example in self.learning_data['examples']:
+                if self._example_key(example) not in known:
+                    stored['examples'].append(example)
+                    known.add(self._example_key(example))
+            
+            stored['last_update'] = datetime.now().isoformat()
+            atomic_write_json(LEARNING_FILE, stored, ensure_ascii=False, indent=2)
+            self.learning_data = stored
+            self._weights = None
+            self._weights_key = self._current_key()
     
     def add_example(self, text: str, category: str, type_name: str):
         """Agrega un nuevo ejemplo al sistema de aprendizaje."""
@@ -62,23 +155,37 @@ class LearningSystem:
             'timestamp': datetime.now().isoformat()
         }
         self.learning_data['examples'].append(example)
-        
-        # Actualizar pesos con decaimiento temporal
-        current_time = datetime.now()
-        for example in self.learning_data['examples']:
-            example_time = datetime.fromisoformat(example['timestamp'])
-            time_diff = (current_time - example_time).days
-            weight = 1.0 / (1.0 + time_diff / 30)  # Decaimiento en 30 días
-            
-            self.learning_data['category_weights'][example['category']] += weight
-            self.learning_data['type_weights'][example['type']] += weight
+        self._weights = None
         
         self._save_learning_data()
     
+    def _compute_weights(self) -> Tuple[Dict[str, float], Dict[str, float]]:
+        """
+        Calcula los pesos de categorías y tipos con decaimiento temporal.
+        
+        Cada ejemplo aporta 1 / (1 + días / DECAY_DAYS) según su antigüedad a la
+        fecha actual; los aportes se suman por etiqueta con np.bincount.
+        """
+        examples = self.learning_data['examples']
+        if not examples:
+            return {}, {}
+        
+        timestamps = np.array([example['timestamp'] for example in examples], dtype='datetime64[us]')
+        days = (np.datetime64(datetime.now(), 'us') - timestamps) // np.timedelta64(1, 'D')
+        decay = 1.0 / (1.0 + days / self.DECAY_DAYS)
+        
+        weights = []
+        for field in ('category', 'type'):
+            labels, codes = np.unique([example[field] for example in examples], return_inverse=True)
+            totals = np.bincount(codes, weights=decay, minlength=len(labels))
+            weights.append(dict(zip(labels.tolist(), totals.tolist())))
+        return weights[0], weights[1]
+    
     def get_weights(self) -> Tuple[Dict[str, float], Dict[str, float]]:
         """Retorna los pesos actuales de categorías y tipos."""
-        return (self.learning_data['category_weights'], 
-                self.learning_data['type_weights'])
+        if self._weights is None:
+            self._weights = self._compute_weights()
+        return self._weights
     
     def get_examples_count(self) -> int:
         """Retorna el número total de ejemplos en el sistema."""
@@ -120,10 +227,16 @@ def print_progress_bar(current, total, start_time, bar_length=50):
           f"Hora actual: {datetime.now().strftime('%H:%M:%S')}", end='')
 
 class CommentProcessor:
-    def __init__(self):
+    def __init__(self, engine='keyword', model_file: str = None):
+        """
+        Args:
+            engine (str | CategorizationEngine): Motor de categorización ('keyword' o 'linear')
+            model_file (str, optional): Ruta al modelo del motor lineal
+        """
         self.categories = CATEGORIES
-        self.keywords = KEYWORDS
-        self.type_keywords = TYPE_KEYWORDS
+        # Palabras clave normalizadas con las mismas reglas que los comentarios
+        self.keywords = {category: normalize_keywords(words) for category, words in KEYWORDS.items()}
+        self.type_keywords = {type_name: normalize_keywords(words) for type_name, words in TYPE_KEYWORDS.items()}
         self.learning_system = LearningSystem()
         
         # Optimización: Crear diccionarios de búsqueda más eficientes
@@ -134,13 +247,6 @@ class CommentProcessor:
         # Preprocesar palabras clave para búsqueda más rápida
         self._initialize_lookup_tables()
         
-        # Compilar expresiones regulares
-        self.text_cleaner = re.compile(r'[^a-z\s]')
-        self.space_cleaner = re.compile(r'\s+')
-        
-        # Crear tabla de traducción para acentos
-        self.accents_table = str.maketrans('áéíóú', 'aeiou')
-        
         # Patrones de contexto mejorados
         self.context_patterns = {
             'Website': {
@@ -160,7 +266,32 @@ class CommentProcessor:
                 'Tarifa': r'(tarifa|excesivo|irracional|abusivo|aprovechar|monopolio)'
             }
         }
+        self.context_patterns = {
+            category: {type_name: strip_accents(pattern) for type_name, pattern in patterns.items()}
+            for category, patterns in self.context_patterns.items()
+        }
+        
+        # Plan de coincidencias de tipos y patrones de contexto
+        self._build_match_plan()
 
+        # Ruta rápida para comentarios vacíos, triviales o solo con palabras vacías
+        self.stopword_only_regex = self._build_stopword_only_regex()
+        self.fast_path_count = 0
+        
+        # Modo cascada (desactivado por defecto, ver enable_cascade)
+        self.cascade_threshold = None
+        self.cascade_analyzer = None
+        self.cascade_escalated = 0
+        
+        # Estadísticas de palabras clave (desactivadas por defecto, ver enable_keyword_stats)
+        self.keyword_stats = None
+        
+        # Motor de categorización (palabras clave por defecto)
+        if isinstance(engine, CategorizationEngine):
+            self.engine = engine
+        else:
+            self.engine = create_engine(engine, self, model_file)
+    
     def _initialize_lookup_tables(self):
         """Inicializa las tablas de búsqueda optimizadas."""
         # Diccionario inverso de palabras clave
@@ -172,10 +303,120 @@ class CommentProcessor:
         for type_name, keywords in self.type_keywords.items():
             self.type_to_keywords[type_name] = set(keywords)
         
-        # Diccionario de tipos por categoría
+        # Tipos por categoría, en el orden de la configuración
         for category, info in self.categories.items():
-            self.category_types[category] = set(info['types'])
+            self.category_types[category] = tuple(info['types'])
+    
+    def _build_match_plan(self) -> None:
+        """
+        Precalcula el plan de coincidencias de tipos y de patrones de contexto.
+        
+        type_plan asigna a cada palabra clave de tipo los pares (categoría, posición
+        del tipo en la configuración) que activa, de modo que una sola pasada por las
+        palabras del comentario agrupa los tipos encontrados bajo su categoría.
+        Solo se incluyen las palabras clave de una palabra, porque los tipos se
+        comparan contra palabras completas.
+        
+        context_regex reúne todos los patrones de contexto en una sola expresión: la
+        primera búsqueda anticipada ubica las posiciones donde empieza algún patrón y
+        las siguientes capturan cada patrón por separado (ver _context_types).
+        """
+        type_plan = defaultdict(list)
+        for category, types in self.category_types.items():
+            for rank, type_name in enumerate(types):
+                for keyword in self.type_to_keywords.get(type_name, ()):
+                    if ' ' not in keyword:
+                        type_plan[keyword].append((category, rank))
+        self.type_plan = {word: tuple(hits) for word, hits in type_plan.items()}
+        
+        self.context_groups = []
+        lookaheads = []
+        for category, patterns in self.context_patterns.items():
+            for type_name, pattern in patterns.items():
+                group = f'c{len(self.context_groups)}'
+                self.context_groups.append((group, category, type_name))
+                lookaheads.append(f'(?=(?P<{group}>{pattern}))?')
+        any_pattern = '|'.join(f'(?:{pattern})' for patterns in self.context_patterns.values()
+                               for pattern in patterns.values())
+        self.context_regex = re.compile(f'(?={any_pattern})' + ''.join(lookaheads))
+    
+    def _context_types(self, text: str) -> Dict[str, str]:
+        """
+        Encuentra en un solo recorrido el tipo por contexto de cada categoría.
+        
+        Args:
+            text (str): Texto limpio del comentario
+            
+        Returns:
+            Dict[str, str]: categoría -> primer tipo (en el orden de context_patterns)
+                cuyo patrón aparece en el texto
+        """
+        matched = set()
+        for match in self.context_regex.finditer(text):
+            matched.update(group for group, value in match.groupdict().items() if value is not None)
+        
+        context = {}
+        for group, category, type_name in self.context_groups:
+            if group in matched and category not in context:
+                context[category] = type_name
+        return context
+    
+    def _type_hits(self, words: Set[str]) -> Dict[str, int]:
+        """
+        Agrupa por categoría los tipos cuyas palabras clave aparecen en el comentario.
+        
+        Args:
+            words (Set[str]): Palabras del texto limpio
+            
+        Returns:
+            Dict[str, int]: categoría -> posición (en category_types) del primer tipo encontrado
+        """
+        hits = {}
+        for word in words:
+            for category, rank in self.type_plan.get(word, ()):
+                if rank < hits.get(category, len(self.category_types[category])):
+                    hits[category] = rank
+        return hits
 
+    def _build_stopword_only_regex(self) -> re.Pattern:
+        """
+        Compila la expresión que reconoce comentarios formados solo por palabras vacías.
+        
+        Se excluyen las palabras vacías que contienen alguna palabra clave o
+        activan algún patrón de contexto, de modo que la ruta rápida nunca cambie
+        el resultado del motor de palabras clave.
+        """
+        all_keywords = [keyword for keywords in self.keywords.values() for keyword in keywords]
+        all_patterns = [pattern for patterns in self.context_patterns.values() for pattern in patterns.values()]
+        
+        stopwords = set()
+        for word in STOPWORDS:
+            word = self.clean_text(word)
+            if any(keyword in word for keyword in all_keywords):
+                continue
+            if any(re.search(pattern, word) for pattern in all_patterns):
+                continue
+            stopwords.add(word)
+        
+        alternatives = '|'.join(re.escape(word) for word in sorted(stopwords, key=len, reverse=True))
+        return re.compile(f'(?:{alternatives})(?: (?:{alternatives}))*')
+    
+    def fast_path_mask(self, comments: pd.Series) -> pd.Series:
+        """
+        Marca los comentarios que van directo a Otros: nulos, no textuales,
+        vacíos, muy cortos o compuestos solo por palabras vacías.
+        
+        Args:
+            comments (pd.Series): Columna de comentarios originales
+            
+        Returns:
+            pd.Series: Máscara booleana alineada con comments
+        """
+        cleaned = normalize_series(comments)
+        too_short = cleaned.str.len() < MIN_COMMENT_LENGTH
+        stopwords_only = cleaned.str.fullmatch(self.stopword_only_regex)
+        return too_short | stopwords_only
+    
     @lru_cache(maxsize=10000)
     def clean_text(self, text: str) -> str:
         """
@@ -187,17 +428,7 @@ class CommentProcessor:
         Returns:
             str: Texto limpio
         """
-        if not isinstance(text, str):
-            return ""
-        
-        # Optimización: Usar translate para reemplazar acentos
-        text = text.lower().translate(self.accents_table)
-        
-        # Optimización: Usar regex compilado
-        text = self.text_cleaner.sub(' ', text)
-        text = self.space_cleaner.sub(' ', text)
-        
-        return text.strip()
+        return normalize_text(text)
 
     def _analyze_context(self, text: str, category: str) -> str:
         """
@@ -210,25 +441,25 @@ class CommentProcessor:
         Returns:
             str: Tipo determinado por contexto
         """
-        if category in self.context_patterns:
-            for type_name, pattern in self.context_patterns[category].items():
-                if re.search(pattern, text):
-                    return type_name
-        return None
+        return self._context_types(text).get(category)
 
-    def _score_category(self, text: str, category: str) -> float:
+    def _score_category(self, text: str, words: Set[str], category: str,
+                        context_type: Optional[str], matched: Optional[List[str]] = None) -> float:
         """
         Calcula un puntaje para una categoría basado en palabras clave y contexto.
         
         Args:
             text (str): Texto del comentario
+            words (Set[str]): Palabras del texto
             category (str): Categoría a evaluar
+            context_type (str, optional): Tipo por contexto de la categoría (ver _context_types)
+            matched (List[str], optional): Si se indica, se le agregan las palabras
+                clave encontradas (para las estadísticas de palabras clave)
             
         Returns:
             float: Puntaje de la categoría
         """
         score = 0.0
-        words = set(text.split())
         
         # Obtener pesos del sistema de aprendizaje
         category_weights, _ = self.learning_system.get_weights()
@@ -237,12 +468,13 @@ class CommentProcessor:
         for keyword in self.keywords[category]:
             if keyword in text:
                 score += 1.0
+                if matched is not None:
+                    matched.append(keyword)
                 # Bonus por coincidencia exacta
                 if keyword in words:
                     score += 0.5
         
         # Bonus por contexto
-        context_type = self._analyze_context(text, category)
         if context_type:
             score += 2.0
         
@@ -262,40 +494,61 @@ class CommentProcessor:
         Returns:
             Tuple[str, str, str]: (categoría principal, subcategoría, tipo)
         """
+        return self.identify_category_with_margin(text).names()
+    
+    def identify_category_with_margin(self, text: str) -> CategorizationResult:
+        """
+        Igual que identify_category, pero retorna un resultado tipado que incluye
+        el margen entre el mejor y el segundo mejor puntaje de categoría.
+        
+        Args:
+            text (str): Texto del comentario
+            
+        Returns:
+            CategorizationResult: Categoría, subcategoría y tipo (como códigos de LABELS) y margen
+        """
         text = self.clean_text(text)
         words = set(text.split())
+        context = self._context_types(text)
         
-        # Calcular puntajes para cada categoría
+        # Calcular puntajes para cada categoría (y, si se registran estadísticas,
+        # las palabras clave encontradas en cada una)
         category_scores = {}
+        category_matches = {}
         for category in self.categories:
             if category != 'Otros':  # Ignorar categoría Otros en la puntuación
-                score = self._score_category(text, category)
+                matched = [] if self.keyword_stats is not None else None
+                score = self._score_category(text, words, category, context.get(category), matched)
                 if score > 0:
                     category_scores[category] = score
+                    category_matches[category] = matched
         
         # Si no hay coincidencias, retornar Otros
         if not category_scores:
-            return 'Otros', None, None
+            if self.keyword_stats is not None:
+                self.keyword_stats.comments += 1
+            return OTROS_RESULT
         
-        # Obtener categoría principal
-        best_category = max(category_scores.items(), key=lambda x: x[1])[0]
+        # Obtener categoría principal (en un empate gana la primera en el orden de
+        # la configuración, que es el orden de inserción de category_scores)
+        best_category = max(category_scores, key=category_scores.get)
+        if self.keyword_stats is not None:
+            self._record_keyword_stats(category_matches, best_category, context)
         
         # Determinar tipo basado en contexto y palabras clave
         best_type = None
         category_types = self.category_types[best_category]
         
         # Primero intentar determinar por contexto
-        context_type = self._analyze_context(text, best_category)
+        context_type = context.get(best_category)
         if context_type and context_type in category_types:
             best_type = context_type
         else:
-            # Si no hay tipo por contexto, buscar por palabras clave
-            for type_name in category_types:
-                if type_name in self.type_to_keywords:
-                    keywords = self.type_to_keywords[type_name]
-                    if any(keyword in words for keyword in keywords):
-                        best_type = type_name
-                        break
+            # Si no hay tipo por contexto, el primer tipo (en orden de configuración)
+            # con alguna palabra clave en el comentario
+            rank = self._type_hits(words).get(best_category)
+            if rank is not None:
+                best_type = category_types[rank]
         
         # Determinar subcategoría
         secondary_scores = [(cat, score) for cat, score in category_scores.items() 
@@ -303,32 +556,142 @@ class CommentProcessor:
         
         best_subcategory = max(secondary_scores, key=lambda x: x[1])[0] if secondary_scores else None
         
-        return best_category, best_subcategory, best_type
+        # Margen entre la mejor y la segunda mejor categoría
+        second_score = max((score for _, score in secondary_scores), default=0.0)
+        margin = category_scores[best_category] - second_score
+        
+        return CategorizationResult.from_names(best_category, best_subcategory, best_type, margin)
 
-    def process_batch(self, batch: pd.DataFrame) -> List[Dict]:
+    def enable_keyword_stats(self) -> None:
+        """
+        Activa el registro de activaciones y decisiones por palabra clave y patrón
+        de contexto (solo con el motor de palabras clave).
+        """
+        self.keyword_stats = KeywordStats(self.keywords, self.context_patterns)
+    
+    def _record_keyword_stats(self, category_matches: Dict[str, List[str]], best_category: str,
+                              context: Dict[str, str]) -> None:
+        """
+        Registra qué palabras clave y patrones se activaron en un comentario.
+        
+        Args:
+            category_matches (Dict[str, List[str]]): Palabras clave encontradas al
+                puntuar cada categoría con puntaje (las únicas donde algo se activó)
+            best_category (str): Categoría ganadora
+            context (Dict[str, str]): Tipo por contexto de cada categoría
+        """
+        stats = self.keyword_stats
+        stats.comments += 1
+        for category, matched in category_matches.items():
+            decided = category == best_category
+            for keyword in matched:
+                stats.record_keyword(category, keyword, decided)
+            context_type = context.get(category)
+            if context_type:
+                stats.record_pattern(category, context_type, decided)
+    
+    def process_batch(self, batch: pd.DataFrame) -> ResultBatch:
         """
         Procesa un lote de comentarios.
+        
+        En modo cascada agrega el margen y la confianza de cada comentario; el
+        analizador completo solo se ejecuta sobre los comentarios inciertos.
         """
-        results = []
-        for _, row in batch.iterrows():
-            category, subcategory, type_class = self.identify_category(row['Comentario'])
-            results.append({
-                'PNR': row['pnr'],
-                'Comentario': row['Comentario'],
-                'Categoría': category,
-                'Subcategoría': subcategory,
-                'Tipo': type_class
-            })
+        comments = batch['Comentario'].tolist()
+        
+        # Ruta rápida: los comentarios triviales no pasan por el motor
+        fast_path = self.fast_path_mask(batch['Comentario']).to_numpy(dtype=bool)
+        self.fast_path_count += int(fast_path.sum())
+        if self.keyword_stats is not None:
+            # Los triviales también cuentan en el denominador de las tasas de activación
+            self.keyword_stats.comments += int(fast_path.sum())
+        engine_predictions = iter(self.engine.predict_batch(
+            [comment for comment, trivial in zip(comments, fast_path) if not trivial]))
+        predictions = [OTROS_RESULT if trivial else next(engine_predictions) for trivial in fast_path]
+        
+        results = ResultBatch.from_results(batch['pnr'].tolist(), comments, predictions)
+        if self.cascade_threshold is not None:
+            results.confidence = self._cascade_confidence(results, fast_path)
         return results
 
-    def process_file(self, input_file: str, output_file: str, batch_size: int = 1000) -> None:
+    def enable_cascade(self, threshold: float = CASCADE_THRESHOLD) -> None:
+        """
+        Activa el modo cascada: el puntaje de confianza completo de
+        CategorizationAnalyzer solo se calcula para los comentarios con margen
+        menor al umbral o categorizados como Otros.
+        
+        Args:
+            threshold (float): Margen mínimo (positivo) para confiar en la pasada de
+                palabras clave
+        """
+        from ..analysis.analyze_categorization import CategorizationAnalyzer
+        
+        # Con umbral 0 un empate (margen 0) no se escalaría y su confianza sería 0/0
+        if not threshold > 0:
+            raise ValueError(f"El umbral de cascada debe ser positivo: {threshold}")
+        self.cascade_threshold = threshold
+        self.cascade_analyzer = CategorizationAnalyzer()
+        self.cascade_escalated = 0
+    
+    def _cascade_confidence(self, results: ResultBatch, fast_path: np.ndarray) -> np.ndarray:
+        """
+        Calcula la confianza de un lote en modo cascada.
+        
+        Los comentarios triviales reciben confianza 0 y los seguros una confianza
+        barata derivada del margen, margen / (margen + umbral), que vale 0.5 justo
+        en el umbral.
+        """
+        margins = results.margin
+        confidence = margins / (margins + np.float32(self.cascade_threshold))
+        confidence[fast_path] = 0.0
+        
+        uncertain = ~fast_path & ((margins < self.cascade_threshold) | (results.category == OTROS))
+        for i in np.flatnonzero(uncertain):
+            category, _, type_name = results[i].names()
+            confidence[i] = self.cascade_analyzer.confidence_score(results.comments[i], category, type_name)
+        self.cascade_escalated += int(uncertain.sum())
+        return confidence
+    
+    def process_file(self, input_file: str, output_file: str, batch_size: int = 1000,
+                     checkpoint_dir: str = None, resume: bool = False,
+                     shard: Tuple[int, int] = None, shard_dir: str = None,
+                     results_store: ResultsStore = None, run_id: str = None,
+                     search_index_dir: str = None,
+                     target_batch_seconds: float = TARGET_BATCH_SECONDS,
+                     max_batch_memory_mb: float = MAX_BATCH_MEMORY_MB,
+                     workers: int = 1, summary_file: str = SUMMARY_FILE) -> int:
         """
         Procesa el archivo de entrada en lotes para mejor rendimiento.
         
+        El tamaño de lote se ajusta según la latencia y la memoria medidas en
+        los lotes anteriores (ver BatchSizer).
+        
         Args:
             input_file (str): Ruta al archivo de entrada
             output_file (str): Ruta al archivo de salida
+            batch_size (int): Cantidad de comentarios del primer lote
+            checkpoint_dir (str, optional): Directorio donde guardar cada lote completado
+            resume (bool): Reanuda desde el último lote guardado en checkpoint_dir
+            shard (Tuple[int, int], optional): (índice, cantidad) del fragmento a procesar;
+                los resultados parciales se escriben en shard_dir en lugar de output_file
+            shard_dir (str, optional): Directorio compartido de fragmentos
+            results_store (ResultsStore, optional): Almacén SQLite donde insertar cada lote
+            run_id (str, optional): Identificador de la ejecución en el almacén SQLite
+            search_index_dir (str, optional): Directorio donde construir el índice invertido
+                de palabras de los comentarios procesados
+            target_batch_seconds (float, optional): Tiempo objetivo por lote; None
+                mantiene fijo el tamaño de lote
+            max_batch_memory_mb (float, optional): Memoria máxima de las filas de un lote
+            workers (int): Cantidad de procesos que categorizan cada lote en paralelo
+                (ver WorkerPool); con 1 se procesa en este proceso
+            summary_file (str): Ruta del resumen de categorización (y, junto a él, del
+                reporte de palabras clave)
+            
+        Returns:
+            int: Cantidad de comentarios procesados
         """
+        index_builder = None
+        pool = None
         try:
             # Leer archivo de entrada
             logging.info(f"Leyendo archivo de entrada: {input_file}")
@@ -339,104 +702,263 @@ class CommentProcessor:
             if not all(col in df.columns for col in required_columns):
                 raise ValueError(f"El archivo debe contener las columnas: {required_columns}")
             
+            # Modo fragmento: solo las filas cuyo hash de pnr corresponde a este fragmento
+            if shard is not None:
+                if shard_dir is None:
+                    raise ValueError("El modo fragmento requiere un directorio de fragmentos (shard_dir)")
+                df = df[shard_mask(df['pnr'], *shard)]
+                print(f"Fragmento {shard[0]}/{shard[1]}: {len(df)} comentarios")
+            
             total_comments = len(df)
             start_time = time.time()
             
             print("\nIniciando procesamiento de comentarios...")
             print(f"Total de comentarios a procesar: {total_comments}")
             print(f"Hora de inicio: {datetime.now().strftime('%H:%M:%S')}")
+            print(f"Motor de categorización: {self.engine.name}")
+            if self.cascade_threshold is not None:
+                print(f"Modo cascada: umbral de margen {self.cascade_threshold}")
+            if self.keyword_stats is not None:
+                if self.engine.name != 'keyword':
+                    logging.warning("Las estadísticas de palabras clave solo se registran con el motor 'keyword'")
+                print("Estadísticas de palabras clave: activadas")
+            self.learning_system.refresh()
             print(f"Ejemplos de aprendizaje: {self.learning_system.get_examples_count()}\n")
             
             # Procesar en lotes
+            self.fast_path_count = 0
+            self.cascade_escalated = 0
+            if self.keyword_stats is not None:
+                self.enable_keyword_stats()
             results = []
             processed_count = 0
             
-            for i in range(0, total_comments, batch_size):
-                batch = df.iloc[i:i + batch_size]
-                batch_results = self.process_batch(batch)
-                results.extend(batch_results)
+            # Configuración común a todos los fragmentos de la ejecución (sin el índice)
+            shard_settings = {**self._run_settings(), 'num_shards': shard[1] if shard else None}
+            
+            # Puntos de control: reanudar lotes ya completados
+            checkpoint = None
+            if checkpoint_dir is not None:
+                config_hash = compute_config_hash(input_file, {**shard_settings, 'shard': shard})
+                checkpoint = CheckpointManager(checkpoint_dir, config_hash)
+                if resume:
+                    processed_count = checkpoint.load()
+                    if processed_count:
+                        results = [checkpoint.load_results()]
+                        counters = checkpoint.manifest['counters']
+                        self.fast_path_count = counters.get('fast_path_count', 0)
+                        self.cascade_escalated = counters.get('cascade_escalated', 0)
+                        if self.keyword_stats is not None and 'keyword_stats' in counters:
+                            self.keyword_stats.merge_dict(counters['keyword_stats'])
+                        print(f"Reanudando desde el comentario {processed_count} (lotes completados: "
+                              f"{len(checkpoint.manifest['parts'])})")
+                        logging.info(f"Reanudando procesamiento desde la fila {processed_count}")
+                else:
+                    checkpoint.clear()
+            
+            # Almacén SQLite: una reanudación conserva el identificador de la ejecución
+            if results_store is not None:
+                if run_id is None and checkpoint is not None:
+                    run_id = checkpoint.manifest.get('run_id')
+                if run_id is None:
+                    run_id = datetime.now().strftime('%Y%m%d_%H%M%S')
+                    if shard is not None:
+                        run_id = f'{run_id}.{shard_name(*shard)}'
+                if checkpoint is not None:
+                    checkpoint.manifest['run_id'] = run_id
+                results_store.start_run(run_id, input_file)
+                print(f"Almacén SQLite: {results_store.db_path} (ejecución {run_id})")
+            
+            # Índice invertido: se construye con el texto ya normalizado de cada lote
+            if search_index_dir is not None:
+                index_builder = SearchIndexBuilder(search_index_dir)
+                if processed_count:
+                    completed = df.iloc[:processed_count]
+                    index_builder.add_batch(completed.index, [self.clean_text(c) for c in completed['Comentario']],
+                                            results[0])
+            
+            # Procesos trabajadores: heredan las tablas ya construidas de este procesador
+            process_batch = self.process_batch
+            if workers > 1:
+                pool = WorkerPool(self, workers)
+                process_batch = pool.process_batch
+                print(f"Procesos trabajadores: {workers}")
+            
+            sizer = BatchSizer(batch_size, target_batch_seconds, max_batch_memory_mb)
+            last_progress = 0.0
+            while processed_count < total_comments:
+                offset = processed_count
+                batch_start = time.perf_counter()
+                batch = df.iloc[offset:offset + sizer.next_size()]
+                batch_results = process_batch(batch)
+                results.append(batch_results)
+                
+                if results_store is not None:
+                    results_store.insert_results(run_id, batch.index, batch_results)
+                
+                if index_builder is not None:
+                    index_builder.add_batch(batch.index, [self.clean_text(c) for c in batch['Comentario']],
+                                            batch_results)
+                
+                if checkpoint is not None:
+                    counters = {
+                        'fast_path_count': self.fast_path_count,
+                        'cascade_escalated': self.cascade_escalated
+                    }
+                    if self.keyword_stats is not None:
+                        counters['keyword_stats'] = self.keyword_stats.to_dict()
+                    checkpoint.save_batch(offset, batch_results, counters)
                 
                 processed_count += len(batch)
-                if processed_count % 100 == 0:
+                if sizer.adaptive:
+                    sizer.record(len(batch), time.perf_counter() - batch_start,
+                                 int(batch.memory_usage(deep=True).sum()) if sizer.max_memory_bytes else None)
+                
+                # Progreso limitado por tiempo; el último lote siempre se muestra
+                now = time.time()
+                if now - last_progress >= PROGRESS_INTERVAL or processed_count == total_comments:
                     print_progress_bar(processed_count, total_comments, start_time)
+                    last_progress = now
+            
+            if pool is not None:
+                pool.close()
+                pool = None
             
             # Crear DataFrame de resultados
-            results_df = pd.DataFrame(results)
+            results_df = ResultBatch.concat(results).to_frame()
+            
+            if shard is not None:
+                # Guardar resultados parciales y conteos agregables del fragmento
+                print("\n\nGuardando fragmento...")
+                results_df.insert(0, ROW_COLUMN, df.index.to_numpy())
+                write_shard_outputs(results_df, summary_counts(results_df), self._summary_metadata(),
+                                    shard_dir, *shard, compute_config_hash(input_file, shard_settings),
+                                    keyword_stats=self.keyword_stats.to_dict() if self.keyword_stats else None)
+            else:
+                # Guardar resultados
+                print("\n\nGuardando resultados...")
+                logging.info(f"Guardando resultados en: {output_file}")
+                results_df.to_excel(output_file, index=False)
+                
+                # Generar resumen
+                print("Generando resumen de categorización...")
+                self._generate_summary(results_df, summary_file)
+                if self.keyword_stats is not None:
+                    report_file = keyword_stats_file(summary_file)
+                    self.keyword_stats.write_report(report_file)
+                    print(f"Reporte de palabras clave: {report_file}")
             
-            # Guardar resultados
-            print("\n\nGuardando resultados...")
-            logging.info(f"Guardando resultados en: {output_file}")
-            results_df.to_excel(output_file, index=False)
+            if results_store is not None:
+                results_store.finish_run(run_id)
             
-            # Generar resumen
-            print("Generando resumen de categorización...")
-            self._generate_summary(results_df)
+            if index_builder is not None:
+                index_builder.finish()
+                print(f"Índice de búsqueda: {search_index_dir}")
+            
+            # El procesamiento terminó: los puntos de control ya no son necesarios
+            if checkpoint is not None:
+                checkpoint.clear()
             
             # Mostrar tiempo total
             total_time = time.time() - start_time
+            print(f"\nComentarios por ruta rápida (vacíos o triviales): {self.fast_path_count}/{total_comments}")
+            logging.info(f"Ruta rápida: {self.fast_path_count} de {total_comments} comentarios enviados a Otros")
+            if self.cascade_threshold is not None:
+                print(f"Comentarios evaluados por el analizador completo: "
+                      f"{self.cascade_escalated}/{total_comments}")
+                logging.info(f"Modo cascada: {self.cascade_escalated} de {total_comments} "
+                             f"comentarios evaluados por el analizador completo")
             print(f"\nProceso completado en {total_time/60:.1f} minutos")
             print(f"Hora de finalización: {datetime.now().strftime('%H:%M:%S')}")
             logging.info(f"Proceso completado en {total_time/60:.1f} minutos")
+            return total_comments
             
         except Exception as e:
             logging.error(f"Error procesando archivo: {str(e)}")
+            if pool is not None:
+                pool.terminate()
+            if index_builder is not None:
+                index_builder.discard()
             raise
 
-    def _generate_summary(self, df: pd.DataFrame) -> None:
+    def _run_settings(self) -> Dict[str, object]:
+        """
+        Parámetros que afectan los resultados, para el hash de configuración.
+        
+        Además del motor y del umbral de cascada incluye el modelo del motor lineal
+        (ruta, tamaño y fecha de modificación) y el estado del aprendizaje (fecha,
+        de la que depende el decaimiento de los pesos, y modificación del archivo).
+        """
+        settings = {'engine': self.engine.name, 'cascade_threshold': self.cascade_threshold}
+        model_file = getattr(self.engine, 'model_file', None)
+        if model_file is not None and os.path.exists(model_file):
+            stat = os.stat(model_file)
+            settings['model_file'] = {
+                'path': os.path.abspath(model_file),
+                'size': stat.st_size,
+                'mtime': stat.st_mtime_ns
+            }
+        settings['learning'] = LearningSystem._current_key()
+        return settings
+    
+    def _summary_metadata(self) -> Dict[str, object]:
+        """Retorna las líneas informativas del resumen de categorización."""
+        metadata = {
+            FAST_PATH_LABEL: self.fast_path_count,
+            'Ejemplos de aprendizaje': self.learning_system.get_examples_count(),
+            'Última actualización de aprendizaje': self.learning_system.learning_data['last_update']
+        }
+        if self.cascade_threshold is not None:
+            metadata[CASCADE_LABEL] = self.cascade_escalated
+        return metadata
+    
+    def _generate_summary(self, df: pd.DataFrame, summary_file: str = SUMMARY_FILE) -> None:
         """
         Genera un resumen de las categorizaciones.
         
         Args:
             df (pd.DataFrame): DataFrame con los resultados
+            summary_file (str): Ruta del archivo de resumen
         """
-        summary_file = 'Categorization_Analyst/data/summaries/categorization_summary_v2.txt'
-        
-        # Crear directorios si no existen
-        os.makedirs(os.path.dirname(summary_file), exist_ok=True)
-        
-        with open(summary_file, 'w', encoding='utf-8') as f:
-            f.write("Resumen de Categorización de Comentarios (v2)\n")
-            f.write("==========================================\n\n")
-            
-            # Información general
-            f.write(f"Fecha de generación: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"Total de comentarios procesados: {len(df)}\n")
-            f.write(f"Ejemplos de aprendizaje: {self.learning_system.get_examples_count()}\n")
-            f.write(f"Última actualización de aprendizaje: {self.learning_system.learning_data['last_update']}\n\n")
-            
-            # Resumen por categoría
-            f.write("Distribución por Categoría:\n")
-            f.write("------------------------\n")
-            category_counts = df['Categoría'].value_counts()
-            for category, count in category_counts.items():
-                percentage = (count / len(df)) * 100
-                f.write(f"{category}: {count} comentarios ({percentage:.1f}%)\n")
-            
-            f.write("\nDistribución por Subcategoría:\n")
-            f.write("----------------------------\n")
-            subcategory_counts = df['Subcategoría'].value_counts()
-            for subcategory, count in subcategory_counts.items():
-                if pd.notna(subcategory):  # Solo mostrar subcategorías no nulas
-                    percentage = (count / len(df)) * 100
-                    f.write(f"{subcategory}: {count} comentarios ({percentage:.1f}%)\n")
-            
-            f.write("\nDistribución por Tipo:\n")
-            f.write("----------------------\n")
-            type_counts = df['Tipo'].value_counts()
-            for type_name, count in type_counts.items():
-                if pd.notna(type_name):  # Solo mostrar tipos no nulos
-                    percentage = (count / len(df)) * 100
-                    f.write(f"{type_name}: {count} comentarios ({percentage:.1f}%)\n")
+        write_summary(summary_counts(df), self._summary_metadata(), summary_file)
 
-def main(input_file=None, output_file=None):
+def main(input_file=None, output_file=None, engine='keyword', cascade_threshold=None,
+         resume=False, checkpoint_dir=None, shard=None, shard_dir=None, sqlite_path=None,
+         run_id=None, keyword_stats=False, search_index_dir=None, batch_size=1000,
+         target_batch_seconds=TARGET_BATCH_SECONDS, workers=1, model_file=None):
     """
     Función principal del script.
     
     Args:
         input_file (str, optional): Ruta al archivo de entrada. Por defecto None.
         output_file (str, optional): Ruta al archivo de salida. Por defecto None.
+        engine (str, optional): Motor de categorización ('keyword' o 'linear').
+        cascade_threshold (float, optional): Activa el modo cascada con este umbral de margen.
+        resume (bool, optional): Reanuda desde el último punto de control.
+        checkpoint_dir (str, optional): Directorio de puntos de control. Por defecto uno
+            por archivo de salida (y fragmento) dentro de CHECKPOINT_DIR.
+        shard (Tuple[int, int], optional): (índice, cantidad) del fragmento a procesar.
+        shard_dir (str, optional): Directorio compartido de fragmentos. Por defecto
+            'shards' junto al archivo de salida.
+        sqlite_path (str, optional): Base SQLite donde insertar también los resultados.
+        run_id (str, optional): Identificador de la ejecución en la base SQLite.
+        keyword_stats (bool, optional): Registra estadísticas de palabras clave y escribe
+            su reporte junto al resumen.
+        search_index_dir (str, optional): Construye el índice invertido de palabras en este
+            directorio (en modo fragmento, en un subdirectorio por fragmento).
+        batch_size (int, optional): Cantidad de comentarios del primer lote.
+        target_batch_seconds (float, optional): Tiempo objetivo por lote; None mantiene
+            fijo el tamaño de lote.
+        workers (int, optional): Cantidad de procesos trabajadores.
+        model_file (str, optional): Ruta del modelo del motor lineal.
     """
-    processor = CommentProcessor()
+    setup_logging()
+    
+    processor = CommentProcessor(engine=engine, model_file=model_file)
+    if cascade_threshold is not None:
+        processor.enable_cascade(cascade_threshold)
+    if keyword_stats:
+        processor.enable_keyword_stats()
     
     # Si no se proporcionan rutas, usar las predeterminadas
     if input_file is None:
@@ -447,10 +969,33 @@ def main(input_file=None, output_file=None):
     # Crear directorios si no existen
     os.makedirs(os.path.dirname(output_file), exist_ok=True)
     
+    if checkpoint_dir is None:
+        checkpoint_name = Path(output_file).stem
+        if shard is not None:
+            checkpoint_name = f'{checkpoint_name}.{shard_name(*shard)}'
+        checkpoint_dir = os.path.join(CHECKPOINT_DIR, checkpoint_name)
+    if shard is not None and shard_dir is None:
+        shard_dir = os.path.join(os.path.dirname(output_file), 'shards')
+    if shard is not None and search_index_dir is not None:
+        search_index_dir = os.path.join(search_index_dir, shard_name(*shard))
+    
+    results_store = ResultsStore(sqlite_path) if sqlite_path else None
+    
     # Procesar archivo
-    processor.process_file(str(input_file), str(output_file))
+    try:
+        processor.process_file(str(input_file), str(output_file), batch_size=batch_size,
+                               checkpoint_dir=checkpoint_dir, resume=resume,
+                               shard=shard, shard_dir=shard_dir,
+                               results_store=results_store, run_id=run_id,
+                               search_index_dir=search_index_dir,
+                               target_batch_seconds=target_batch_seconds, workers=workers)
+    finally:
+        if results_store is not None:
+            results_store.close()
 
 if __name__ == "__main__":
+    setup_logging()
+    
     # Crear instancia del procesador
     processor = CommentProcessor()
     
@@ -0,0 +1,235 @@
+"""
+Resultados de categorización tipados y por lotes.
+
+Cada comentario se categoriza en un CategorizationResult: una tupla con nombre
+de códigos enteros de categoría, subcategoría y tipo (ver LABELS) más el margen
+y la confianza. Un lote completo se guarda en un ResultBatch, que mantiene un
+arreglo por campo (int16 para los códigos y float32 para los puntajes) en lugar
+de un diccionario por fila; los nombres de las etiquetas solo se materializan al
+exportar el lote (to_frame o records).
+"""
+
+import logging
+import math
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .categories_config import CATEGORIES
+
+# Código de una etiqueta vacía (sin subcategoría o sin tipo)
+NO_LABEL = -1
+
+# Decimales con que se exportan los puntajes float32
+SCORE_DECIMALS = 6
+
+# Categoría a la que se traducen las categorías desconocidas
+UNKNOWN_CATEGORY = 'Otros'
+
+class LabelCodes:
+    """
+    Códigos enteros de las categorías y los tipos.
+    
+    Los códigos quedan fijos al crearse (no se agregan etiquetas después), así que
+    son los mismos en todos los procesos y ejecuciones con la misma configuración.
+    Una etiqueta desconocida (p. ej. de un modelo entrenado con otra configuración)
+    se traduce explícitamente: una categoría a Otros y una subcategoría o un tipo a
+    NO_LABEL, con una advertencia la primera vez que aparece.
+    """
+    
+    def __init__(self, categories: Iterable[str], types: Iterable[str]):
+        self.categories: Tuple[str, ...] = tuple(dict.fromkeys(categories))
+        self.types: Tuple[str, ...] = tuple(dict.fromkeys(types))
+        self._category_codes = {name: code for code, name in enumerate(self.categories)}
+        self._type_codes = {name: code for code, name in enumerate(self.types)}
+        if UNKNOWN_CATEGORY not in self._category_codes:
+            raise ValueError(f"La configuración de categorías debe incluir '{UNKNOWN_CATEGORY}'")
+        self._warned = set()
+    
+    @classmethod
+    def from_config(cls) -> 'LabelCodes':
+        """Códigos en el orden de la configuración de categorías y sus tipos."""
+        return cls(CATEGORIES, [type_name for info in CATEGORIES.values() for type_name in info['types']])
+    
+    def _code(self, codes: Dict[str, int], name, kind: str, unknown: int) -> int:
+        if name is None or (isinstance(name, float) and math.isnan(name)):
+            return NO_LABEL
+        code = codes.get(str(name))
+        if code is None:
+            if (kind, name) not in self._warned:
+                self._warned.add((kind, name))
+                replacement = self.category_name(unknown) if unknown != NO_LABEL else 'ninguna etiqueta'
+                logging.warning(f"{kind} '{name}' fuera de la configuración; se usa {replacement}")
+            return unknown
+        return code
+    
+    def category_code(self, name: Optional[str]) -> int:
+        """Código de una categoría (NO_LABEL si no hay, Otros si es desconocida)."""
+        return self._code(self._category_codes, name, 'Categoría', self._category_codes[UNKNOWN_CATEGORY])
+    
+    def subcategory_code(self, name: Optional[str]) -> int:
+        """Código de una subcategoría (NO_LABEL si no hay o es desconocida)."""
+        return self._code(self._category_codes, name, 'Subcategoría', NO_LABEL)
+    
+    def type_code(self, name: Optional[str]) -> int:
+        """Código de un tipo (NO_LABEL si no hay o es desconocido)."""
+        return self._code(self._type_codes, name, 'Tipo', NO_LABEL)
+    
+    def category_name(self, code: int) -> Optional[str]:
+        """Nombre de una categoría (None para NO_LABEL)."""
+        return self.categories[code] if code >= 0 else None
+    
+    def type_name(self, code: int) -> Optional[str]:
+        """Nombre de un tipo (None para NO_LABEL)."""
+        return self.types[code] if code >= 0 else None
+
+# Códigos compartidos por el procesador, los motores y el analizador
+LABELS = LabelCodes.from_config()
+
+OTROS = LABELS.category_code(UNKNOWN_CATEGORY)
+
+class CategorizationResult(NamedTuple):
+    """Resultado de un comentario con etiquetas codificadas (ver LABELS)."""
+    category: int
+    subcategory: int = NO_LABEL
+    type: int = NO_LABEL
+    margin: float = 0.0
+    confidence: float = math.nan
+    
+    @classmethod
+    def from_names(cls, category: str, subcategory: Optional[str] = None, type_name: Optional[str] = None,
+                   margin: float = 0.0) -> 'CategorizationResult':
+        """Crea un resultado a partir de los nombres de las etiquetas."""
+        return cls(LABELS.category_code(category), LABELS.subcategory_code(subcategory),
+                   LABELS.type_code(type_name), margin)
+    
+    def names(self) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+        """(categoría, subcategoría, tipo) como nombres."""
+        return (LABELS.category_name(self.category), LABELS.category_name(self.subcategory),
+                LABELS.type_name(self.type))
+
+OTROS_RESULT = CategorizationResult(OTROS)
+
+class ResultBatch:
+    """Resultados de un lote como un arreglo por campo."""
+    
+    __slots__ = ('pnr', 'comments', 'category', 'subcategory', 'type', 'margin', 'confidence')
+    
+    def __init__(self, pnr: Sequence, comments: Sequence, category: np.ndarray, subcategory: np.ndarray,
+                 type_codes: np.ndarray, margin: np.ndarray, confidence: Optional[np.ndarray] = None):
+        """
+        Args:
+            pnr (Sequence): PNR de cada comentario
+            comments (Sequence): Comentario original
+            category (np.ndarray): Código de categoría
+            subcategory (np.ndarray): Código de subcategoría
+            type_codes (np.ndarray): Código de tipo
+            margin (np.ndarray): Margen entre la mejor y la segunda mejor categoría
+            confidence (np.ndarray, optional): Confianza (solo en modo cascada)
+        """
+        self.pnr = np.asarray(pnr, dtype=object)
+        self.comments = np.asarray(comments, dtype=object)
+        self.category = np.asarray(category, dtype=np.int16)
+        self.subcategory = np.asarray(subcategory, dtype=np.int16)
+        self.type = np.asarray(type_codes, dtype=np.int16)
+        self.margin = np.asarray(margin, dtype=np.float32)
+        self.confidence = None if confidence is None else np.asarray(confidence, dtype=np.float32)
+    
+    @classmethod
+    def from_results(cls, pnr: Sequence, comments: Sequence,
+                     results: Sequence[CategorizationResult]) -> 'ResultBatch':
+        """Crea un lote a partir de un resultado por comentario."""
+        if not len(results):
+            empty = np.empty(0)
+            return cls(pnr, comments, empty, empty, empty, empty)
+        columns = np.array(results, dtype=np.float64).T
+        return cls(pnr, comments, columns[0], columns[1], columns[2], columns[3])
+    
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'ResultBatch':
+        """Crea un lote a partir de un DataFrame con las columnas de to_frame."""
+        return cls(
+            df['PNR'].tolist(), df['Comentario'].tolist(),
+            [LABELS.category_code(name) for name in df['Categoría']],
+            [LABELS.subcategory_code(name) for name in df['Subcategoría']],
+            [LABELS.type_code(name) for name in df['Tipo']],
+            df['Margen'].to_numpy() if 'Margen' in df.columns else np.zeros(len(df)),
+            df['Confianza'].to_numpy() if 'Confianza' in df.columns else None
+        )
+    
+    @classmethod
+    def concat(cls, batches: Sequence['ResultBatch']) -> 'ResultBatch':
+        """Une varios lotes en orden."""
+        if not batches:
+            return cls.from_results([], [], [])
+        fields = {name: np.concatenate([getattr(batch, name) for batch in batches])
+                  for name in ('pnr', 'comments', 'category', 'subcategory', 'type', 'margin')}
+        confidence = None
+        if all(batch.confidence is not None for batch in batches):
+            confidence = np.concatenate([batch.confidence for batch in batches])
+        return cls(fields['pnr'], fields['comments'], fields['category'], fields['subcategory'],
+                   fields['type'], fields['margin'], confidence)
+    
+    def differences(self, other: 'ResultBatch') -> np.ndarray:
+        """
+        Posiciones cuyo resultado difiere del de otro lote con los mismos comentarios.
+        
+        Los puntajes se comparan bit a bit, de modo que un lote sin diferencias
+        produce exactamente la misma salida.
+        """
+        if len(self) != len(other):
+            raise ValueError(f"Los lotes tienen distinto largo: {len(self)} y {len(other)}")
+        differ = np.zeros(len(self), dtype=bool)
+        for mine, theirs in ((self.pnr, other.pnr), (self.comments, other.comments)):
+            differ |= ~((mine == theirs) | (pd.isna(mine) & pd.isna(theirs)))
+        for name in ('category', 'subcategory', 'type'):
+            differ |= getattr(self, name) != getattr(other, name)
+        differ |= self.margin.view(np.uint32) != other.margin.view(np.uint32)
+        if (self.confidence is None) != (other.confidence is None):
+            differ[:] = True
+        elif self.confidence is not None:
+            differ |= self.confidence.view(np.uint32) != other.confidence.view(np.uint32)
+        return np.flatnonzero(differ)
+    
+    def __len__(self) -> int:
+        return len(self.category)
+    
+    def __getitem__(self, i: int) -> CategorizationResult:
+        return CategorizationResult(
+            int(self.category[i]), int(self.subcategory[i]), int(self.type[i]), float(self.margin[i]),
+            float(self.confidence[i]) if self.confidence is not None else math.nan
+        )
+    
+    @staticmethod
+    def _names(labels: Sequence[str], codes: np.ndarray) -> List[Optional[str]]:
+        """Nombres de un arreglo de códigos (None para NO_LABEL)."""
+        names = np.array(list(labels) + [None], dtype=object)
+        return names[codes].tolist()
+    
+    def columns(self) -> Dict[str, list]:
+        """
+        Columnas exportables del lote.
+        
+        Margen y Confianza solo se incluyen en modo cascada, como en la salida histórica.
+        """
+        columns = {
+            'PNR': self.pnr.tolist(),
+            'Comentario': self.comments.tolist(),
+            'Categoría': self._names(LABELS.categories, self.category),
+            'Subcategoría': self._names(LABELS.categories, self.subcategory),
+            'Tipo': self._names(LABELS.types, self.type)
+        }
+        if self.confidence is not None:
+            columns['Margen'] = np.round(self.margin.astype(np.float64), SCORE_DECIMALS).tolist()
+            columns['Confianza'] = np.round(self.confidence.astype(np.float64), SCORE_DECIMALS).tolist()
+        return columns
+    
+    def to_frame(self) -> pd.DataFrame:
+        """DataFrame con una fila por comentario y las etiquetas como nombres."""
+        return pd.DataFrame(self.columns())
+    
+    def records(self) -> List[Dict]:
+        """Un diccionario por comentario, con las mismas claves que to_frame."""
+        columns = self.columns()
+        return [dict(zip(columns, values)) for values in zip(*columns.values())]
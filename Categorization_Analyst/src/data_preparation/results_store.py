@@ -0,0 +1,183 @@
+"""
+Almacén SQLite de resultados de categorización con consultas indexadas.
+
+Es un destino opcional adicional al Excel de salida: cada lote se inserta con
+executemany en modo WAL y las consultas de conteo y detalle usan índices por
+pnr, categoría, tipo, confianza y ejecución.
+"""
+
+import math
+import os
+import sqlite3
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Base de datos por defecto
+RESULTS_DB = 'Categorization_Analyst/data/output/categorized_comments.sqlite'
+
+# Columnas del resultado (clave del diccionario -> columna SQL)
+RESULT_COLUMNS = {
+    'PNR': 'pnr',
+    'Comentario': 'comentario',
+    'Categoría': 'categoria',
+    'Subcategoría': 'subcategoria',
+    'Tipo': 'tipo',
+    'Margen': 'margen',
+    'Confianza': 'confianza'
+}
+
+# Columnas por las que se permite agrupar en los conteos
+GROUP_COLUMNS = ('categoria', 'subcategoria', 'tipo', 'run_id')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    input_file TEXT,
+    started_at TEXT,
+    finished_at TEXT,
+    rows INTEGER
+);
+CREATE TABLE IF NOT EXISTS results (
+    run_id TEXT NOT NULL,
+    fila INTEGER NOT NULL,
+    pnr TEXT,
+    comentario TEXT,
+    categoria TEXT,
+    subcategoria TEXT,
+    tipo TEXT,
+    margen REAL,
+    confianza REAL,
+    PRIMARY KEY (run_id, fila)
+);
+CREATE INDEX IF NOT EXISTS idx_results_pnr ON results (pnr);
+CREATE INDEX IF NOT EXISTS idx_results_categoria ON results (categoria, tipo);
+CREATE INDEX IF NOT EXISTS idx_results_tipo ON results (tipo);
+CREATE INDEX IF NOT EXISTS idx_results_confianza ON results (confianza);
+CREATE INDEX IF NOT EXISTS idx_results_run ON results (run_id);
+"""
+
+def _sql_value(value):
+    """Convierte NaN y valores de pandas/numpy a tipos que SQLite acepta."""
+    if value is None:
+        return None
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    if hasattr(value, 'item'):
+        return value.item()
+    return value
+
+class ResultsStore:
+    """Destino SQLite para los resultados de categorización."""
+    
+    def __init__(self, db_path: str = RESULTS_DB):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.connection = sqlite3.connect(db_path)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.executescript(SCHEMA)
+    
+    def close(self) -> None:
+        """Cierra la conexión."""
+        self.connection.close()
+    
+    def start_run(self, run_id: str, input_file: str) -> None:
+        """Registra el inicio de una ejecución (o su reanudación)."""
+        with self.connection:
+            self.connection.execute(
+                'INSERT OR IGNORE INTO runs (run_id, input_file, started_at) VALUES (?, ?, ?)',
+                (run_id, input_file, datetime.now().isoformat())
+            )
+    
+    def finish_run(self, run_id: str) -> None:
+        """Registra el término de una ejecución y su cantidad de filas."""
+        with self.connection:
+            self.connection.execute(
+                'UPDATE runs SET finished_at = ?, rows = (SELECT COUNT(*) FROM results WHERE run_id = ?) '
+                'WHERE run_id = ?',
+                (datetime.now().isoformat(), run_id, run_id)
+            )
+    
+    def is_finished(self, run_id: str) -> bool:
+        """Indica si una ejecución ya se registró como terminada."""
+        row = self.connection.execute('SELECT finished_at FROM runs WHERE run_id = ?', (run_id,)).fetchone()
+        return row is not None and row[0] is not None
+    
+    def insert_results(self, run_id: str, rows: Iterable[int], results) -> None:
+        """
+        Inserta un lote de resultados.
+        
+        La clave (run_id, fila) hace que reinsertar un lote (por ejemplo, al
+        reanudar desde un punto de control) reemplace las filas en lugar de duplicarlas.
+        
+        Args:
+            run_id (str): Identificador de la ejecución
+            rows (Iterable[int]): Posición de cada resultado en el archivo de entrada
+            results (ResultBatch): Resultados generados por CommentProcessor.process_batch
+        """
+        records = [
+            (run_id, int(row)) + tuple(_sql_value(result.get(key)) for key in RESULT_COLUMNS)
+            for row, result in zip(rows, results.records())
+        ]
+        columns = ', '.join(['run_id', 'fila'] + list(RESULT_COLUMNS.values()))
+        placeholders = ', '.join('?' * (len(RESULT_COLUMNS) + 2))
+        with self.connection:
+            self.connection.executemany(
+                f'INSERT OR REPLACE INTO results ({columns}) VALUES ({placeholders})', records)
+    
+    @staticmethod
+    def _filters(run_id: Optional[str] = None, category: Optional[str] = None,
+                 type_name: Optional[str] = None, pnr: Optional[str] = None,
+                 min_confidence: Optional[float] = None) -> Tuple[str, List]:
+        """Construye la cláusula WHERE y sus parámetros."""
+        conditions, params = [], []
+        for column, value in (('run_id', run_id), ('categoria', category), ('tipo', type_name), ('pnr', pnr)):
+            if value is not None:
+                conditions.append(f'{column} = ?')
+                params.append(value)
+        if min_confidence is not None:
+            conditions.append('confianza >= ?')
+            params.append(min_confidence)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        return where, params
+    
+    def counts(self, by: str = 'categoria', **filters) -> List[Tuple[str, int]]:
+        """
+        Cuenta resultados agrupados por una columna.
+        
+        Args:
+            by (str): Columna de agrupación ('categoria', 'subcategoria', 'tipo' o 'run_id')
+            **filters: run_id, category, type_name, pnr o min_confidence
+        
+        Returns:
+            List[Tuple[str, int]]: (valor, cantidad) ordenado por cantidad descendente
+        """
+        if by not in GROUP_COLUMNS:
+            raise ValueError(f"Columna de agrupación inválida: {by} (opciones: {GROUP_COLUMNS})")
+        where, params = self._filters(**filters)
+        query = (f'SELECT {by}, COUNT(*) AS cantidad FROM results {where} '
+                 f'GROUP BY {by} ORDER BY cantidad DESC, {by}')
+        return self.connection.execute(query, params).fetchall()
+    
+    def drill_down(self, limit: int = 20, **filters) -> List[Dict]:
+        """
+        Retorna los comentarios que cumplen los filtros.
+        
+        Args:
+            limit (int): Cantidad máxima de filas
+            **filters: run_id, category, type_name, pnr o min_confidence
+        
+        Returns:
+            List[Dict]: Filas con las columnas del resultado
+        """
+        where, params = self._filters(**filters)
+        columns = ['run_id', 'fila'] + list(RESULT_COLUMNS.values())
+        query = f"SELECT {', '.join(columns)} FROM results {where} ORDER BY run_id, fila LIMIT ?"
+        cursor = self.connection.execute(query, params + [limit])
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+    
+    def runs(self) -> List[Dict]:
+        """Lista las ejecuciones registradas."""
+        columns = ['run_id', 'input_file', 'started_at', 'finished_at', 'rows']
+        cursor = self.connection.execute(f"SELECT {', '.join(columns)} FROM runs ORDER BY started_at")
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
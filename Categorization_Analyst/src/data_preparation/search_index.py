@@ -0,0 +1,244 @@
+"""
+Índice invertido de palabras sobre los comentarios procesados.
+
+Durante la categorización se registra, para cada palabra del texto ya
+normalizado, la lista de filas donde aparece. Al terminar, las listas se
+guardan como arreglos de enteros codificados por diferencias (delta), junto a
+la categoría y el tipo de cada fila, de modo que las consultas booleanas por
+palabra (filtradas por categoría o tipo) no necesitan recorrer el Excel de
+salida. Los enteros se guardan con el tipo sin signo más pequeño que los
+contiene (las diferencias quedan acotadas por la cantidad de filas) y sin
+comprimir, y se abren mapeados en memoria, de modo que abrir el índice no lee
+ni descomprime las listas completas.
+
+Estructura del directorio del índice:
+    tokens.npy      vocabulario ordenado
+    offsets.npy     inicio de las filas de cada palabra en deltas.npy
+    deltas.npy      filas de cada palabra codificadas por diferencias
+    categories.npy  código de categoría de cada fila (ver results.LABELS)
+    types.npy       código de tipo de cada fila
+    rows.jsonl      una línea JSON por fila con el resultado completo
+    row_offsets.npy posición en bytes de cada línea de rows.jsonl
+    meta.json       cantidad de filas y nombres de categorías y tipos
+"""
+
+import json
+import os
+import shutil
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from .atomic_io import atomic_write_json, read_json
+from .results import LABELS
+from .text_normalization import normalize_text
+
+# Directorio por defecto del índice
+SEARCH_INDEX_DIR = 'Categorization_Analyst/data/output/search_index'
+
+# Columnas del resultado que se guardan en rows.jsonl
+ROW_FIELDS = ['PNR', 'Comentario', 'Categoría', 'Subcategoría', 'Tipo']
+
+def _smallest_unsigned(values: np.ndarray) -> np.ndarray:
+    """Convierte enteros no negativos al tipo sin signo más pequeño que los contiene."""
+    return values.astype(np.min_scalar_type(int(values.max()) if len(values) else 0))
+
+class SearchIndexBuilder:
+    """Construye un índice invertido a partir de los lotes procesados."""
+    
+    def __init__(self, directory: str):
+        """
+        Args:
+            directory (str): Directorio final del índice (se reemplaza al terminar)
+        """
+        self.directory = Path(directory)
+        self.tmp_directory = self.directory.with_name(f'{self.directory.name}.tmp-{os.getpid()}')
+        if self.tmp_directory.exists():
+            shutil.rmtree(self.tmp_directory)
+        self.tmp_directory.mkdir(parents=True)
+        
+        self.postings = defaultdict(list)
+        self.category_codes = []
+        self.type_codes = []
+        self.row_offsets = []
+        self.rows_file = open(self.tmp_directory / 'rows.jsonl', 'wb')
+    
+    def add_batch(self, rows: Iterable[int], texts: List[str], results) -> None:
+        """
+        Agrega un lote de resultados al índice.
+        
+        Args:
+            rows (Iterable[int]): Posición de cada resultado en el archivo de entrada
+            texts (List[str]): Texto normalizado de cada comentario
+            results (ResultBatch): Resultados generados por CommentProcessor.process_batch
+        """
+        position = len(self.row_offsets)
+        self.category_codes.append(results.category)
+        self.type_codes.append(results.type)
+        for row, text, result in zip(rows, texts, results.records()):
+            for token in set(text.split()):
+                self.postings[token].append(position)
+            
+            record = {'fila': int(row)}
+            for field in ROW_FIELDS:
+                value = result.get(field)
+                record[field] = None if value is None or value != value else (
+                    value.item() if hasattr(value, 'item') else value)
+            self.row_offsets.append(self.rows_file.tell())
+            self.rows_file.write(json.dumps(record, ensure_ascii=False).encode('utf-8') + b'\n')
+            position += 1
+    
+    def discard(self) -> None:
+        """Descarta el índice en construcción (el índice anterior, si existe, se conserva)."""
+        self.rows_file.close()
+        shutil.rmtree(self.tmp_directory, ignore_errors=True)
+        self.postings.clear()
+    
+    def finish(self) -> None:
+        """Escribe los arreglos del índice y lo activa en su directorio final."""
+        self.rows_file.close()
+        
+        tokens = sorted(self.postings)
+        offsets = np.zeros(len(tokens) + 1, dtype=np.int64)
+        deltas = []
+        for i, token in enumerate(tokens):
+            positions = np.asarray(self.postings[token], dtype=np.int64)
+            deltas.append(np.diff(positions, prepend=0))
+            offsets[i + 1] = offsets[i] + len(positions)
+        
+        arrays = {
+            'tokens': np.array(tokens, dtype=str),
+            'offsets': _smallest_unsigned(offsets),
+            'deltas': _smallest_unsigned(np.concatenate(deltas) if deltas else np.array([], dtype=np.int64)),
+            'categories': np.concatenate(self.category_codes or [np.array([], dtype=np.int16)]),
+            'types': np.concatenate(self.type_codes or [np.array([], dtype=np.int16)]),
+            'row_offsets': _smallest_unsigned(np.array(self.row_offsets, dtype=np.int64))
+        }
+        for name, array in arrays.items():
+            np.save(self.tmp_directory / f'{name}.npy', array, allow_pickle=False)
+        atomic_write_json(str(self.tmp_directory / 'meta.json'), {
+            'rows': len(self.row_offsets),
+            'categories': list(LABELS.categories),
+            'types': list(LABELS.types)
+        }, ensure_ascii=False, indent=2)
+        
+        # Reemplazar el índice anterior
+        old_directory = self.directory.with_name(f'{self.directory.name}.old-{os.getpid()}')
+        if self.directory.exists():
+            os.replace(self.directory, old_directory)
+        os.replace(self.tmp_directory, self.directory)
+        shutil.rmtree(old_directory, ignore_errors=True)
+        self.postings.clear()
+
+class SearchIndex:
+    """Consultas booleanas sobre un índice construido con SearchIndexBuilder."""
+    
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        meta = read_json(str(self.directory / 'meta.json'))
+        if meta is None:
+            raise FileNotFoundError(f"No se encontró un índice en: {directory}")
+        self.size = meta['rows']
+        self.categories = {name: code for code, name in enumerate(meta['categories'])}
+        self.types = {name: code for code, name in enumerate(meta['types'])}
+        self.tokens = self._load('tokens')
+        self.offsets = self._load('offsets')
+        self.deltas = self._load('deltas')
+        self.category_codes = self._load('categories')
+        self.type_codes = self._load('types')
+        self.row_offsets = self._load('row_offsets')
+    
+    def _load(self, name: str) -> np.ndarray:
+        """Abre un arreglo del índice mapeado en memoria."""
+        return np.load(self.directory / f'{name}.npy', mmap_mode='r', allow_pickle=False)
+    
+    def postings(self, token: str) -> np.ndarray:
+        """Filas (ordenadas) donde aparece una palabra ya normalizada."""
+        position = int(np.searchsorted(self.tokens, token))
+        if position >= len(self.tokens) or self.tokens[position] != token:
+            return np.array([], dtype=np.int64)
+        start, end = int(self.offsets[position]), int(self.offsets[position + 1])
+        # La suma se acumula en int64: las diferencias usan un tipo más pequeño
+        return np.cumsum(self.deltas[start:end], dtype=np.int64)
+    
+    def _term(self, term: str) -> np.ndarray:
+        """Filas que contienen todas las palabras de un término (p. ej. 'check-in')."""
+        result = None
+        for token in normalize_text(term).split():
+            rows = self.postings(token)
+            result = rows if result is None else np.intersect1d(result, rows, assume_unique=True)
+        return result if result is not None else np.array([], dtype=np.int64)
+    
+    def search(self, query: str, category: Optional[str] = None,
+               type_name: Optional[str] = None) -> np.ndarray:
+        """
+        Busca las filas que cumplen una consulta booleana.
+        
+        Las palabras separadas por espacios deben aparecer todas (AND), 'OR'
+        separa alternativas y un prefijo '-' o 'NOT' excluye una palabra, p. ej.
+        'rechazo tarjeta OR rechazado -banco'.
+        
+        Args:
+            query (str): Consulta
+            category (str, optional): Solo filas de esta categoría
+            type_name (str, optional): Solo filas de este tipo
+        
+        Returns:
+            np.ndarray: Posiciones (ordenadas) de las filas en el índice
+        """
+        result = np.array([], dtype=np.int64)
+        for group in ' '.join(query.split()).split(' OR '):
+            include, exclude = [], []
+            negate = False
+            for term in group.split():
+                if term == 'NOT':
+                    negate = True
+                    continue
+                if term.startswith('-') and len(term) > 1:
+                    negate, term = True, term[1:]
+                (exclude if negate else include).append(term)
+                negate = False
+            
+            rows = None
+            for term in include:
+                term_rows = self._term(term)
+                rows = term_rows if rows is None else np.intersect1d(rows, term_rows, assume_unique=True)
+            if rows is None:
+                rows = np.arange(self.size, dtype=np.int64) if exclude else np.array([], dtype=np.int64)
+            for term in exclude:
+                rows = np.setdiff1d(rows, self._term(term), assume_unique=True)
+            result = np.union1d(result, rows)
+        
+        if category is not None:
+            code = self.categories.get(category, -2)
+            result = result[self.category_codes[result] == code]
+        if type_name is not None:
+            code = self.types.get(type_name, -2)
+            result = result[self.type_codes[result] == code]
+        return result
+    
+    def rows(self, positions: Iterable[int]) -> List[Dict]:
+        """Lee de rows.jsonl los resultados de las filas indicadas."""
+        records = []
+        with open(self.directory / 'rows.jsonl', 'rb') as f:
+            for position in positions:
+                f.seek(int(self.row_offsets[position]))
+                records.append(json.loads(f.readline()))
+        return records
+
+def open_indexes(directory: str) -> List[SearchIndex]:
+    """
+    Abre un índice o, si el directorio contiene uno por fragmento, todos ellos.
+    
+    Args:
+        directory (str): Directorio de un índice o de índices por fragmento
+    """
+    directory = Path(directory)
+    if (directory / 'meta.json').exists():
+        return [SearchIndex(str(directory))]
+    indexes = [SearchIndex(str(path.parent)) for path in sorted(directory.glob('*/meta.json'))]
+    if not indexes:
+        raise FileNotFoundError(f"No se encontró un índice en: {directory}")
+    return indexes
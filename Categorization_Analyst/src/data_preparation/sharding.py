@@ -0,0 +1,169 @@
+"""
+Particionamiento determinista de la entrada en fragmentos (shards) y combinación
+de sus resultados.
+
+Cada máquina procesa solo las filas cuyo hash de pnr cae en su fragmento y deja
+en un directorio compartido sus resultados parciales y conteos agregables; el
+comando merge los combina en el archivo de salida y el resumen finales.
+"""
+
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import pandas as pd
+
+from .atomic_io import atomic_write_json, read_json
+from .keyword_stats import KeywordStats, keyword_stats_file
+from .summary import PER_RUN_COUNTERS, SUMMARY_FILE, merge_summary_counts, write_summary
+
+# Columna auxiliar con la posición original de cada fila en la entrada
+ROW_COLUMN = '_fila'
+
+def parse_shard(spec: str) -> Tuple[int, int]:
+    """
+    Interpreta una especificación de fragmento de la forma 'i/N'.
+    
+    Args:
+        spec (str): Índice (desde 0) y cantidad de fragmentos, p. ej. '0/4'
+    
+    Returns:
+        Tuple[int, int]: (índice, cantidad)
+    """
+    try:
+        index, count = (int(part) for part in spec.split('/'))
+    except ValueError:
+        raise ValueError(f"Fragmento inválido '{spec}': se espera el formato i/N")
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"Fragmento inválido '{spec}': el índice debe estar entre 0 y {count - 1}")
+    return index, count
+
+def shard_name(index: int, count: int) -> str:
+    """Nombre base de los archivos de un fragmento."""
+    return f'shard-{index:03d}-of-{count:03d}'
+
+def shard_mask(pnrs: pd.Series, index: int, count: int) -> pd.Series:
+    """
+    Selecciona las filas que pertenecen a un fragmento.
+    
+    Usa el hash estable de pandas sobre el pnr, de modo que la partición es la
+    misma en cualquier máquina y todos los comentarios de un pnr quedan juntos.
+    
+    Args:
+        pnrs (pd.Series): Columna pnr de la entrada
+        index (int): Índice del fragmento
+        count (int): Cantidad de fragmentos
+    
+    Returns:
+        pd.Series: Máscara booleana alineada con pnrs
+    """
+    hashes = pd.util.hash_pandas_object(pnrs.astype(str), index=False)
+    return (hashes % count) == index
+
+def write_shard_outputs(results_df: pd.DataFrame, counts: Dict, metadata: Dict, shard_dir: str,
+                        index: int, count: int, config_hash: str,
+                        keyword_stats: Optional[Dict] = None) -> None:
+    """
+    Guarda los resultados parciales y los conteos de un fragmento.
+    
+    El archivo de conteos se escribe al final y de forma atómica: su presencia
+    indica que el fragmento está completo.
+    
+    Args:
+        results_df (pd.DataFrame): Resultados del fragmento, con la columna ROW_COLUMN
+        counts (Dict): Conteos del resumen del fragmento
+        metadata (Dict): Contadores adicionales del fragmento (p. ej. ruta rápida)
+        shard_dir (str): Directorio compartido de fragmentos
+        index (int): Índice del fragmento
+        count (int): Cantidad de fragmentos
+        config_hash (str): Hash de la entrada y la configuración (ver compute_config_hash),
+            igual en todos los fragmentos de una misma ejecución
+        keyword_stats (Dict, optional): Estadísticas de palabras clave (KeywordStats.to_dict)
+    """
+    shard_dir = Path(shard_dir)
+    shard_dir.mkdir(parents=True, exist_ok=True)
+    name = shard_name(index, count)
+    
+    results_file = shard_dir / f'categorized_comments.{name}.pkl'
+    tmp_file = shard_dir / f'categorized_comments.{name}.pkl.tmp'
+    results_df.to_pickle(tmp_file)
+    os.replace(tmp_file, results_file)
+    
+    summary = {
+        'shard': index,
+        'num_shards': count,
+        'config_hash': config_hash,
+        'counts': counts,
+        'metadata': metadata
+    }
+    if keyword_stats is not None:
+        summary['keyword_stats'] = keyword_stats
+    atomic_write_json(str(shard_dir / f'summary.{name}.json'), summary, ensure_ascii=False, indent=2)
+    logging.info(f"Fragmento {index}/{count} guardado en: {shard_dir}")
+
+def merge_shards(shard_dir: str, output_file: str, summary_file: str = SUMMARY_FILE) -> pd.DataFrame:
+    """
+    Combina los fragmentos completos en el archivo de salida y el resumen finales.
+    
+    Se rechaza la combinación si los fragmentos no comparten la cantidad de
+    particiones y el hash de entrada y configuración (p. ej. fragmentos de una
+    ejecución anterior), o si falta o se repite algún índice.
+    
+    Args:
+        shard_dir (str): Directorio compartido de fragmentos
+        output_file (str): Ruta del archivo de salida (Excel)
+        summary_file (str): Ruta del resumen de categorización
+    
+    Returns:
+        pd.DataFrame: Resultados combinados en el orden original de la entrada
+    """
+    shard_dir = Path(shard_dir)
+    summaries = []
+    for path in sorted(shard_dir.glob('summary.shard-*.json')):
+        summaries.append(read_json(str(path)))
+    if not summaries:
+        raise FileNotFoundError(f"No se encontraron fragmentos en: {shard_dir}")
+    
+    num_shards = summaries[0]['num_shards']
+    if any(summary['num_shards'] != num_shards for summary in summaries):
+        raise ValueError("Los fragmentos no fueron generados con la misma cantidad de particiones")
+    config_hashes = {summary.get('config_hash') for summary in summaries}
+    if len(config_hashes) != 1 or None in config_hashes:
+        raise ValueError("Los fragmentos no fueron generados con la misma entrada y configuración")
+    found = [summary['shard'] for summary in summaries]
+    duplicated = sorted({index for index in found if found.count(index) > 1})
+    if duplicated:
+        raise ValueError(f"Fragmentos repetidos: {duplicated} (de {num_shards})")
+    missing = sorted(set(range(num_shards)) - set(found))
+    if missing:
+        raise ValueError(f"Faltan los fragmentos: {missing} (de {num_shards})")
+    
+    # Combinar resultados en el orden original de la entrada
+    frames = [pd.read_pickle(shard_dir / f'categorized_comments.{shard_name(i, num_shards)}.pkl')
+              for i in range(num_shards)]
+    results_df = pd.concat(frames, ignore_index=True).sort_values(ROW_COLUMN, kind='stable')
+    results_df = results_df.drop(columns=[ROW_COLUMN]).reset_index(drop=True)
+    
+    os.makedirs(os.path.dirname(os.path.abspath(output_file)), exist_ok=True)
+    logging.info(f"Guardando resultados combinados en: {output_file}")
+    results_df.to_excel(output_file, index=False)
+    
+    # Combinar conteos y contadores propios de cada fragmento; los valores globales
+    # (p. ej. ejemplos de aprendizaje) se toman del primer fragmento
+    counts = merge_summary_counts([summary['counts'] for summary in summaries])
+    metadata = dict(summaries[0]['metadata'])
+    for label in PER_RUN_COUNTERS:
+        if label in metadata:
+            metadata[label] = sum(summary['metadata'].get(label, 0) for summary in summaries)
+    metadata['Fragmentos combinados'] = num_shards
+    write_summary(counts, metadata, summary_file)
+    
+    # Estadísticas de palabras clave, si todos los fragmentos las registraron
+    if all('keyword_stats' in summary for summary in summaries):
+        keyword_stats = KeywordStats()
+        for summary in summaries:
+            keyword_stats.merge_dict(summary['keyword_stats'])
+        keyword_stats.write_report(keyword_stats_file(summary_file))
+    
+    return results_df
@@ -0,0 +1,140 @@
+"""
+Categorización en flujo: comentarios desde la entrada estándar y resultados JSONL
+hacia la salida estándar.
+
+Cada línea de entrada es un comentario en texto plano o un objeto JSON con los
+campos pnr y Comentario. Los comentarios se procesan en micro-lotes con un
+procesador ya inicializado y cada resultado se escribe como una línea JSON al
+terminar su lote, de modo que la memoria es constante y la salida inmediata.
+
+La entrada se lee en un hilo aparte, de modo que un lote incompleto se procesa
+cuando pasan FLUSH_INTERVAL segundos sin completarse (p. ej. si la entrada llega
+de a poco o queda abierta sin datos nuevos), en lugar de esperar a que se llene.
+"""
+
+import json
+import logging
+import queue
+import threading
+import time
+from typing import Dict, Iterator, Optional, TextIO
+
+import pandas as pd
+
+# Formatos de entrada aceptados
+INPUT_FORMATS = ('auto', 'text', 'jsonl')
+
+# Segundos máximos que un comentario espera en un micro-lote incompleto
+FLUSH_INTERVAL = 0.5
+
+# Marca de fin de la entrada en la cola del hilo lector
+_END = object()
+
+def read_comments(stream: TextIO, input_format: str = 'auto') -> Iterator[Dict]:
+    """
+    Lee comentarios línea a línea.
+    
+    Las líneas JSON inválidas o que no son un objeto se omiten con una advertencia
+    que indica su número de línea.
+    
+    Args:
+        stream (TextIO): Flujo de entrada
+        input_format (str): 'text' (una línea por comentario), 'jsonl' (objetos con
+            pnr y Comentario) o 'auto' (JSON si la línea empieza con '{')
+    
+    Yields:
+        Dict: Fila con las columnas pnr y Comentario
+    """
+    if input_format not in INPUT_FORMATS:
+        raise ValueError(f"Formato de entrada desconocido: {input_format} (opciones: {INPUT_FORMATS})")
+    
+    for line_number, line in enumerate(stream, start=1):
+        line = line.rstrip('\r\n')
+        if input_format == 'jsonl' or (input_format == 'auto' and line.lstrip().startswith('{')):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                logging.warning(f"Línea {line_number}: JSON inválido ({str(e)}); se omite")
+                continue
+            if not isinstance(record, dict):
+                logging.warning(f"Línea {line_number}: se esperaba un objeto JSON; se omite")
+                continue
+            yield {'pnr': record.get('pnr', line_number), 'Comentario': record.get('Comentario')}
+        else:
+            yield {'pnr': line_number, 'Comentario': line}
+
+def _json_default(value):
+    """Convierte los valores de numpy a tipos serializables en JSON."""
+    if hasattr(value, 'item'):
+        return value.item()
+    raise TypeError(f"Valor no serializable: {value!r}")
+
+def _read_into(pending: queue.Queue, input_stream: TextIO, input_format: str) -> None:
+    """Hilo lector: encola las filas leídas y al final _END (o el error de lectura)."""
+    try:
+        for row in read_comments(input_stream, input_format):
+            pending.put(row)
+    except Exception as e:
+        pending.put(e)
+    pending.put(_END)
+
+def categorize_stream(processor, input_stream: TextIO, output_stream: TextIO,
+                      batch_size: int = 100, input_format: str = 'auto',
+                      flush_interval: Optional[float] = FLUSH_INTERVAL) -> int:
+    """
+    Categoriza los comentarios de un flujo y escribe un resultado JSON por línea.
+    
+    Args:
+        processor (CommentProcessor): Procesador ya inicializado
+        input_stream (TextIO): Flujo de entrada (ver read_comments)
+        output_stream (TextIO): Flujo de salida
+        batch_size (int): Comentarios por micro-lote; la salida se vacía tras cada uno
+        input_format (str): Formato de entrada ('auto', 'text' o 'jsonl')
+        flush_interval (float, optional): Segundos tras los que se procesa un lote
+            incompleto (None: solo al llenarse o al terminar la entrada)
+    
+    Returns:
+        int: Cantidad de comentarios categorizados
+    """
+    processed = 0
+    
+    def flush(rows):
+        for result in processor.process_batch(pd.DataFrame(rows, columns=['pnr', 'Comentario'])).records():
+            output_stream.write(json.dumps(result, ensure_ascii=False, default=_json_default) + '\n')
+        output_stream.flush()
+    
+    # Cola acotada: el lector se detiene si el procesamiento va más lento que la entrada
+    pending = queue.Queue(maxsize=batch_size)
+    threading.Thread(target=_read_into, args=(pending, input_stream, input_format), daemon=True).start()
+    
+    rows = []
+    deadline = None
+    while True:
+        timeout = None
+        if rows and flush_interval is not None:
+            timeout = max(0.0, deadline - time.monotonic())
+        try:
+            row = pending.get(timeout=timeout)
+        except queue.Empty:
+            # El lote más antiguo superó el intervalo: procesarlo aunque esté incompleto
+            flush(rows)
+            processed += len(rows)
+            rows = []
+            continue
+        if row is _END:
+            break
+        if isinstance(row, Exception):
+            raise row
+        if not rows and flush_interval is not None:
+            deadline = time.monotonic() + flush_interval
+        rows.append(row)
+        if len(rows) >= batch_size:
+            flush(rows)
+            processed += len(rows)
+            rows = []
+    if rows:
+        flush(rows)
+        processed += len(rows)
+    return processed
@@ -0,0 +1,98 @@
+"""
+Conteos agregables y escritura del resumen de categorización.
+
+Los conteos se representan como diccionarios simples para poder sumarlos entre
+fragmentos (shards) y ejecuciones antes de escribir el resumen final.
+"""
+
+import os
+from datetime import datetime
+from typing import Dict, List
+
+import pandas as pd
+
+# Archivo de resumen por defecto
+SUMMARY_FILE = 'Categorization_Analyst/data/summaries/categorization_summary_v2.txt'
+
+# Columnas cuya distribución se reporta en el resumen
+SUMMARY_COLUMNS = ['Categoría', 'Subcategoría', 'Tipo']
+
+# Contadores del resumen propios de cada ejecución (se suman entre fragmentos)
+FAST_PATH_LABEL = 'Comentarios por ruta rápida (vacíos o triviales)'
+CASCADE_LABEL = 'Comentarios evaluados por el analizador completo'
+PER_RUN_COUNTERS = (FAST_PATH_LABEL, CASCADE_LABEL)
+
+def summary_counts(df: pd.DataFrame) -> Dict:
+    """
+    Calcula los conteos del resumen a partir de un DataFrame de resultados.
+    
+    Args:
+        df (pd.DataFrame): DataFrame con los resultados
+    
+    Returns:
+        Dict: Total de comentarios y conteo de valores no nulos por columna
+    """
+    counts = {'total': len(df)}
+    for column in SUMMARY_COLUMNS:
+        counts[column] = {str(value): int(count) for value, count in df[column].value_counts().items()}
+    return counts
+
+def merge_summary_counts(counts_list: List[Dict]) -> Dict:
+    """
+    Suma varios conteos de resumen.
+    
+    Args:
+        counts_list (List[Dict]): Conteos generados con summary_counts
+    
+    Returns:
+        Dict: Conteos combinados
+    """
+    merged = {'total': 0}
+    for column in SUMMARY_COLUMNS:
+        merged[column] = {}
+    for counts in counts_list:
+        merged['total'] += counts['total']
+        for column in SUMMARY_COLUMNS:
+            for value, count in counts[column].items():
+                merged[column][value] = merged[column].get(value, 0) + count
+    return merged
+
+def write_summary(counts: Dict, metadata: Dict[str, object], summary_file: str = SUMMARY_FILE) -> None:
+    """
+    Escribe el resumen de categorización.
+    
+    Las distribuciones se ordenan por cantidad descendente y, ante empates, por
+    nombre, para que el resumen sea idéntico sin importar cómo se obtuvieron los conteos.
+    
+    Args:
+        counts (Dict): Conteos generados con summary_counts o merge_summary_counts
+        metadata (Dict[str, object]): Líneas informativas adicionales (etiqueta -> valor)
+        summary_file (str): Ruta del archivo de resumen
+    """
+    # Crear directorios si no existen
+    os.makedirs(os.path.dirname(summary_file), exist_ok=True)
+    
+    total = counts['total']
+    titles = {
+        'Categoría': ("Distribución por Categoría:", "------------------------"),
+        'Subcategoría': ("\nDistribución por Subcategoría:", "----------------------------"),
+        'Tipo': ("\nDistribución por Tipo:", "----------------------")
+    }
+    
+    with open(summary_file, 'w', encoding='utf-8') as f:
+        f.write("Resumen de Categorización de Comentarios (v2)\n")
+        f.write("==========================================\n\n")
+        
+        # Información general
+        f.write(f"Fecha de generación: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        f.write(f"Total de comentarios procesados: {total}\n")
+        for label, value in metadata.items():
+            f.write(f"{label}: {value}\n")
+        f.write("\n")
+        
+        for column in SUMMARY_COLUMNS:
+            title, underline = titles[column]
+            f.write(f"{title}\n{underline}\n")
+            for value, count in sorted(counts[column].items(), key=lambda item: (-item[1], item[0])):
+                percentage = (count / total) * 100
+                f.write(f"{value}: {count} comentarios ({percentage:.1f}%)\n")
@@ -0,0 +1,100 @@
+"""
+Normalización de texto para la búsqueda de palabras clave.
+
+Una sola tabla de traducción convierte cada carácter a su forma normalizada:
+minúscula, sin tildes ni diéresis (conservando la ñ) y cualquier otro carácter
+(puntuación, dígitos, símbolos) como espacio. La tabla se completa de forma
+diferida, un carácter a la vez, la primera vez que aparece en un texto, de modo
+que cubre cualquier carácter Unicode sin precalcular todo el rango.
+"""
+
+import unicodedata
+from typing import Iterable, List
+
+import pandas as pd
+
+# Letras que se conservan tras la normalización
+ALLOWED_LETTERS = frozenset('abcdefghijklmnopqrstuvwxyzñ')
+
+def _normalize_char(char: str) -> str:
+    """Forma normalizada de un carácter: letra permitida, espacio o cadena de letras."""
+    if char.isspace():
+        return ' '
+    normalized = []
+    for lower in char.lower():
+        if lower == 'ñ':
+            normalized.append(lower)
+            continue
+        # Descomponer (NFKD) y descartar las marcas diacríticas
+        base = ''.join(c for c in unicodedata.normalize('NFKD', lower) if not unicodedata.combining(c))
+        normalized.append(base if base and all(c in ALLOWED_LETTERS for c in base) else ' ')
+    return ''.join(normalized)
+
+class _NormalizationTable(dict):
+    """Tabla para str.translate que calcula y guarda cada carácter al primer uso."""
+    
+    def __missing__(self, codepoint: int) -> str:
+        value = _normalize_char(chr(codepoint))
+        self[codepoint] = value
+        return value
+
+NORMALIZATION_TABLE = _NormalizationTable()
+
+def normalize_text(text: str) -> str:
+    """
+    Normaliza un texto para la búsqueda de palabras clave.
+    
+    Args:
+        text (str): Texto a normalizar (cualquier otro tipo se considera vacío)
+    
+    Returns:
+        str: Texto en minúsculas, sin tildes, solo letras (incluida la ñ) y
+            palabras separadas por un único espacio
+    """
+    if not isinstance(text, str):
+        return ""
+    return ' '.join(text.translate(NORMALIZATION_TABLE).split())
+
+def normalize_series(texts: pd.Series) -> pd.Series:
+    """
+    Normaliza una columna completa de textos.
+    
+    Los textos se traducen uno a uno (y no unidos en una sola cadena) para
+    aprovechar la ruta rápida de str.translate con textos ASCII, que son la mayoría.
+    
+    Args:
+        texts (pd.Series): Columna de textos (los valores no textuales quedan vacíos)
+    
+    Returns:
+        pd.Series: Textos normalizados, alineados con texts
+    """
+    table = NORMALIZATION_TABLE
+    return pd.Series(
+        [' '.join(text.translate(table).split()) if isinstance(text, str) else '' for text in texts],
+        index=texts.index, dtype=object
+    )
+
+def normalize_keywords(keywords: Iterable[str]) -> List[str]:
+    """
+    Normaliza una lista de palabras clave con las mismas reglas que los comentarios.
+    
+    Se conservan el orden y la primera aparición de cada palabra normalizada, y se
+    descartan las que quedan vacías.
+    """
+    normalized = []
+    for keyword in keywords:
+        keyword = normalize_text(keyword)
+        if keyword and keyword not in normalized:
+            normalized.append(keyword)
+    return normalized
+
+def strip_accents(pattern: str) -> str:
+    """
+    Quita tildes y diéresis de una expresión regular (conservando la ñ) sin
+    alterar sus metacaracteres, para que coincida con textos normalizados.
+    """
+    return ''.join(
+        char if char in 'ñÑ' else
+        ''.join(c for c in unicodedata.normalize('NFD', char) if not unicodedata.combining(c))
+        for char in pattern
+    )
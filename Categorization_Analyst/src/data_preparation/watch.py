@@ -0,0 +1,205 @@
+"""
+Ingesta continua de los archivos que aparecen en un directorio de entrada.
+
+El directorio se consulta periódicamente y cada archivo CSV, Excel o JSONL se
+procesa cuando está completo, es decir, cuando su tamaño y fecha de
+modificación no cambiaron entre dos consultas consecutivas. Los resultados se
+agregan al almacén SQLite como una ejecución por archivo, identificada por el
+hash de su contenido, de modo que un archivo ya procesado (aunque se copie de
+nuevo o con otro nombre) no se vuelve a categorizar.
+
+Los conteos del resumen se guardan junto a la lista de ejecuciones incluidas y
+se actualizan sumando solo los del archivo nuevo, tras lo cual se reescribe el
+resumen.
+"""
+
+import hashlib
+import io
+import logging
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from .atomic_io import atomic_write_json, file_lock, read_json
+from .results import ResultBatch
+from .streaming import read_comments
+from .summary import merge_summary_counts, summary_counts, write_summary
+
+# Directorio vigilado por defecto
+WATCH_DIR = 'Categorization_Analyst/data/input'
+
+# Resumen acumulado de los archivos ingeridos y sus conteos
+WATCH_SUMMARY_FILE = 'Categorization_Analyst/data/summaries/categorization_summary_watch.txt'
+WATCH_COUNTS_FILE = 'Categorization_Analyst/data/summaries/watch_counts.json'
+
+# Segundos entre consultas del directorio
+WATCH_POLL_INTERVAL = 10.0
+
+# Formato de cada extensión aceptada
+WATCH_FORMATS = {'.csv': 'csv', '.xlsx': 'excel', '.xls': 'excel', '.jsonl': 'jsonl'}
+
+def read_input(content: bytes, input_format: str) -> pd.DataFrame:
+    """
+    Lee los comentarios de un archivo ya cargado en memoria.
+    
+    Args:
+        content (bytes): Contenido del archivo
+        input_format (str): 'csv', 'excel' o 'jsonl'
+    
+    Returns:
+        pd.DataFrame: Comentarios con columnas pnr y Comentario
+    """
+    if input_format == 'jsonl':
+        return pd.DataFrame(list(read_comments(io.StringIO(content.decode('utf-8')), 'jsonl')),
+                            columns=['pnr', 'Comentario'])
+    if input_format == 'csv':
+        df = pd.read_csv(io.BytesIO(content))
+    else:
+        df = pd.read_excel(io.BytesIO(content))
+    
+    required_columns = ['pnr', 'Comentario']
+    if not all(col in df.columns for col in required_columns):
+        raise ValueError(f"El archivo debe contener las columnas: {required_columns}")
+    return df
+
+class FolderWatcher:
+    """Categoriza los archivos nuevos de un directorio y los agrega al almacén SQLite."""
+    
+    def __init__(self, processor, results_store, directory: str = WATCH_DIR,
+                 summary_file: str = WATCH_SUMMARY_FILE, counts_file: str = WATCH_COUNTS_FILE,
+                 batch_size: int = 1000):
+        """
+        Args:
+            processor (CommentProcessor): Procesador ya inicializado
+            results_store (ResultsStore): Almacén donde se agregan los resultados
+            directory (str): Directorio vigilado
+            summary_file (str): Resumen acumulado de los archivos ingeridos
+            counts_file (str): Conteos acumulados del resumen
+            batch_size (int): Comentarios por lote
+        """
+        self.processor = processor
+        self.results_store = results_store
+        self.directory = Path(directory)
+        self.summary_file = summary_file
+        self.counts_file = counts_file
+        self.batch_size = batch_size
+        # Última observación (tamaño, modificación) de cada archivo aún no procesado
+        self._observed: Dict[Path, Tuple[int, int]] = {}
+        # Archivos ya procesados o descartados, con la observación con que se procesaron
+        self._done: Dict[Path, Tuple[int, int]] = {}
+    
+    def poll(self) -> List[Path]:
+        """
+        Consulta el directorio.
+        
+        Returns:
+            List[Path]: Archivos completos (sin cambios desde la consulta anterior)
+                que todavía no se procesaron, en orden de nombre
+        """
+        ready = []
+        observed = {}
+        for path in sorted(self.directory.iterdir()):
+            # Omitir temporales, ocultos y archivos de bloqueo de Excel ('~$...')
+            if (path.suffix.lower() not in WATCH_FORMATS or path.name.startswith(('.', '~$'))
+                    or not path.is_file()):
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            observation = (stat.st_size, stat.st_mtime_ns)
+            if self._done.get(path) == observation:
+                continue
+            if self._observed.get(path) == observation:
+                if stat.st_size > 0:
+                    ready.append(path)
+                else:
+                    # Archivo vacío sin cambios: se omite hasta que cambie
+                    self._done[path] = observation
+            else:
+                observed[path] = observation
+        self._observed = observed
+        return ready
+    
+    @property
+    def pending(self) -> int:
+        """Archivos vistos que aún no se consideran completos."""
+        return len(self._observed)
+    
+    def process(self, path: Path) -> int:
+        """
+        Categoriza un archivo completo y agrega sus resultados al almacén.
+        
+        Returns:
+            int: Comentarios categorizados (0 si el archivo ya se había procesado)
+        """
+        stat = path.stat()
+        content = path.read_bytes()
+        self._done[path] = (stat.st_size, stat.st_mtime_ns)
+        run_id = f'watch-{hashlib.sha256(content).hexdigest()[:16]}'
+        if self.results_store.is_finished(run_id):
+            logging.info(f"{path.name}: contenido ya procesado en la ejecución {run_id}; se omite")
+            return 0
+        
+        df = read_input(content, WATCH_FORMATS[path.suffix.lower()]).reset_index(drop=True)
+        self.processor.learning_system.refresh()
+        self.results_store.start_run(run_id, str(path))
+        batches = []
+        for offset in range(0, len(df), self.batch_size):
+            batch = df.iloc[offset:offset + self.batch_size]
+            batch_results = self.processor.process_batch(batch)
+            self.results_store.insert_results(run_id, batch.index, batch_results)
+            batches.append(batch_results)
+        
+        self._update_summary(run_id, path.name, summary_counts(ResultBatch.concat(batches).to_frame()))
+        self.results_store.finish_run(run_id)
+        logging.info(f"{path.name}: {len(df)} comentarios agregados (ejecución {run_id})")
+        return len(df)
+    
+    def _update_summary(self, run_id: str, file_name: str, counts: Dict) -> None:
+        """
+        Suma los conteos de una ejecución a los acumulados y reescribe el resumen.
+        
+        Una ejecución ya sumada (p. ej. reprocesada tras una interrupción antes de
+        marcarla como terminada) no se vuelve a sumar.
+        """
+        with file_lock(self.counts_file):
+            stored = read_json(self.counts_file, {'runs': [], 'counts': merge_summary_counts([])})
+            if run_id not in stored['runs']:
+                stored['runs'].append(run_id)
+                stored['counts'] = merge_summary_counts([stored['counts'], counts])
+                atomic_write_json(self.counts_file, stored, ensure_ascii=False, indent=2)
+            write_summary(stored['counts'], {
+                'Archivos ingeridos': len(stored['runs']),
+                'Último archivo': f"{file_name} ({datetime.now().strftime('%Y-%m-%d %H:%M:%S')})"
+            }, self.summary_file)
+    
+    def run(self, poll_interval: float = WATCH_POLL_INTERVAL, once: bool = False) -> int:
+        """
+        Vigila el directorio y procesa cada archivo nuevo cuando está completo.
+        
+        Un archivo que no se puede leer o categorizar se registra en el log y no se
+        reintenta hasta que cambie.
+        
+        Args:
+            poll_interval (float): Segundos entre consultas
+            once (bool): Termina cuando no quedan archivos por completar o procesar
+        
+        Returns:
+            int: Comentarios categorizados
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        total = 0
+        while True:
+            for path in self.poll():
+                try:
+                    total += self.process(path)
+                except Exception as e:
+                    logging.error(f"Error procesando {path}: {str(e)}")
+            if once and not self.pending:
+                return total
+            time.sleep(poll_interval)
@@ -0,0 +1,38 @@
+"""Pruebas de la escritura atómica de archivos compartidos."""
+
+import json
+
+import numpy as np
+import pytest
+
+from src.data_preparation.atomic_io import atomic_write_json, atomic_write_npy, atomic_write_text, read_json
+
+def test_atomic_writes_replace_content(tmp_path):
+    atomic_write_json(str(tmp_path / 'datos' / 'estado.json'), {'a': 1})
+    atomic_write_json(str(tmp_path / 'datos' / 'estado.json'), {'a': 2})
+    assert read_json(str(tmp_path / 'datos' / 'estado.json')) == {'a': 2}
+    assert read_json(str(tmp_path / 'inexistente.json'), default={}) == {}
+    
+    atomic_write_text(str(tmp_path / 'CURRENT'), 'gen-1\ngen-2')
+    assert (tmp_path / 'CURRENT').read_text(encoding='utf-8') == 'gen-1\ngen-2'
+    
+    atomic_write_npy(str(tmp_path / 'arreglo.npy'), np.arange(5, dtype=np.int32))
+    loaded = np.load(tmp_path / 'arreglo.npy', allow_pickle=False)
+    assert loaded.dtype == np.int32 and loaded.tolist() == [0, 1, 2, 3, 4]
+    
+    assert list(tmp_path.rglob('*.tmp')) == []
+
+def test_failed_write_keeps_previous_content(tmp_path):
+    atomic_write_npy(str(tmp_path / 'arreglo.npy'), np.arange(3))
+    with pytest.raises(ValueError):
+        # Los arreglos de objetos no se pueden guardar sin pickle
+        atomic_write_npy(str(tmp_path / 'arreglo.npy'), np.array([{'a': 1}], dtype=object))
+    assert np.load(tmp_path / 'arreglo.npy').tolist() == [0, 1, 2]
+    
+    atomic_write_json(str(tmp_path / 'estado.json'), {'a': 1})
+    with pytest.raises(TypeError):
+        atomic_write_json(str(tmp_path / 'estado.json'), {'a': object()})
+    with open(tmp_path / 'estado.json', encoding='utf-8') as f:
+        assert json.load(f) == {'a': 1}
+    
+    assert list(tmp_path.glob('*.tmp')) == []
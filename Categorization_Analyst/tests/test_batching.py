@@ -0,0 +1,59 @@
+"""Pruebas del tamaño de lote adaptativo."""
+
+import pandas as pd
+
+from src.data_preparation.batching import MAX_BATCH_SIZE, MAX_GROWTH, MIN_BATCH_SIZE, BatchSizer
+from src.data_preparation.process_comments_v2 import CommentProcessor
+
+def test_fixed_size_without_target():
+    sizer = BatchSizer(500, target_seconds=None)
+    assert not sizer.adaptive
+    sizer.record(500, 10.0, 10 ** 9)
+    assert sizer.next_size() == 500
+
+def test_converges_to_the_target_time():
+    # Un procesamiento de 2000 filas por segundo con objetivo de 1 segundo
+    sizer = BatchSizer(100, target_seconds=1.0, max_memory_mb=None)
+    sizes = []
+    for _ in range(10):
+        rows = sizer.next_size()
+        sizes.append(rows)
+        sizer.record(rows, rows / 2000)
+    assert sizes[:5] == [100, 200, 400, 800, 1600]
+    assert sizes[-1] == 2000
+    assert all(later <= earlier * MAX_GROWTH for earlier, later in zip(sizes, sizes[1:]))
+
+def test_shrinks_gradually_when_batches_get_slow():
+    sizer = BatchSizer(8000, target_seconds=1.0, max_memory_mb=None)
+    sizer.record(8000, 80.0)
+    assert sizer.next_size() == 8000 / MAX_GROWTH
+    sizer.record(0, 1.0)
+    assert sizer.next_size() == 8000 / MAX_GROWTH
+
+def test_memory_and_size_limits():
+    # Filas de 1 MB con un máximo de 64 MB por lote
+    sizer = BatchSizer(64, target_seconds=1.0, max_memory_mb=64, min_size=1)
+    sizer.record(64, 0.001, 64 * 2 ** 20)
+    assert sizer.next_size() == 64
+    
+    sizer = BatchSizer(MAX_BATCH_SIZE, target_seconds=1.0, max_memory_mb=None)
+    sizer.record(MAX_BATCH_SIZE, 0.001)
+    assert sizer.next_size() == MAX_BATCH_SIZE
+    
+    sizer = BatchSizer(MIN_BATCH_SIZE, target_seconds=1.0, max_memory_mb=None)
+    sizer.record(MIN_BATCH_SIZE, 1000.0)
+    assert sizer.next_size() == MIN_BATCH_SIZE
+    
+    # Un tamaño inicial fuera de los límites los amplía en lugar de recortarse
+    assert BatchSizer(10, target_seconds=1.0).min_size == 10
+    assert BatchSizer(0).next_size() == 1
+
+def test_adaptive_batches_give_the_same_output(workdir):
+    comments = ['perdieron mi maleta', 'ok', 'el vuelo se atrasó', 'cobran demasiado por el equipaje']
+    df = pd.DataFrame({'pnr': range(400), 'Comentario': comments * 100})
+    df.to_excel('entrada.xlsx', index=False)
+    
+    CommentProcessor().process_file('entrada.xlsx', 'fijo.xlsx', batch_size=1000, target_batch_seconds=None)
+    CommentProcessor().process_file('entrada.xlsx', 'adaptativo.xlsx', batch_size=7,
+                                    target_batch_seconds=0.001, max_batch_memory_mb=0.01)
+    pd.testing.assert_frame_equal(pd.read_excel('adaptativo.xlsx'), pd.read_excel('fijo.xlsx'))
@@ -0,0 +1,78 @@
+"""Pruebas del modo cascada: solo los comentarios inciertos pasan por el analizador completo."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data_preparation.process_comments_v2 import CASCADE_THRESHOLD, CommentProcessor
+from src.data_preparation.results import OTROS
+
+COMMENTS = [
+    'el vuelo fue cancelado y quiero reembolso',
+    'perdieron mi maleta en el aeropuerto',
+    '',
+    'no hay vuelo disponible en ese horario',
+    'la atención del personal fue mala',
+    'ok',
+    'quiero cambiar la fecha del vuelo',
+    'cobran demasiado por el equipaje de mano',
+    'la pagina web esta lenta y da error al pagar con tarjeta',
+    'todo bien gracias'
+]
+
+class RecordingAnalyzer:
+    """Analizador que registra los comentarios evaluados y retorna una confianza fija."""
+    
+    def __init__(self):
+        self.comments = []
+    
+    def confidence_score(self, comment, category, type_name):
+        self.comments.append(comment)
+        return 0.25
+
+def batch():
+    return pd.DataFrame({'pnr': [f'P{i}' for i in range(len(COMMENTS))], 'Comentario': COMMENTS})
+
+@pytest.fixture
+def processor(workdir):
+    return CommentProcessor()
+
+def test_only_uncertain_comments_are_escalated(processor):
+    plain = processor.process_batch(batch())
+    assert plain.confidence is None
+    
+    processor.enable_cascade()
+    analyzer = processor.cascade_analyzer = RecordingAnalyzer()
+    processor.fast_path_count = 0
+    results = processor.process_batch(batch())
+    
+    # La cascada no cambia la categorización, solo agrega la confianza
+    for field in ('category', 'subcategory', 'type', 'margin'):
+        assert np.array_equal(getattr(results, field), getattr(plain, field))
+    
+    fast_path = processor.fast_path_mask(batch()['Comentario']).to_numpy()
+    uncertain = ~fast_path & ((results.margin < CASCADE_THRESHOLD) | (results.category == OTROS))
+    assert fast_path.any() and uncertain.any() and (~fast_path & ~uncertain).any()
+    assert analyzer.comments == [COMMENTS[i] for i in np.flatnonzero(uncertain)]
+    assert processor.cascade_escalated == uncertain.sum()
+    
+    assert (results.confidence[fast_path] == 0).all()
+    assert np.allclose(results.confidence[uncertain], 0.25)
+    confident = ~fast_path & ~uncertain
+    margins = results.margin[confident]
+    assert np.allclose(results.confidence[confident], margins / (margins + CASCADE_THRESHOLD))
+    assert (results.confidence[confident] >= 0.5).all()
+
+def test_escalated_confidence_comes_from_the_full_analyzer(processor):
+    processor.enable_cascade(threshold=100.0)
+    results = processor.process_batch(batch())
+    for i, comment in enumerate(COMMENTS):
+        if results.confidence[i] != 0:
+            category, _, type_name = results[i].names()
+            assert results.confidence[i] == pytest.approx(
+                processor.cascade_analyzer.confidence_score(comment, category, type_name))
+
+def test_threshold_must_be_positive(processor):
+    for threshold in (0, -1.0, float('nan')):
+        with pytest.raises(ValueError):
+            processor.enable_cascade(threshold)
@@ -0,0 +1,125 @@
+"""Pruebas de los puntos de control y de la reanudación de un procesamiento."""
+
+import os
+
+import pandas as pd
+import pytest
+
+from src.data_preparation.engines import CategorizationEngine
+from src.data_preparation.process_comments_v2 import CommentProcessor
+from src.data_preparation.results import OTROS_RESULT
+
+COMMENTS = [
+    'el vuelo fue cancelado y quiero reembolso',
+    'perdieron mi maleta en el aeropuerto',
+    'no hay vuelo disponible en ese horario',
+    'la atención del personal fue mala',
+    'quiero cambiar la fecha del vuelo',
+    'cobran demasiado por el equipaje de mano'
+]
+
+class ModelEngine(CategorizationEngine):
+    """Motor con archivo de modelo que categoriza todo como Otros."""
+    
+    name = 'model'
+    
+    def __init__(self, model_file):
+        self.model_file = model_file
+    
+    def predict_batch(self, texts):
+        return [OTROS_RESULT] * len(texts)
+
+class Interrupted(Exception):
+    pass
+
+@pytest.fixture
+def input_file(workdir):
+    df = pd.DataFrame({'pnr': [f'P{i:03d}' for i in range(30)],
+                       'Comentario': [COMMENTS[i % len(COMMENTS)] for i in range(30)]})
+    df.to_excel('entrada.xlsx', index=False)
+    return 'entrada.xlsx'
+
+def interrupt_after(processor, batches):
+    """Hace fallar process_batch después de procesar la cantidad de lotes indicada."""
+    process_batch = processor.process_batch
+    calls = []
+    
+    def failing(batch):
+        if len(calls) == batches:
+            raise Interrupted()
+        calls.append(len(batch))
+        return process_batch(batch)
+    
+    processor.process_batch = failing
+    return calls
+
+def count_batches(processor):
+    """Registra el tamaño de cada lote procesado."""
+    process_batch = processor.process_batch
+    calls = []
+    
+    def counting(batch):
+        calls.append(len(batch))
+        return process_batch(batch)
+    
+    processor.process_batch = counting
+    return calls
+
+def run(processor, input_file, output_file, resume=False):
+    return processor.process_file(input_file, output_file, batch_size=10, checkpoint_dir='puntos',
+                                  resume=resume, target_batch_seconds=None)
+
+def test_resume_skips_completed_batches(input_file):
+    CommentProcessor().process_file(input_file, 'completo.xlsx', batch_size=10, target_batch_seconds=None)
+    
+    processor = CommentProcessor()
+    interrupt_after(processor, 2)
+    with pytest.raises(Interrupted):
+        run(processor, input_file, 'reanudado.xlsx')
+    
+    processor = CommentProcessor()
+    calls = count_batches(processor)
+    assert run(processor, input_file, 'reanudado.xlsx', resume=True) == 30
+    assert calls == [10]
+    pd.testing.assert_frame_equal(pd.read_excel('reanudado.xlsx'), pd.read_excel('completo.xlsx'))
+    
+    # Al terminar se eliminan los puntos de control
+    assert os.listdir('puntos') == []
+
+def test_without_resume_starts_over(input_file):
+    processor = CommentProcessor()
+    interrupt_after(processor, 1)
+    with pytest.raises(Interrupted):
+        run(processor, input_file, 'salida.xlsx')
+    
+    processor = CommentProcessor()
+    calls = count_batches(processor)
+    run(processor, input_file, 'salida.xlsx')
+    assert calls == [10, 10, 10]
+
+def test_changed_model_file_discards_checkpoint(input_file):
+    with open('modelo.bin', 'w') as f:
+        f.write('versión 1')
+    processor = CommentProcessor(engine=ModelEngine('modelo.bin'))
+    interrupt_after(processor, 2)
+    with pytest.raises(Interrupted):
+        run(processor, input_file, 'salida.xlsx')
+    
+    with open('modelo.bin', 'w') as f:
+        f.write('versión 2 del modelo')
+    processor = CommentProcessor(engine=ModelEngine('modelo.bin'))
+    calls = count_batches(processor)
+    run(processor, input_file, 'salida.xlsx', resume=True)
+    assert calls == [10, 10, 10]
+
+def test_new_learning_examples_discard_checkpoint(input_file):
+    processor = CommentProcessor()
+    interrupt_after(processor, 2)
+    with pytest.raises(Interrupted):
+        run(processor, input_file, 'salida.xlsx')
+    
+    processor = CommentProcessor()
+    processor.learning_system.add_example('perdieron mi maleta', 'Equipaje', 'Pérdida')
+    calls = count_batches(processor)
+    run(processor, input_file, 'salida.xlsx', resume=True)
+    assert calls == [10, 10, 10]
@@ -0,0 +1,20 @@
+"""Pruebas de la configuración de la línea de comandos."""
+
+import logging
+
+import pytest
+
+import run_categorization
+
+@pytest.mark.parametrize('command, file_log', [('run', True), ('watch', True), ('search', False),
+                                               ('jobs', False), ('categorize', False)])
+def test_only_processing_commands_log_to_file(workdir, monkeypatch, command, file_log):
+    configured = {}
+    monkeypatch.setattr(logging, 'basicConfig', lambda **kwargs: configured.update(kwargs))
+    run_categorization.setup_logging(command)
+    
+    has_file_handler = any(isinstance(handler, logging.FileHandler) for handler in configured['handlers'])
+    assert has_file_handler == file_log
+    assert (workdir / run_categorization.LOG_FILE).exists() == file_log
+    for handler in configured['handlers']:
+        handler.close()
@@ -0,0 +1,46 @@
+"""Pruebas del escaneo único de negaciones, intensificadores y emociones."""
+
+import random
+
+import pytest
+
+from src.analysis.analyze_categorization import CategorizationAnalyzer
+
+WORDS = ['no', 'nunca', 'ni', 'sin', 'nada', 'de', 'muy', 'super', 'total', 'demasiado', 'molesto', 'feliz',
+         'triste', 'vuelo', 'maleta', 'pago', 'tarjeta', 'precio', 'pagina', 'el', 'la', 'nino', 'supervisor']
+
+@pytest.fixture(scope='module')
+def analyzer(tmp_path_factory):
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.chdir(tmp_path_factory.mktemp('analizador'))
+        yield CategorizationAnalyzer()
+
+def random_texts(size=500, seed=0):
+    """Textos con modificadores y palabras clave mezclados (incluidas palabras que los contienen)."""
+    rng = random.Random(seed)
+    return [' '.join(rng.choice(WORDS) for _ in range(rng.randint(1, 10))) for _ in range(size)]
+
+def test_spans_match_prefix_search(analyzer):
+    # Mismo resultado que buscar cada patrón en el texto anterior a la palabra clave
+    for text in random_texts():
+        spans = analyzer.scan_context(text)
+        assert spans.negation_ends == sorted(spans.negation_ends)
+        assert spans.has_emotion == bool(analyzer.emotion_regex.search(text))
+        for keyword in set(text.split()):
+            prefix = text[:text.find(keyword)]
+            assert analyzer.has_negation(text, keyword) == bool(analyzer.negation_regex.search(prefix)), text
+            assert analyzer.has_intensity(text, keyword) == bool(analyzer.intensity_regex.search(prefix)), text
+
+def test_every_modifier_is_found(analyzer):
+    spans = analyzer.scan_context('nada de muy mala calidad no funciona')
+    assert spans.negation_ends == [len('nada de '), len('nada de muy mala calidad no ')]
+    assert spans.intensity_ends == [len('nada de muy ')]
+    assert not spans.has_emotion
+    assert analyzer.scan_context('estoy molesto').has_emotion
+
+def test_window_limits_the_distance(analyzer):
+    text = 'no me gusto nada el vuelo'
+    assert analyzer.has_negation(text, 'vuelo')
+    assert not analyzer.has_negation(text, 'vuelo', window=5)
+    assert analyzer.has_negation('no vuelo', 'vuelo', window=0)
+    assert not analyzer.has_negation(text, 'maleta')
@@ -0,0 +1,135 @@
+"""Pruebas de los motores de categorización y de su comparación."""
+
+import random
+
+import numpy as np
+import pytest
+
+from src.data_preparation.categories_config import CATEGORIES, KEYWORDS
+from src.data_preparation.engines import (CategorizationEngine, KeywordEngine, LinearEngine, compare_engines,
+                                          create_engine)
+from src.data_preparation.process_comments_v2 import CommentProcessor
+from src.data_preparation.results import LABELS, NO_LABEL, OTROS, OTROS_RESULT, CategorizationResult
+
+FILLER = ['el', 'la', 'de', 'que', 'muy', 'mi', 'con', 'para', 'fue', 'pero']
+
+def training_comments(size=600, seed=0):
+    """Comentarios armados con palabras clave de una categoría y relleno."""
+    rng = random.Random(seed)
+    categories = [category for category, keywords in KEYWORDS.items() if keywords]
+    comments = []
+    for _ in range(size):
+        category = rng.choice(categories)
+        words = rng.sample(FILLER, 3) + rng.sample(KEYWORDS[category], min(2, len(KEYWORDS[category])))
+        rng.shuffle(words)
+        comments.append(' '.join(words))
+    return comments
+
+class FixedEngine(CategorizationEngine):
+    """Motor que categoriza todo con el mismo resultado."""
+    
+    name = 'fixed'
+    
+    def __init__(self, result):
+        self.result = result
+    
+    def predict_batch(self, texts):
+        return [self.result] * len(texts)
+
+@pytest.fixture
+def processor(workdir):
+    return CommentProcessor()
+
+@pytest.fixture
+def trained(processor):
+    """Motor lineal entrenado con las categorías del motor de palabras clave."""
+    texts = training_comments()
+    keyword_results = KeywordEngine(processor).predict_batch(texts)
+    engine = LinearEngine(processor.clean_text, 'modelos/lineal.npz')
+    engine.fit(texts, [LABELS.category_name(result.category) for result in keyword_results],
+               [LABELS.type_name(result.type) for result in keyword_results],
+               [result.margin for result in keyword_results])
+    return engine, texts, keyword_results
+
+def test_engine_interface_is_abstract():
+    with pytest.raises(TypeError):
+        CategorizationEngine()
+    
+    class Incomplete(CategorizationEngine):
+        pass
+    
+    with pytest.raises(TypeError):
+        Incomplete()
+
+def test_keyword_engine_matches_processor(processor):
+    texts = training_comments(50)
+    assert KeywordEngine(processor).predict_batch(texts) == [
+        processor.identify_category_with_margin(text) for text in texts]
+
+def test_linear_engine_results_are_consistent(trained):
+    engine, texts, keyword_results = trained
+    results = engine.predict_batch(texts)
+    
+    assert all(isinstance(result, CategorizationResult) for result in results)
+    agreement = np.mean([result.category == reference.category
+                         for result, reference in zip(results, keyword_results)])
+    assert agreement > 0.9
+    for result in results:
+        category, subcategory, type_name = result.names()
+        if result.category == OTROS:
+            assert (result.subcategory, result.type) == (NO_LABEL, NO_LABEL)
+        elif type_name is not None:
+            assert type_name in CATEGORIES[category]['types']
+        assert subcategory != category
+
+def test_linear_engine_save_and_load(trained):
+    engine, texts, _ = trained
+    engine.save()
+    
+    loaded = LinearEngine(engine.text_cleaner, engine.model_file)
+    assert loaded.predict_batch(texts) == engine.predict_batch(texts)
+    assert loaded.margin_scale == engine.margin_scale
+    assert loaded.predict_batch([]) == []
+
+def test_linear_margins_are_scaled_to_keyword_margins(trained, processor):
+    engine, texts, keyword_results = trained
+    assert LinearEngine._fit_margin_scale([1.0, 2.0, 3.0], [3.0, 6.0, 9.0]) == pytest.approx(3.0)
+    
+    unscaled = LinearEngine(processor.clean_text)
+    unscaled.fit(texts, [LABELS.category_name(result.category) for result in keyword_results],
+                 [LABELS.type_name(result.type) for result in keyword_results])
+    assert unscaled.margin_scale == 1.0
+    assert engine.margin_scale != 1.0
+    
+    scaled = np.array([result.margin for result in engine.predict_batch(texts)])
+    raw = np.array([result.margin for result in unscaled.predict_batch(texts)])
+    assert np.allclose(scaled, raw * engine.margin_scale, rtol=1e-5)
+    
+    # Los márgenes escalados quedan en el mismo orden de magnitud que los de palabras clave
+    keyword_median = np.median([result.margin for result in keyword_results])
+    assert keyword_median / 3 < np.median(scaled) < keyword_median * 3
+
+def test_create_engine(processor, trained):
+    engine, _, _ = trained
+    engine.save()
+    assert isinstance(create_engine('keyword', processor), KeywordEngine)
+    assert create_engine('linear', processor, engine.model_file).margin_scale == engine.margin_scale
+    with pytest.raises(ValueError):
+        create_engine('desconocido', processor)
+
+def test_compare_engines_reports_accuracy_and_agreement(processor):
+    texts = training_comments(40)
+    keyword = KeywordEngine(processor)
+    labels = [LABELS.category_name(result.category) for result in keyword.predict_batch(texts)]
+    otros_share = labels.count('Otros') / len(labels)
+    
+    reports = compare_engines(texts, {'keyword': keyword, 'otros': FixedEngine(OTROS_RESULT)}, labels,
+                              batch_size=7)
+    
+    assert [report['engine'] for report in reports] == ['keyword', 'otros']
+    assert all(report['comments'] == len(texts) for report in reports)
+    assert reports[0]['accuracy'] == reports[0]['keyword_agreement'] == 1.0
+    assert reports[1]['accuracy'] == reports[1]['keyword_agreement'] == round(otros_share, 4)
+    
+    without_labels = compare_engines(texts, {'otros': FixedEngine(OTROS_RESULT)})
+    assert 'accuracy' not in without_labels[0] and 'keyword_agreement' not in without_labels[0]
@@ -0,0 +1,47 @@
+"""Pruebas de la ruta rápida de comentarios vacíos, triviales o solo con palabras vacías."""
+
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data_preparation.categories_config import STOPWORDS
+from src.data_preparation.process_comments_v2 import CommentProcessor
+from src.data_preparation.results import OTROS_RESULT
+
+@pytest.fixture
+def processor(workdir):
+    return CommentProcessor()
+
+def test_trivial_comments_take_the_fast_path(processor):
+    comments = pd.Series([None, np.nan, 123, '', '   ', 'ok', '¡¡ok!!', 'Muy bien, gracias', 'de la', 'a',
+                          'perdieron mi maleta', 'el vuelo se atrasó', 'no'], dtype=object)
+    mask = processor.fast_path_mask(comments)
+    assert mask.tolist() == [True] * 10 + [False, False, True]
+    assert mask.index.equals(comments.index)
+
+def test_fast_path_never_changes_the_keyword_result(processor):
+    rng = random.Random(0)
+    comments = [' '.join(rng.choice(STOPWORDS) for _ in range(rng.randint(1, 4))) for _ in range(2000)]
+    comments += STOPWORDS
+    mask = processor.fast_path_mask(pd.Series(comments))
+    assert mask.mean() > 0.5
+    for comment in np.array(comments, dtype=object)[mask.to_numpy()]:
+        assert processor.identify_category_with_margin(comment) == OTROS_RESULT, comment
+
+def test_process_batch_counts_fast_path_rows(processor):
+    batch = pd.DataFrame({'pnr': ['A', 'B', 'C', 'D'],
+                          'Comentario': ['', 'ok gracias', 'perdieron mi maleta', None]})
+    engine_texts = []
+    predict_batch = processor.engine.predict_batch
+    
+    def recording(texts):
+        engine_texts.extend(texts)
+        return predict_batch(texts)
+    
+    processor.engine.predict_batch = recording
+    results = processor.process_batch(batch)
+    assert engine_texts == ['perdieron mi maleta']
+    assert processor.fast_path_count == 3
+    assert [results[i] == OTROS_RESULT for i in range(4)] == [True, True, False, True]
@@ -0,0 +1,90 @@
+"""Pruebas de la cola persistente de trabajos."""
+
+import os
+
+import pandas as pd
+import pytest
+
+from src.data_preparation.job_queue import DONE, FAILED, PENDING, RUNNING, JobQueue, run_worker
+
+COMMENTS = ['perdieron mi maleta', 'ok', 'el vuelo se atrasó', 'cobran demasiado por el equipaje']
+
+@pytest.fixture
+def queue(workdir):
+    queue = JobQueue('cola/jobs.sqlite', 'cola')
+    yield queue
+    queue.close()
+
+def write_input(path, size=8):
+    pd.DataFrame({'pnr': [f'P{i}' for i in range(size)],
+                  'Comentario': [COMMENTS[i % len(COMMENTS)] for i in range(size)]}).to_excel(path, index=False)
+
+def test_submit_deduplicates_by_content_and_options(queue):
+    write_input('a.xlsx')
+    first, created = queue.submit('a.xlsx')
+    assert created
+    assert queue.submit('a.xlsx') == (first, False)
+    
+    os.rename('a.xlsx', 'copia.xlsx')
+    assert queue.submit('copia.xlsx') == (first, False)
+    second, created = queue.submit('copia.xlsx', cascade_threshold=2.0)
+    assert created and second != first
+    with pytest.raises(ValueError):
+        queue.submit('copia.xlsx', workers=4)
+    
+    job = queue.job(first)
+    assert job['status'] == PENDING
+    assert job['options'] == {'engine': 'keyword', 'cascade_threshold': None}
+    assert os.path.basename(job['stored_input']) == f"{job['content_hash']}.xlsx"
+
+def test_claim_order_and_state_changes(queue):
+    for name, size in (('a.xlsx', 4), ('b.xlsx', 5)):
+        write_input(name, size)
+        queue.submit(name)
+    
+    job = queue.claim()
+    assert (job['job_id'], job['status'], job['attempts'], job['worker']) == (1, RUNNING, 1, queue.worker_id)
+    assert queue.claim()['job_id'] == 2
+    assert queue.claim() is None
+    
+    queue.release(1)
+    assert queue.claim()['attempts'] == 2
+    queue.fail(1, 0.5, 'error de prueba')
+    queue.finish(2, 5, 1.0, 'salida.xlsx', 'resumen.txt')
+    assert [(job['status'], job['error']) for job in queue.jobs()] == [(FAILED, 'error de prueba'), (DONE, None)]
+    assert [job['job_id'] for job in queue.jobs(DONE)] == [2]
+    
+    # Un trabajo fallido se reencola al reenviar el mismo archivo
+    assert queue.submit('a.xlsx') == (1, True)
+    assert queue.job(1)['status'] == PENDING and queue.job(1)['error'] is None
+
+def test_orphaned_jobs_are_requeued(queue):
+    write_input('a.xlsx')
+    queue.submit('a.xlsx')
+    queue.claim()
+    # El trabajador que tomó el trabajo ya no existe
+    host = queue.worker_id.rpartition(':')[0]
+    queue.connection.execute('UPDATE jobs SET worker = ?', (f'{host}:{2 ** 22 + 12345}',))
+    job = queue.claim()
+    if os.name == 'posix':
+        assert job is not None and job['attempts'] == 2
+    else:
+        assert job is None
+
+def test_worker_processes_the_queue(queue):
+    write_input('a.xlsx', 12)
+    write_input('b.xlsx', 6)
+    with open('roto.xlsx', 'w') as f:
+        f.write('no es un Excel')
+    for name in ('a.xlsx', 'roto.xlsx', 'b.xlsx'):
+        queue.submit(name)
+    
+    assert run_worker(queue, batch_size=5, sqlite_path='resultados.sqlite', drain=True) == 3
+    
+    jobs = queue.jobs()
+    assert [job['status'] for job in jobs] == [DONE, FAILED, DONE]
+    assert [job['rows'] for job in jobs] == [12, None, 6]
+    assert jobs[1]['error']
+    assert len(pd.read_excel(jobs[0]['output_file'])) == 12
+    assert os.path.exists(jobs[2]['summary_file'])
+    assert jobs[0]['output_file'] != jobs[2]['output_file']
@@ -0,0 +1,94 @@
+"""Pruebas de las estadísticas de palabras clave y patrones de contexto."""
+
+import pandas as pd
+import pytest
+
+from src.data_preparation.keyword_stats import KeywordStats, keyword_stats_file
+from src.data_preparation.process_comments_v2 import CommentProcessor
+
+COMMENTS = [
+    'perdieron mi maleta en el aeropuerto',
+    'el vuelo fue cancelado y quiero reembolso',
+    'la pagina web esta lenta y da error al pagar con tarjeta',
+    'ok',
+    '',
+    'cobran demasiado por el equipaje de mano',
+    'rechazaron mi tarjeta en el pago',
+    'la maleta llegó rota'
+]
+
+@pytest.fixture
+def processor(workdir):
+    return CommentProcessor()
+
+def test_counts_match_the_keyword_decisions(processor):
+    batch = pd.DataFrame({'pnr': range(len(COMMENTS)), 'Comentario': COMMENTS})
+    results = processor.process_batch(batch)
+    fast_path = processor.fast_path_mask(batch['Comentario']).to_numpy()
+    
+    processor.enable_keyword_stats()
+    processor.process_batch(batch)
+    stats = processor.keyword_stats
+    assert stats.comments == len(COMMENTS)
+    
+    # Una palabra clave se activa en los comentarios (no triviales) que la contienen y
+    # decide en los que su categoría resultó ganadora
+    texts = [(processor.clean_text(comment), results[i].names()[0])
+             for i, comment in enumerate(COMMENTS) if not fast_path[i]]
+    for category, keywords in processor.keywords.items():
+        for keyword in keywords:
+            fired = [winner for text, winner in texts if keyword in text]
+            assert stats.keywords[category][keyword] == [len(fired), fired.count(category)], keyword
+    assert stats.dead_keywords()
+    assert all(stats.keywords[category][keyword][0] == 0 for category, keyword in stats.dead_keywords())
+
+def test_merge_and_serialization():
+    first = KeywordStats({'Equipaje': ['maleta', 'equipaje']}, {'Equipaje': {'Perdida': 'perd'}})
+    first.comments = 10
+    first.record_keyword('Equipaje', 'maleta', True)
+    first.record_keyword('Equipaje', 'maleta', False)
+    first.record_pattern('Equipaje', 'Perdida', True)
+    
+    second = KeywordStats.from_dict(first.to_dict())
+    second.record_keyword('Vuelo', 'vuelo', False)
+    second.merge_dict(first.to_dict())
+    
+    assert second.comments == 20
+    assert second.keywords == {'Equipaje': {'maleta': [4, 2], 'equipaje': [0, 0]}, 'Vuelo': {'vuelo': [1, 0]}}
+    assert second.patterns == {'Equipaje': {'Perdida': [2, 2]}}
+    assert first.keywords['Equipaje']['maleta'] == [2, 1]
+    assert second.dead_keywords() == [('Equipaje', 'equipaje')]
+
+def test_noisy_keywords_and_report(tmp_path):
+    stats = KeywordStats({'Vuelo': ['vuelo', 'avion', 'retraso']})
+    stats.comments = 100
+    for decided in [True] * 2 + [False] * 8:
+        stats.record_keyword('Vuelo', 'vuelo', decided)
+    for decided in [True] * 5:
+        stats.record_keyword('Vuelo', 'retraso', decided)
+    stats.record_keyword('Vuelo', 'avion', False)
+    assert stats.noisy_keywords() == [('Vuelo', 'vuelo', 10, 2)]
+    assert KeywordStats().noisy_keywords() == []
+    
+    report_file = keyword_stats_file(str(tmp_path / 'resumen' / 'resumen.txt'))
+    stats.write_report(report_file)
+    with open(report_file, encoding='utf-8') as f:
+        report = f.read()
+    assert 'Comentarios evaluados (incluye la ruta rápida): 100' in report
+    assert 'Vuelo: vuelo - activada en 10 comentarios (10.0%), decide 2 (20.0%)' in report
+    assert 'Palabras clave sin activaciones (0)' in report
+
+def test_process_file_writes_the_report_and_restarts_counts(processor):
+    df = pd.DataFrame({'pnr': range(24), 'Comentario': COMMENTS * 3})
+    df.to_excel('entrada.xlsx', index=False)
+    processor.enable_keyword_stats()
+    processor.process_file('entrada.xlsx', 'salida.xlsx', batch_size=5, target_batch_seconds=None,
+                           summary_file='resumen/resumen.txt')
+    with open(keyword_stats_file('resumen/resumen.txt'), encoding='utf-8') as f:
+        assert 'Comentarios evaluados (incluye la ruta rápida): 24' in f.read()
+    single = processor.keyword_stats.to_dict()
+    
+    # Cada ejecución empieza de cero y los lotes suman lo mismo que uno solo
+    processor.process_file('entrada.xlsx', 'salida.xlsx', batch_size=24, target_batch_seconds=None,
+                           summary_file='resumen/resumen.txt')
+    assert processor.keyword_stats.to_dict() == single
@@ -0,0 +1,120 @@
+"""Pruebas del almacén de artefactos aprendidos, incluido el acceso concurrente."""
+
+import multiprocessing
+
+import numpy as np
+import pytest
+
+from src.analysis.learned_store import CooccurrenceStore, LearnedRows, SynonymStore
+
+# Los procesos auxiliares heredan el módulo ya importado (no se pueden importar por nombre)
+fork = pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods(),
+                          reason="requiere el método de inicio fork")
+
+def word_updates(seed, size=200):
+    """Conteos palabra -> categoría pseudoaleatorios y reproducibles."""
+    rng = np.random.default_rng(seed)
+    updates = {}
+    for word, category in zip(rng.integers(0, 500, size), rng.integers(0, 5, size)):
+        counts = updates.setdefault(f'p{word}', {})
+        counts[f'C{category}'] = counts.get(f'C{category}', 0) + 1
+    return updates
+
+def add_counts(total, updates):
+    for word, counts in updates.items():
+        target = total.setdefault(word, {})
+        for column, count in counts.items():
+            target[column] = target.get(column, 0) + count
+
+def run_processes(target, args_list):
+    """Ejecuta un proceso por juego de argumentos y retorna sus códigos de salida."""
+    context = multiprocessing.get_context('fork')
+    processes = [context.Process(target=target, args=args) for args in args_list]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(60)
+    return [process.exitcode for process in processes]
+
+def test_merge_and_save_matches_reference(tmp_path):
+    expected = {}
+    for seed in range(30):
+        updates = word_updates(seed)
+        CooccurrenceStore(str(tmp_path / 'store')).merge_and_save(updates)
+        add_counts(expected, updates)
+    
+    store = CooccurrenceStore(str(tmp_path / 'store'))
+    assert len(store) == len(expected)
+    for word, counts in expected.items():
+        assert store.row_items(word) == counts
+        for column, count in counts.items():
+            assert store.get(word, column) == count
+    assert store.get('inexistente', 'C0') == 0
+    
+    # Compactación escalonada: cada segmento tiene más del doble de entradas que el siguiente
+    sizes = [len(segment['data']) for segment in store.segments]
+    assert all(older > 2 * newer for older, newer in zip(sizes, sizes[1:]))
+    assert {path.name for path in (tmp_path / 'store').glob('gen-*')} >= set(store.current_segments())
+
+def test_synonyms_are_a_union(tmp_path):
+    SynonymStore(str(tmp_path / 'synonyms')).add({'vuelo': {'avion', 'viaje'}}, save=True)
+    SynonymStore(str(tmp_path / 'synonyms')).add({'vuelo': {'viaje', 'trayecto'}}, save=True)
+    assert sorted(SynonymStore(str(tmp_path / 'synonyms')).get('vuelo')) == ['avion', 'trayecto', 'viaje']
+
+def _write_counts(directory, seed, rounds):
+    for offset in range(rounds):
+        CooccurrenceStore(directory).merge_and_save(word_updates(seed * 100 + offset, size=50))
+
+@fork
+def test_concurrent_writers_keep_every_count(tmp_path):
+    directory = str(tmp_path / 'store')
+    assert run_processes(_write_counts, [(directory, seed, 10) for seed in range(4)]) == [0] * 4
+    
+    expected = {}
+    for seed in range(4):
+        for offset in range(10):
+            add_counts(expected, word_updates(seed * 100 + offset, size=50))
+    store = CooccurrenceStore(directory)
+    assert all(store.row_items(word) == counts for word, counts in expected.items())
+
+def _read_until(directory, stop):
+    while not stop.is_set():
+        store = CooccurrenceStore(directory)
+        store.get('p1', 'C1')
+        len(store)
+
+@fork
+def test_readers_survive_concurrent_saves(tmp_path):
+    directory = str(tmp_path / 'store')
+    CooccurrenceStore(directory).merge_and_save(word_updates(0))
+    
+    context = multiprocessing.get_context('fork')
+    stop = context.Event()
+    readers = [context.Process(target=_read_until, args=(directory, stop)) for _ in range(3)]
+    for reader in readers:
+        reader.start()
+    try:
+        _write_counts(directory, 1, 40)
+    finally:
+        stop.set()
+        for reader in readers:
+            reader.join(60)
+    assert [reader.exitcode for reader in readers] == [0] * 3
+
+def _add_hashes(path, seed):
+    rows = LearnedRows(path)
+    for chunk in np.array_split(np.random.default_rng(seed).integers(0, 2 ** 63, 400, dtype=np.uint64), 8):
+        rows.add(chunk)
+
+@fork
+def test_learned_rows_concurrent_adds(tmp_path):
+    path = str(tmp_path / 'learned_rows.npy')
+    assert run_processes(_add_hashes, [(path, seed) for seed in range(4)]) == [0] * 4
+    
+    expected = np.unique(np.concatenate([
+        np.random.default_rng(seed).integers(0, 2 ** 63, 400, dtype=np.uint64) for seed in range(4)]))
+    rows = LearnedRows(path)
+    assert np.array_equal(rows.hashes, expected)
+    assert not rows.new_mask(expected).any()
+    assert rows.new_mask(np.array([1, 2, 3], dtype=np.uint64)).tolist() == [
+        value not in set(expected.tolist()) for value in (1, 2, 3)]
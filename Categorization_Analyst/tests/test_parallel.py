@@ -0,0 +1,76 @@
+"""Pruebas del procesamiento de lotes con procesos trabajadores."""
+
+import multiprocessing
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data_preparation.parallel import WorkerPool, verify_parallel
+from src.data_preparation.process_comments_v2 import CommentProcessor
+
+fork = pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods(),
+                          reason="requiere el método de inicio fork")
+
+COMMENTS = [
+    'perdieron mi maleta en el aeropuerto',
+    'el vuelo fue cancelado y quiero reembolso',
+    'la pagina web esta lenta y da error al pagar con tarjeta',
+    'ok',
+    '',
+    'cobran demasiado por el equipaje de mano',
+    'rechazaron mi tarjeta en el pago'
+]
+
+def comments_frame(size=70):
+    return pd.DataFrame({'pnr': [f'P{i}' for i in range(size)],
+                         'Comentario': [COMMENTS[i % len(COMMENTS)] for i in range(size)]})
+
+def configured_processor():
+    processor = CommentProcessor()
+    processor.enable_cascade()
+    processor.enable_keyword_stats()
+    return processor
+
+@fork
+def test_pool_matches_serial_processing_and_counters(workdir):
+    df = comments_frame()
+    serial = configured_processor()
+    expected = serial.process_batch(df)
+    
+    processor = configured_processor()
+    pool = WorkerPool(processor, 3, 'fork')
+    try:
+        results = pool.process_batch(df)
+    finally:
+        pool.close()
+    
+    assert len(results.differences(expected)) == 0
+    assert np.array_equal(results.confidence, expected.confidence)
+    assert results.pnr.tolist() == df['pnr'].tolist()
+    assert processor.fast_path_count == serial.fast_path_count > 0
+    assert processor.cascade_escalated == serial.cascade_escalated > 0
+    assert processor.keyword_stats.to_dict() == serial.keyword_stats.to_dict()
+
+@fork
+def test_batches_smaller_than_the_pool(workdir):
+    processor = CommentProcessor()
+    pool = WorkerPool(processor, 4, 'fork')
+    try:
+        assert pool.process_batch(comments_frame(2)).pnr.tolist() == ['P0', 'P1']
+        assert len(pool.process_batch(comments_frame(0))) == 0
+    finally:
+        pool.close()
+
+def test_verify_parallel_with_spawned_workers(workdir):
+    serial, differences = verify_parallel(CommentProcessor(), comments_frame(), workers=2, batch_size=25)
+    assert len(serial) == 70
+    assert len(differences) == 0
+
+@fork
+def test_process_file_with_workers_matches_serial(workdir):
+    comments_frame(120).to_excel('entrada.xlsx', index=False)
+    CommentProcessor().process_file('entrada.xlsx', 'serie.xlsx', batch_size=40, target_batch_seconds=None)
+    CommentProcessor().process_file('entrada.xlsx', 'paralelo.xlsx', batch_size=40, target_batch_seconds=None,
+                                    workers=3)
+    pd.testing.assert_frame_equal(pd.read_excel('paralelo.xlsx'), pd.read_excel('serie.xlsx'))
@@ -0,0 +1,79 @@
+"""Pruebas de ResultBatch: conversión entre resultados, DataFrame y registros."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data_preparation.categories_config import CATEGORIES
+from src.data_preparation.results import (LABELS, NO_LABEL, OTROS, OTROS_RESULT, CategorizationResult, LabelCodes,
+                                          ResultBatch)
+
+def sample_results():
+    """Resultados con etiquetas completas, parciales y de Otros."""
+    categories = [name for name in LABELS.categories if name != 'Otros']
+    return [
+        CategorizationResult.from_names(categories[0], categories[1], LABELS.types[0], 2.5),
+        CategorizationResult.from_names(categories[1], None, None, 0.75),
+        OTROS_RESULT,
+        CategorizationResult.from_names(categories[2], categories[0], LABELS.types[-1], 1.125)
+    ]
+
+def test_from_results_to_frame_round_trip():
+    results = sample_results()
+    batch = ResultBatch.from_results(['A1', 'A2', 'A3', 'A4'], ['uno', 'dos', None, 'cuatro'], results)
+    
+    df = batch.to_frame()
+    assert list(df.columns) == ['PNR', 'Comentario', 'Categoría', 'Subcategoría', 'Tipo']
+    assert [tuple(None if pd.isna(value) else value for value in row)
+            for row in df[['Categoría', 'Subcategoría', 'Tipo']].itertuples(index=False)] == \
+        [result.names() for result in results]
+    
+    restored = ResultBatch.from_frame(df)
+    assert np.array_equal(restored.category, batch.category)
+    assert np.array_equal(restored.subcategory, batch.subcategory)
+    assert np.array_equal(restored.type, batch.type)
+    assert restored.confidence is None
+
+def test_round_trip_with_cascade_columns():
+    results = sample_results()
+    batch = ResultBatch.from_results(['A1', 'A2', 'A3', 'A4'], ['uno', 'dos', 'tres', 'cuatro'], results)
+    batch.confidence = np.array([0.9, 0.25, 0.0, 0.5], dtype=np.float32)
+    
+    df = batch.to_frame()
+    assert list(df.columns[-2:]) == ['Margen', 'Confianza']
+    
+    restored = ResultBatch.from_frame(df)
+    assert len(restored.differences(batch)) == 0
+    assert [restored[i] for i in range(len(restored))] == [batch[i] for i in range(len(batch))]
+
+def test_records_match_frame():
+    batch = ResultBatch.from_results(['A1', 'A2', 'A3', 'A4'], ['uno', 'dos', 'tres', 'cuatro'], sample_results())
+    assert batch.records() == batch.to_frame().replace({np.nan: None}).to_dict('records')
+
+def test_concat_and_empty_batch():
+    results = sample_results()
+    first = ResultBatch.from_results(['A1', 'A2'], ['uno', 'dos'], results[:2])
+    second = ResultBatch.from_results(['A3', 'A4'], ['tres', 'cuatro'], results[2:])
+    whole = ResultBatch.from_results(['A1', 'A2', 'A3', 'A4'], ['uno', 'dos', 'tres', 'cuatro'], results)
+    
+    assert len(ResultBatch.concat([first, second]).differences(whole)) == 0
+    
+    empty = ResultBatch.from_results([], [], [])
+    assert len(empty) == 0
+    assert len(empty.to_frame()) == 0
+    assert len(ResultBatch.concat([])) == 0
+
+def test_label_codes_are_frozen_to_the_config():
+    categories, types = LABELS.categories, LABELS.types
+    assert categories == tuple(CATEGORIES)
+    
+    assert LABELS.category_code('Categoría inexistente') == OTROS
+    assert LABELS.subcategory_code('Categoría inexistente') == NO_LABEL
+    assert LABELS.type_code('Tipo inexistente') == NO_LABEL
+    assert (LABELS.categories, LABELS.types) == (categories, types)
+    
+    result = CategorizationResult.from_names('Categoría inexistente', 'Otra inexistente', 'Tipo inexistente')
+    assert result == CategorizationResult(OTROS, NO_LABEL, NO_LABEL)
+    
+    with pytest.raises(ValueError):
+        LabelCodes(['Vuelo'], [])
@@ -0,0 +1,73 @@
+"""Pruebas del almacén SQLite de resultados."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data_preparation.process_comments_v2 import CommentProcessor
+from src.data_preparation.results import LABELS, OTROS_RESULT, CategorizationResult, ResultBatch
+from src.data_preparation.results_store import ResultsStore
+
+CATEGORIES = [name for name in LABELS.categories if name != 'Otros']
+TYPE = LABELS.types[0]
+
+def sample_batch(confidence=None):
+    results = [
+        CategorizationResult.from_names(CATEGORIES[0], None, TYPE, 2.0),
+        CategorizationResult.from_names(CATEGORIES[0], CATEGORIES[1], None, 0.5),
+        OTROS_RESULT,
+        CategorizationResult.from_names(CATEGORIES[1], None, None, 1.0)
+    ]
+    batch = ResultBatch.from_results(['A', 'B', 'A', 'C'], ['uno', 'dos', None, 'cuatro'], results)
+    batch.confidence = confidence
+    return batch
+
+@pytest.fixture
+def store(tmp_path):
+    store = ResultsStore(str(tmp_path / 'resultados.sqlite'))
+    yield store
+    store.close()
+
+def test_counts_and_drill_down(store):
+    store.start_run('r1', 'entrada.xlsx')
+    store.insert_results('r1', [10, 11, 12, 13],
+                         sample_batch(np.array([0.9, 0.3, 0.0, 0.6], dtype=np.float32)))
+    
+    assert store.counts() == [(CATEGORIES[0], 2), ('Otros', 1), (CATEGORIES[1], 1)]
+    assert store.counts(by='tipo', category=CATEGORIES[0]) == [(None, 1), (TYPE, 1)]
+    assert store.counts(min_confidence=0.5) == [(CATEGORIES[0], 1), (CATEGORIES[1], 1)]
+    with pytest.raises(ValueError):
+        store.counts(by='comentario; DROP TABLE results')
+    
+    rows = store.drill_down(pnr='A')
+    assert [(row['fila'], row['categoria'], row['comentario']) for row in rows] == [
+        (10, CATEGORIES[0], 'uno'), (12, 'Otros', None)]
+    assert rows[0]['confianza'] == pytest.approx(0.9)
+    assert rows[1]['subcategoria'] is None and rows[1]['tipo'] is None
+    assert len(store.drill_down(limit=3)) == 3
+
+def test_reinserting_a_batch_replaces_its_rows(store):
+    store.start_run('r1', 'entrada.xlsx')
+    store.insert_results('r1', [0, 1, 2, 3], sample_batch())
+    store.insert_results('r1', [0, 1, 2, 3], sample_batch())
+    store.start_run('r1', 'entrada.xlsx')
+    assert store.counts(by='run_id') == [('r1', 4)]
+    assert not store.is_finished('r1')
+    
+    store.finish_run('r1')
+    assert store.is_finished('r1')
+    assert [(run['run_id'], run['rows']) for run in store.runs()] == [('r1', 4)]
+
+def test_process_file_fills_the_store(workdir):
+    df = pd.DataFrame({'pnr': [f'P{i}' for i in range(12)],
+                       'Comentario': ['perdieron mi maleta', 'ok', 'el vuelo se atrasó'] * 4})
+    df.to_excel('entrada.xlsx', index=False)
+    store = ResultsStore('resultados.sqlite')
+    CommentProcessor().process_file('entrada.xlsx', 'salida.xlsx', batch_size=5, results_store=store,
+                                    run_id='ejecucion', target_batch_seconds=None)
+    
+    output = pd.read_excel('salida.xlsx')
+    assert store.is_finished('ejecucion')
+    assert sorted(store.counts()) == sorted(output['Categoría'].value_counts().items())
+    assert [row['pnr'] for row in store.drill_down(limit=100)] == df['pnr'].tolist()
+    store.close()
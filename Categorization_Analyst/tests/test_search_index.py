@@ -0,0 +1,94 @@
+"""Pruebas del índice invertido de palabras y de sus consultas booleanas."""
+
+import numpy as np
+import pytest
+
+from src.data_preparation.results import LABELS, OTROS_RESULT, CategorizationResult, ResultBatch
+from src.data_preparation.search_index import SearchIndex, SearchIndexBuilder, open_indexes
+from src.data_preparation.text_normalization import normalize_text
+
+CATEGORY = [name for name in LABELS.categories if name != 'Otros'][0]
+TYPE = LABELS.types[0]
+
+COMMENTS = [
+    'Rechazaron mi tarjeta en el pago',
+    'el pago con tarjeta fue rechazado por el banco',
+    'perdieron mi maleta',
+    'el check-in fue lento',
+    'rechazaron la tarjeta de nuevo',
+    'Todo bien'
+]
+
+def build(directory, comments, batch_size=4):
+    """Construye un índice en lotes; los comentarios con 'tarjeta' llevan CATEGORY y TYPE."""
+    builder = SearchIndexBuilder(str(directory))
+    for start in range(0, len(comments), batch_size):
+        chunk = comments[start:start + batch_size]
+        results = [CategorizationResult.from_names(CATEGORY, None, TYPE, 1.0) if 'tarjeta' in comment
+                   else OTROS_RESULT for comment in chunk]
+        batch = ResultBatch.from_results([f'P{start + i}' for i in range(len(chunk))], chunk, results)
+        builder.add_batch(range(start, start + len(chunk)), [normalize_text(text) for text in chunk], batch)
+    builder.finish()
+    return SearchIndex(str(directory))
+
+def test_boolean_queries(tmp_path):
+    index = build(tmp_path / 'indice', COMMENTS)
+    assert index.size == len(COMMENTS)
+    
+    assert index.search('tarjeta').tolist() == [0, 1, 4]
+    assert index.search('tarjeta pago').tolist() == [0, 1]
+    assert index.search('maleta OR lento').tolist() == [2, 3]
+    assert index.search('tarjeta -banco').tolist() == [0, 4]
+    assert index.search('tarjeta NOT banco').tolist() == [0, 4]
+    assert index.search('-tarjeta').tolist() == [2, 3, 5]
+    assert index.search('check-in').tolist() == [3]
+    assert index.search('inexistente').tolist() == []
+    
+    assert index.search('pago OR maleta', category=CATEGORY).tolist() == [0, 1]
+    assert index.search('pago OR maleta', category='Otros').tolist() == [2]
+    assert index.search('tarjeta', type_name=TYPE).tolist() == [0, 1, 4]
+    assert index.search('tarjeta', category='Categoría inexistente').tolist() == []
+
+def test_rows_return_the_stored_results(tmp_path):
+    index = build(tmp_path / 'indice', COMMENTS)
+    rows = index.rows(index.search('maleta OR banco'))
+    assert [row['fila'] for row in rows] == [1, 2]
+    assert rows[0]['Comentario'] == COMMENTS[1]
+    assert (rows[0]['Categoría'], rows[0]['Tipo']) == (CATEGORY, TYPE)
+    assert (rows[1]['PNR'], rows[1]['Categoría'], rows[1]['Tipo']) == ('P2', 'Otros', None)
+
+def test_arrays_use_the_smallest_integer_type(tmp_path):
+    # Una palabra que aparece por primera vez después de la fila 255 necesita 16 bits
+    comments = ['vuelo'] * 300 + ['maleta']
+    index = build(tmp_path / 'indice', comments, batch_size=64)
+    assert index.deltas.dtype == np.uint16
+    assert index.offsets.dtype == np.uint16
+    assert index.search('maleta').tolist() == [300]
+    assert index.search('vuelo').tolist() == list(range(300))
+    assert index.rows([300])[0]['Comentario'] == 'maleta'
+    
+    small = build(tmp_path / 'pequeño', COMMENTS)
+    assert small.deltas.dtype == small.offsets.dtype == np.uint8
+
+def test_rebuild_replaces_and_discard_keeps_previous(tmp_path):
+    build(tmp_path / 'indice', COMMENTS)
+    build(tmp_path / 'indice', ['solo maleta'])
+    
+    builder = SearchIndexBuilder(str(tmp_path / 'indice'))
+    builder.add_batch([0], ['tarjeta'], ResultBatch.from_results(['P0'], ['tarjeta'], [OTROS_RESULT]))
+    builder.discard()
+    
+    index = SearchIndex(str(tmp_path / 'indice'))
+    assert index.size == 1
+    assert index.search('maleta').tolist() == [0]
+    assert index.search('tarjeta').tolist() == []
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['indice']
+
+def test_open_indexes_per_shard(tmp_path):
+    build(tmp_path / 'fragmentos' / 'shard-0-of-2', COMMENTS[:3])
+    build(tmp_path / 'fragmentos' / 'shard-1-of-2', COMMENTS[3:])
+    indexes = open_indexes(str(tmp_path / 'fragmentos'))
+    assert [len(index.search('tarjeta')) for index in indexes] == [2, 1]
+    assert len(open_indexes(str(tmp_path / 'fragmentos' / 'shard-0-of-2'))) == 1
+    with pytest.raises(FileNotFoundError):
+        open_indexes(str(tmp_path / 'vacío'))
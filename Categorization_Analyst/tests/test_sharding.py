@@ -0,0 +1,124 @@
+"""Pruebas del particionamiento en fragmentos y de su combinación."""
+
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+from src.data_preparation.process_comments_v2 import CommentProcessor
+from src.data_preparation.sharding import (ROW_COLUMN, merge_shards, parse_shard, shard_mask,
+                                           write_shard_outputs)
+from src.data_preparation.summary import FAST_PATH_LABEL, SUMMARY_FILE, summary_counts
+
+COMMENTS = [
+    'el vuelo fue cancelado y quiero reembolso',
+    'perdieron mi maleta en el aeropuerto',
+    '',
+    'no hay vuelo disponible en ese horario',
+    'la atención del personal fue mala',
+    'ok',
+    'quiero cambiar la fecha del vuelo',
+    'cobran demasiado por el equipaje de mano'
+]
+
+def read_summary(summary_file):
+    """Líneas 'etiqueta: valor' del resumen como diccionario."""
+    with open(summary_file, encoding='utf-8') as f:
+        return dict(line.rstrip('\n').split(': ', 1) for line in f if ': ' in line)
+
+def test_parse_shard():
+    assert parse_shard('1/4') == (1, 4)
+    for spec in ('4/4', '-1/2', '1', 'a/b'):
+        with pytest.raises(ValueError):
+            parse_shard(spec)
+
+def test_shard_mask_partitions_rows():
+    pnrs = pd.Series([f'P{i:05d}' for i in range(200)])
+    masks = [shard_mask(pnrs, index, 3) for index in range(3)]
+    assert (sum(mask.astype(int) for mask in masks) == 1).all()
+
+def test_merge_restores_order_and_sums_only_per_run_counters(workdir):
+    frames = [
+        pd.DataFrame({ROW_COLUMN: [0, 2], 'PNR': ['A', 'C'], 'Comentario': ['a', 'c'],
+                      'Categoría': ['Otros', 'Otros'], 'Subcategoría': [None, None], 'Tipo': [None, None]}),
+        pd.DataFrame({ROW_COLUMN: [1, 3], 'PNR': ['B', 'D'], 'Comentario': ['b', 'd'],
+                      'Categoría': ['Otros', 'Otros'], 'Subcategoría': [None, None], 'Tipo': [None, None]})
+    ]
+    for index, (frame, fast_path) in enumerate(zip(frames, (3, 4))):
+        metadata = {FAST_PATH_LABEL: fast_path, 'Ejemplos de aprendizaje': 81}
+        write_shard_outputs(frame, summary_counts(frame), metadata, 'shards', index, 2, 'hash')
+    
+    merged = merge_shards('shards', 'salida.xlsx', 'resumen/resumen.txt')
+    
+    assert merged['PNR'].tolist() == ['A', 'B', 'C', 'D']
+    assert ROW_COLUMN not in merged.columns
+    assert pd.read_excel('salida.xlsx')['PNR'].tolist() == ['A', 'B', 'C', 'D']
+    
+    summary = read_summary('resumen/resumen.txt')
+    assert summary['Total de comentarios procesados'] == '4'
+    assert summary[FAST_PATH_LABEL] == '7'
+    assert summary['Ejemplos de aprendizaje'] == '81'
+    assert summary['Fragmentos combinados'] == '2'
+
+def single_row_shard(index, count, config_hash='hash'):
+    """Escribe un fragmento de una fila."""
+    frame = pd.DataFrame({ROW_COLUMN: [index], 'PNR': ['A'], 'Comentario': ['a'], 'Categoría': ['Otros'],
+                          'Subcategoría': [None], 'Tipo': [None]})
+    write_shard_outputs(frame, summary_counts(frame), {}, 'shards', index, count, config_hash)
+
+def test_merge_requires_every_shard(workdir):
+    single_row_shard(0, 2)
+    with pytest.raises(ValueError, match='Faltan'):
+        merge_shards('shards', 'salida.xlsx', 'resumen/resumen.txt')
+
+def test_merge_rejects_shards_of_another_run(workdir):
+    single_row_shard(0, 2)
+    single_row_shard(1, 2, 'otro hash')
+    with pytest.raises(ValueError, match='configuración'):
+        merge_shards('shards', 'salida.xlsx', 'resumen/resumen.txt')
+    
+    single_row_shard(1, 2)
+    single_row_shard(0, 3)
+    with pytest.raises(ValueError, match='particiones'):
+        merge_shards('shards', 'salida.xlsx', 'resumen/resumen.txt')
+
+def test_merge_rejects_duplicated_shards(workdir):
+    single_row_shard(0, 2)
+    single_row_shard(1, 2)
+    shutil.copy('shards/summary.shard-001-of-002.json', 'shards/summary.shard-001-of-002.copia.json')
+    with pytest.raises(ValueError, match='repetidos'):
+        merge_shards('shards', 'salida.xlsx', 'resumen/resumen.txt')
+
+def test_sharded_run_matches_serial_run(workdir):
+    df = pd.DataFrame({'pnr': [f'P{i:05d}' for i in range(48)],
+                       'Comentario': [COMMENTS[i % len(COMMENTS)] for i in range(48)]})
+    df.to_excel('entrada.xlsx', index=False)
+    
+    CommentProcessor().process_file('entrada.xlsx', 'serial.xlsx')
+    
+    for index in range(3):
+        CommentProcessor().process_file('entrada.xlsx', 'no_usado.xlsx', shard=(index, 3), shard_dir='shards')
+    merged = merge_shards('shards', 'combinado.xlsx', 'combinado/resumen.txt')
+    
+    pd.testing.assert_frame_equal(pd.read_excel('combinado.xlsx'), pd.read_excel('serial.xlsx'))
+    assert len(merged) == len(df)
+    
+    serial_summary = read_summary(SUMMARY_FILE)
+    merged_summary = read_summary('combinado/resumen.txt')
+    for label in ('Total de comentarios procesados', FAST_PATH_LABEL, 'Ejemplos de aprendizaje'):
+        assert merged_summary[label] == serial_summary[label]
+
+def test_merge_rejects_shards_of_a_modified_input(workdir):
+    df = pd.DataFrame({'pnr': [f'P{i:05d}' for i in range(12)],
+                       'Comentario': [COMMENTS[i % len(COMMENTS)] for i in range(12)]})
+    df.to_excel('entrada.xlsx', index=False)
+    CommentProcessor().process_file('entrada.xlsx', 'no_usado.xlsx', shard=(0, 2), shard_dir='shards')
+    
+    # El fragmento 1 se procesa con una versión posterior de la entrada
+    df.to_excel('entrada.xlsx', index=False)
+    stat = os.stat('entrada.xlsx')
+    os.utime('entrada.xlsx', ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    CommentProcessor().process_file('entrada.xlsx', 'no_usado.xlsx', shard=(1, 2), shard_dir='shards')
+    with pytest.raises(ValueError, match='configuración'):
+        merge_shards('shards', 'combinado.xlsx', 'combinado/resumen.txt')
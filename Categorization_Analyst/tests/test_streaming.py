@@ -0,0 +1,106 @@
+"""Pruebas de la categorización en flujo: lectura, micro-lotes y vaciado por tiempo."""
+
+import io
+import json
+import os
+import threading
+
+import pytest
+
+from src.data_preparation.results import OTROS_RESULT, ResultBatch
+from src.data_preparation.streaming import categorize_stream, read_comments
+
+class RecordingProcessor:
+    """Procesador mínimo que categoriza todo como Otros y registra el tamaño de cada lote."""
+    
+    def __init__(self):
+        self.batch_sizes = []
+    
+    def process_batch(self, batch):
+        self.batch_sizes.append(len(batch))
+        return ResultBatch.from_results(batch['pnr'].tolist(), batch['Comentario'].tolist(),
+                                        [OTROS_RESULT] * len(batch))
+
+class RecordingOutput:
+    """Salida que avisa cada vez que se vacía."""
+    
+    def __init__(self):
+        self.lines = []
+        self._pending = []
+        self.flushed = threading.Event()
+    
+    def write(self, text):
+        self._pending.append(text)
+    
+    def flush(self):
+        self.lines.extend(''.join(self._pending).splitlines())
+        self._pending = []
+        self.flushed.set()
+
+def run_in_background(target, *args, **kwargs):
+    result = {}
+    thread = threading.Thread(target=lambda: result.setdefault('value', target(*args, **kwargs)), daemon=True)
+    thread.start()
+    return thread, result
+
+def test_read_comments_formats():
+    stream = io.StringIO('texto plano\n{"pnr": "X1", "Comentario": "objeto"}\n')
+    assert list(read_comments(stream)) == [{'pnr': 1, 'Comentario': 'texto plano'},
+                                           {'pnr': 'X1', 'Comentario': 'objeto'}]
+    with pytest.raises(ValueError):
+        list(read_comments(io.StringIO('texto\n'), 'xml'))
+
+def test_read_comments_skips_non_object_json(caplog):
+    stream = io.StringIO('[1, 2]\n"texto"\n\n{"pnr": 7, "Comentario": "válido"}\n')
+    assert list(read_comments(stream, 'jsonl')) == [{'pnr': 7, 'Comentario': 'válido'}]
+    assert 'se esperaba un objeto JSON' in caplog.text
+
+def test_invalid_json_lines_are_skipped(caplog):
+    processor = RecordingProcessor()
+    output = RecordingOutput()
+    stream = io.StringIO('{no es json\n{"pnr": "X2", "Comentario": "válido"}\n{"pnr": \n')
+    assert categorize_stream(processor, stream, output, input_format='jsonl') == 1
+    assert [json.loads(line)['PNR'] for line in output.lines] == ['X2']
+    assert 'Línea 1: JSON inválido' in caplog.text
+    assert 'Línea 3: JSON inválido' in caplog.text
+
+def test_full_batches_and_remainder():
+    processor = RecordingProcessor()
+    output = RecordingOutput()
+    lines = ''.join(f'comentario {i}\n' for i in range(25))
+    assert categorize_stream(processor, io.StringIO(lines), output, batch_size=10) == 25
+    assert processor.batch_sizes == [10, 10, 5]
+    assert [json.loads(line)['PNR'] for line in output.lines] == list(range(1, 26))
+
+def test_partial_batch_is_flushed_after_interval():
+    processor = RecordingProcessor()
+    output = RecordingOutput()
+    read_fd, write_fd = os.pipe()
+    with os.fdopen(read_fd, 'r') as input_stream:
+        with os.fdopen(write_fd, 'w') as writer:
+            thread, result = run_in_background(categorize_stream, processor, input_stream, output,
+                                               batch_size=100, flush_interval=0.05)
+            writer.write('primer comentario\n')
+            writer.flush()
+            # La entrada sigue abierta: el lote incompleto se procesa por tiempo
+            assert output.flushed.wait(10)
+            assert len(output.lines) == 1
+            writer.write('segundo comentario\n')
+        thread.join(10)
+    assert result['value'] == 2
+    assert processor.batch_sizes == [1, 1]
+
+def test_without_interval_partial_batch_waits_for_input():
+    processor = RecordingProcessor()
+    output = RecordingOutput()
+    read_fd, write_fd = os.pipe()
+    with os.fdopen(read_fd, 'r') as input_stream:
+        with os.fdopen(write_fd, 'w') as writer:
+            thread, result = run_in_background(categorize_stream, processor, input_stream, output,
+                                               batch_size=100, flush_interval=None)
+            writer.write('primer comentario\n')
+            writer.flush()
+            assert not output.flushed.wait(0.3)
+        thread.join(10)
+    assert result['value'] == 1
+    assert processor.batch_sizes == [1]
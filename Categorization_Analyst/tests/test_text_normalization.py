@@ -0,0 +1,48 @@
+"""Pruebas de la normalización de texto."""
+
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data_preparation.text_normalization import (normalize_keywords, normalize_series, normalize_text,
+                                                     strip_accents)
+
+@pytest.mark.parametrize('text, expected', [
+    ('Año nuevo', 'año nuevo'),
+    ('CONTRASEÑA olvidada', 'contraseña olvidada'),
+    ('Pingüino ÁRBOL él', 'pinguino arbol el'),
+    ('¡¡Pésimo!! servicio...  (muy   lento)', 'pesimo servicio muy lento'),
+    ('check-in\ten\nlínea', 'check in en linea'),
+    ('vuelo 123 a las 10:30', 'vuelo a las'),
+    ('ﬁn Ⅻ œuvre', 'fin xii uvre'),
+    ('😡 mal', 'mal'),
+    ('', ''),
+    (None, ''),
+    (float('nan'), ''),
+    (42, '')
+])
+def test_normalize_text(text, expected):
+    assert normalize_text(text) == expected
+
+def test_series_matches_single_texts():
+    rng = random.Random(0)
+    alphabet = 'aeiouáéíóúñÑüÜ AZ,.!¿?-\t\n0123456789😀'
+    texts = [''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 30))) for _ in range(300)]
+    texts += [None, np.nan, 3.5]
+    series = pd.Series(texts, index=range(100, 100 + len(texts)), dtype=object)
+    
+    normalized = normalize_series(series)
+    assert normalized.index.equals(series.index)
+    assert normalized.tolist() == [normalize_text(text) for text in texts]
+    assert all(set(text) <= set('abcdefghijklmnopqrstuvwxyzñ ') for text in normalized)
+    assert all(text == ' '.join(text.split()) for text in normalized)
+
+def test_keywords_are_normalized_like_comments():
+    assert normalize_keywords(['Contraseña', 'contraseña', 'Equipaje de mano', '...', 'Reembolso']) == [
+        'contraseña', 'equipaje de mano', 'reembolso']
+    assert normalize_text('Olvidé mi CONTRASEÑA').find(normalize_keywords(['contraseña'])[0]) != -1
+
+def test_strip_accents_keeps_regex_syntax():
+    assert strip_accents(r'(autenticación|pingüino)\s+[á-ú]?ñ') == r'(autenticacion|pinguino)\s+[a-u]?ñ'
@@ -0,0 +1,84 @@
+"""Pruebas de la ingesta continua de un directorio."""
+
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from src.data_preparation.process_comments_v2 import CommentProcessor
+from src.data_preparation.results_store import ResultsStore
+from src.data_preparation.watch import FolderWatcher
+
+COMMENTS = ['perdieron mi maleta', 'ok', 'el vuelo se atrasó', 'cobran demasiado por el equipaje']
+
+def comments_frame(size):
+    return pd.DataFrame({'pnr': [f'P{i}' for i in range(size)],
+                         'Comentario': [COMMENTS[i % len(COMMENTS)] for i in range(size)]})
+
+def read_summary(summary_file):
+    """Líneas 'etiqueta: valor' del resumen como diccionario."""
+    with open(summary_file, encoding='utf-8') as f:
+        return dict(line.rstrip('\n').split(': ', 1) for line in f if ': ' in line)
+
+@pytest.fixture
+def watcher(workdir):
+    os.makedirs('entrada')
+    store = ResultsStore('resultados.sqlite')
+    watcher = FolderWatcher(CommentProcessor(), store, 'entrada', summary_file='resumen/resumen.txt',
+                            counts_file='resumen/conteos.json', batch_size=3)
+    yield watcher
+    store.close()
+
+def test_files_are_ready_once_unchanged(watcher):
+    comments_frame(4).to_csv('entrada/a.csv', index=False)
+    for name in ('.oculto.csv', '~$libro.xlsx', 'notas.txt', 'vacio.jsonl'):
+        open(os.path.join('entrada', name), 'w').close()
+    
+    assert watcher.poll() == []
+    assert watcher.pending == 2
+    
+    # El archivo sigue creciendo: se espera otra consulta sin cambios
+    comments_frame(6).to_csv('entrada/a.csv', index=False)
+    stat = os.stat('entrada/a.csv')
+    os.utime('entrada/a.csv', ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert watcher.poll() == []
+    ready = watcher.poll()
+    assert [path.name for path in ready] == ['a.csv']
+    assert watcher.pending == 0
+    
+    assert watcher.process(ready[0]) == 6
+    assert watcher.poll() == []
+
+def test_each_format_is_ingested_once(watcher):
+    comments_frame(5).to_csv('entrada/a.csv', index=False)
+    comments_frame(7).to_excel('entrada/b.xlsx', index=False)
+    with open('entrada/c.jsonl', 'w', encoding='utf-8') as f:
+        for row in comments_frame(3).to_dict('records'):
+            f.write(json.dumps(row, ensure_ascii=False) + '\n')
+    
+    assert watcher.run(poll_interval=0.01, once=True) == 15
+    runs = watcher.results_store.runs()
+    assert sorted(run['rows'] for run in runs) == [3, 5, 7]
+    summary = read_summary('resumen/resumen.txt')
+    assert summary['Total de comentarios procesados'] == '15'
+    assert summary['Archivos ingeridos'] == '3'
+    
+    # El mismo contenido con otro nombre no se vuelve a categorizar
+    comments_frame(5).to_csv('entrada/copia.csv', index=False)
+    assert watcher.run(poll_interval=0.01, once=True) == 0
+    assert len(watcher.results_store.runs()) == 3
+    assert read_summary('resumen/resumen.txt')['Total de comentarios procesados'] == '15'
+
+def test_unreadable_files_are_skipped_until_they_change(watcher, caplog):
+    pd.DataFrame({'otra': [1]}).to_csv('entrada/malo.csv', index=False)
+    comments_frame(2).to_csv('entrada/bueno.csv', index=False)
+    assert watcher.run(poll_interval=0.01, once=True) == 2
+    assert 'malo.csv' in caplog.text
+    assert watcher.run(poll_interval=0.01, once=True) == 0
+    
+    comments_frame(4).to_csv('entrada/malo.csv', index=False)
+    stat = os.stat('entrada/malo.csv')
+    os.utime('entrada/malo.csv', ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert watcher.run(poll_interval=0.01, once=True) == 4
+    assert read_summary('resumen/resumen.txt')['Total de comentarios procesados'] == '6'